@@ -1,18 +1,50 @@
 import sqlite3
 
+from replica_routing import RoutingConnection, copy_to_replicas
+
 class DatabaseConnection:
-    """A class-based context manager for SQLite database connections."""
-    def __init__(self, db_name='users.db'):
+    """
+    A class-based context manager for SQLite database connections.
+
+    Given a ConnectionRegistry, it borrows the registry's long-lived
+    connection instead of opening a new one, so sqlite3's statement cache
+    survives between blocks. That connection is left open on exit and any
+    uncommitted work is rolled back, as closing would have done. Statements
+    run on it count towards registry.stats(db_name).
+
+    Given replica file names, db_name is the primary and the block gets a
+    RoutingConnection: read-only statements are spread over the replicas
+    (selection is 'round_robin' or 'least_busy'), while writes and anything
+    inside a transaction go to the primary.
+    """
+    def __init__(self, db_name='users.db', registry=None, replicas=None,
+                 selection='round_robin'):
         self.db_name = db_name
+        self.registry = registry
+        self.replicas = replicas
+        self.selection = selection
         self.conn = None
 
     def __enter__(self):
-        self.conn = sqlite3.connect(self.db_name)
+        if self.replicas and self.registry is not None:
+            self.conn = RoutingConnection(self.registry.connect(self.db_name),
+                                          [self.registry.connect(r, read_only=True)
+                                           for r in self.replicas],
+                                          self.selection)
+        elif self.replicas:
+            self.conn = RoutingConnection.open(self.db_name, self.replicas, self.selection)
+        elif self.registry is not None:
+            self.conn = self.registry.connect(self.db_name)
+        else:
+            self.conn = sqlite3.connect(self.db_name)
         return self.conn
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         if self.conn:
-            self.conn.close()
+            if self.registry is None:
+                self.conn.close()
+            elif self.conn.in_transaction:
+                self.conn.rollback()
         return False
 
 # --- Setup for testing ---
@@ -65,6 +97,23 @@ if __name__ == "__main__":
     except Exception as e:
         print(f"Caught unexpected error: {e}")
 
+    print("\n--- Routing reads to replicas ---")
+    replica_files = ['users_replica1.db', 'users_replica2.db']
+    copy_to_replicas(db_file_name, replica_files)
+    for selection in ('round_robin', 'least_busy'):
+        with DatabaseConnection(db_file_name, replicas=replica_files, selection=selection) as conn:
+            for _ in range(4):
+                conn.execute("SELECT COUNT(*) FROM users").fetchall()
+            # Leaving a cursor unread keeps its replica busy for least_busy
+            pending = conn.execute("SELECT * FROM users")
+            for _ in range(2):
+                conn.execute("SELECT * FROM users").fetchall()
+            pending.close()
+            conn.execute("INSERT OR IGNORE INTO users (name, email) VALUES ('Dana', 'dana@example.com')")
+            conn.execute("SELECT * FROM users").fetchall()  # in a transaction: primary
+            conn.rollback()
+            print(f"{selection}: {conn.stats()}")
+
     print("\n--- Demonstrating connection is closed ---")
     try:
         conn_outside_with = None
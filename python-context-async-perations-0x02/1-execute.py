@@ -1,29 +1,177 @@
+import itertools
+import os
 import sqlite3
+import tempfile
+import time
+
+from connection_registry import ConnectionRegistry
+
+def _identifier(name):
+    if not name.isidentifier():
+        raise ValueError(f"Invalid identifier: {name!r}")
+    return name
 
 class ExecuteQuery:
-    """Context manager to execute an SQL query and manage connection."""
-    def __init__(self, query, params=None, db_name='users.db'):
+    """
+    Context manager to execute an SQL query and manage connection.
+
+    By default the block receives every row as a list. With stream=True it
+    receives a lazy iterator instead, which pulls rows from the open cursor
+    `arraysize` at a time, so memory stays flat on large tables; with
+    batches=True as well it yields each fetchmany() list as it arrives.
+    Streamed rows must be consumed inside the with block: __exit__ closes
+    the cursor and then the connection.
+
+    With a ConnectionRegistry, the query runs on the registry's long-lived
+    connection, which stays open afterwards so its prepared statements are
+    reused; registry.stats(db_name) reports the statement-cache hit rate.
+
+    With many=True, params is an iterable of parameter tuples (a generator
+    is fine) and the query is a write. The tuples are sent in executemany()
+    chunks of batch_size inside one transaction, which is committed before
+    the block runs; the block receives a stats dict with rows,
+    rows_written, batches, elapsed and rows_per_second. If the connection
+    (a shared registry one) is already in a transaction, the write runs in
+    a SAVEPOINT instead: a failure undoes only this write, and the caller's
+    transaction, now including it, is left for the caller to commit.
+
+    For upserts, pass staging_columns as well: the rows are first loaded
+    into a TEMP table named staging_table with those columns, then the
+    query, an INSERT ... SELECT ... FROM <staging_table>, merges them in
+    one statement in the same transaction.
+    """
+    def __init__(self, query, params=None, db_name='users.db', stream=False,
+                 arraysize=1000, batches=False, registry=None, many=False,
+                 batch_size=1000, staging_columns=None, staging_table='staging'):
+        if arraysize < 1:
+            raise ValueError("arraysize must be at least 1")
+        if many and (stream or batches):
+            raise ValueError("many=True cannot be combined with streaming")
+        if staging_columns and not many:
+            raise ValueError("staging_columns requires many=True")
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
         self.query = query
         self.params = params if params is not None else ()
         self.db_name = db_name
+        self.stream = stream or batches
+        self.arraysize = arraysize
+        self.batches = batches
+        self.registry = registry
+        self.many = many
+        self.batch_size = batch_size
+        self.staging_columns = (tuple(_identifier(c) for c in staging_columns)
+                                if staging_columns else None)
+        self.staging_table = _identifier(staging_table)
         self.conn = None
+        self.cursor = None
         self.results = None
+        self._callers_transaction = False
 
     def __enter__(self):
         try:
-            self.conn = sqlite3.connect(self.db_name)
-            cursor = self.conn.cursor()
-            cursor.execute(self.query, self.params)
-            self.results = cursor.fetchall()
+            if self.many:
+                self.conn = (self.registry.connect(self.db_name) if self.registry is not None
+                             else sqlite3.connect(self.db_name))
+                self._callers_transaction = self.conn.in_transaction
+                self.cursor = self.conn.cursor()
+                self.results = self._write_many()
+                return self.results
+            if self.registry is not None:
+                self.conn = self.registry.connect(self.db_name)
+                self._callers_transaction = self.conn.in_transaction
+                self.cursor = self.registry.execute(self.db_name, self.query, self.params)
+            else:
+                self.conn = sqlite3.connect(self.db_name)
+                self.cursor = self.conn.cursor()
+                self.cursor.execute(self.query, self.params)
+            self.cursor.arraysize = self.arraysize
+            if self.stream:
+                self.results = self._iter_batches() if self.batches else self._iter_rows()
+            else:
+                self.results = self.cursor.fetchall()
             return self.results
         except Exception as e:
             print(f"Error executing query: {e}")
             self.results = []
+            self._close()
             raise
-        
-    def __exit__(self, exc_type, exc_val, exc_tb):
+
+    def _write_many(self):
+        start_time = time.perf_counter()
+        stats = {"rows": 0, "rows_written": 0, "batches": 0,
+                 "elapsed": 0.0, "rows_per_second": 0.0}
+        cursor = self.cursor
+        if self.staging_columns:
+            columns = ", ".join(self.staging_columns)
+            placeholders = ", ".join("?" * len(self.staging_columns))
+            insert = f"INSERT INTO {self.staging_table} ({columns}) VALUES ({placeholders})"
+        else:
+            insert = self.query
+
+        nested = self.conn.in_transaction
+        cursor.execute("SAVEPOINT execute_many" if nested else "BEGIN")
+        try:
+            if self.staging_columns:
+                cursor.execute(f"DROP TABLE IF EXISTS temp.{self.staging_table}")
+                cursor.execute(f"CREATE TEMP TABLE {self.staging_table} ({columns})")
+            rows = iter(self.params)
+            while chunk := list(itertools.islice(rows, self.batch_size)):
+                cursor.executemany(insert, chunk)
+                stats["rows"] += len(chunk)
+                stats["batches"] += 1
+                if not self.staging_columns:
+                    stats["rows_written"] += max(cursor.rowcount, 0)
+            if self.staging_columns:
+                cursor.execute(self.query)
+                stats["rows_written"] = max(cursor.rowcount, 0)
+                cursor.execute(f"DROP TABLE temp.{self.staging_table}")
+            if nested:
+                cursor.execute("RELEASE SAVEPOINT execute_many")
+            else:
+                self.conn.commit()
+        except Exception:
+            if nested:
+                cursor.execute("ROLLBACK TO SAVEPOINT execute_many")
+                cursor.execute("RELEASE SAVEPOINT execute_many")
+            else:
+                self.conn.rollback()
+            raise
+
+        stats["elapsed"] = time.perf_counter() - start_time
+        if stats["elapsed"]:
+            stats["rows_per_second"] = stats["rows"] / stats["elapsed"]
+        return stats
+
+    def _iter_batches(self):
+        cursor = self.cursor
+        while True:
+            batch = cursor.fetchmany()
+            if not batch:
+                return
+            yield batch
+
+    def _iter_rows(self):
+        for batch in self._iter_batches():
+            yield from batch
+
+    def _close(self):
+        if self.stream and self.results:
+            self.results.close()
+        if self.cursor is not None:
+            self.cursor.close()
+            self.cursor = None
         if self.conn:
-            self.conn.close()
+            if self.registry is None:
+                self.conn.close()
+            elif self.conn.in_transaction and not self._callers_transaction:
+                # Same outcome as closing: uncommitted work is discarded,
+                # unless it belongs to a transaction the caller had open
+                self.conn.rollback()
+            self.conn = None
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._close()
         return False
 
 # --- Setup for testing ---
@@ -80,6 +228,48 @@ if __name__ == "__main__":
     except Exception as e:
         print(f"An error occurred during query execution: {e}")
 
+    print("\n--- Streaming users in batches of 2 ---")
+    try:
+        with ExecuteQuery("SELECT * FROM users", batches=True, arraysize=2) as batches:
+            for batch in batches:
+                print(batch)
+    except Exception as e:
+        print(f"An error occurred during query execution: {e}")
+
+    print("\n--- Reusing prepared statements through a registry ---")
+    registry = ConnectionRegistry(cached_statements=64)
+    for age in range(20, 50, 5):
+        with ExecuteQuery("SELECT * FROM users WHERE age > ?", (age,), registry=registry) as rows:
+            print(f"age > {age}: {len(rows)} user(s)")
+    print(registry.stats(db_file_name))
+    registry.close()
+
+    # The write demos use a scratch copy so users.db keeps its five users
+    scratch_dir = tempfile.TemporaryDirectory()
+    scratch_db = os.path.join(scratch_dir.name, 'users.db')
+    setup_database(scratch_db)
+
+    print("\n--- Bulk insert with executemany (scratch database) ---")
+    new_users = ((f"User {i}", f"user{i}@example.com", 20 + i % 50) for i in range(10_000))
+    with ExecuteQuery("INSERT OR IGNORE INTO users (name, email, age) VALUES (?, ?, ?)",
+                      new_users, db_name=scratch_db, many=True) as stats:
+        print(f"Wrote {stats['rows_written']} of {stats['rows']} rows in {stats['batches']} "
+              f"batches at {stats['rows_per_second']:,.0f} rows/s")
+
+    print("\n--- Upsert through a staging table (scratch database) ---")
+    birthdays = ((f"user{i}@example.com", 21 + i % 50) for i in range(0, 10_000, 2))
+    # WHERE true keeps SQLite from reading ON CONFLICT as a join constraint
+    merge = """
+        INSERT INTO users (name, email, age)
+        SELECT 'Unknown', email, age FROM staging WHERE true
+        ON CONFLICT(email) DO UPDATE SET age = excluded.age
+    """
+    with ExecuteQuery(merge, birthdays, db_name=scratch_db, many=True,
+                      staging_columns=("email", "age")) as stats:
+        print(f"Merged {stats['rows_written']} of {stats['rows']} rows "
+              f"at {stats['rows_per_second']:,.0f} rows/s")
+    scratch_dir.cleanup()
+
     print("\n--- Testing with a bad query ---")
     try:
         with ExecuteQuery("SELECT * FROM non_existent_table") as bad_results:
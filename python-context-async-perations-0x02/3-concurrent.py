@@ -3,6 +3,8 @@ import aiosqlite
 import sqlite3
 import time
 
+from async_pool import AsyncConnectionPool, gather_queries
+
 DB_NAME = 'users.db'
 
 def setup_database():
@@ -31,10 +33,10 @@ def setup_database():
     finally:
         conn.close()
 
-async def async_fetch_users():
-    """Asynchronously fetches all users."""
+async def async_fetch_users(pool=None):
+    """Asynchronously fetches all users, on a pooled connection if given one."""
     print("Starting async_fetch_users...")
-    async with aiosqlite.connect(DB_NAME) as db:
+    async with (pool.acquire() if pool else aiosqlite.connect(DB_NAME)) as db:
         await asyncio.sleep(0.1)
         cursor = await db.execute("SELECT * FROM users")
         users = await cursor.fetchall()
@@ -42,10 +44,10 @@ async def async_fetch_users():
     print("Finished async_fetch_users.")
     return users
 
-async def async_fetch_older_users():
-    """Asynchronously fetches users older than 40."""
+async def async_fetch_older_users(pool=None):
+    """Asynchronously fetches users older than 40, on a pooled connection if given one."""
     print("Starting async_fetch_older_users...")
-    async with aiosqlite.connect(DB_NAME) as db:
+    async with (pool.acquire() if pool else aiosqlite.connect(DB_NAME)) as db:
         await asyncio.sleep(0.05)
         cursor = await db.execute("SELECT * FROM users WHERE age > 40")
         older_users = await cursor.fetchall()
@@ -58,10 +60,11 @@ async def fetch_concurrently():
     print("Starting concurrent fetches...")
     start_time = time.time()
 
-    all_users, older_users = await asyncio.gather(
-        async_fetch_users(),
-        async_fetch_older_users()
-    )
+    async with AsyncConnectionPool(DB_NAME, size=2) as pool:
+        all_users, older_users = await asyncio.gather(
+            async_fetch_users(pool),
+            async_fetch_older_users(pool)
+        )
 
     end_time = time.time()
     print(f"Finished concurrent fetches in {end_time - start_time:.4f} seconds.")
@@ -76,6 +79,11 @@ async def fetch_concurrently():
 
     return all_users, older_users
 
+async def fetch_many_concurrently(queries, pool_size=5, limit=None):
+    """Runs many queries over a shared pool with at most `limit` in flight."""
+    async with AsyncConnectionPool(DB_NAME, size=pool_size) as pool:
+        return await gather_queries(pool, queries, limit)
+
 if __name__ == "__main__":
     setup_database()
 
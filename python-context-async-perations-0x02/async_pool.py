@@ -0,0 +1,135 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import aiosqlite
+
+
+_CLOSED = object()
+
+
+class AsyncConnectionPool:
+    """
+    Fixed-size pool of aiosqlite connections.
+
+    Each aiosqlite connection runs its own thread, so reusing a few of them
+    is much cheaper than connecting per query. Connections are opened lazily
+    up to `size`. acquire() waits up to acquire_timeout seconds for a free
+    one and raises TimeoutError after that.
+
+    The idle queue holds connections and None, a free slot left behind by a
+    connection that was discarded or failed to open; whoever takes it opens
+    a replacement. close() wakes every waiting acquire() with RuntimeError.
+    """
+    def __init__(self, db_name='users.db', size=5, acquire_timeout=10.0):
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+        self.db_name = db_name
+        self.size = size
+        self.acquire_timeout = acquire_timeout
+        self._idle = asyncio.Queue()
+        self._connections = []
+        self._slots = 0  # connections open or opening, plus free slots queued
+        self._closed = False
+
+    async def _checkout(self, timeout):
+        if self._closed:
+            raise RuntimeError("Connection pool is closed")
+        try:
+            db = self._idle.get_nowait()
+        except asyncio.QueueEmpty:
+            if self._slots < self.size:
+                self._slots += 1
+                db = None
+            else:
+                try:
+                    db = await asyncio.wait_for(self._idle.get(), timeout)
+                except asyncio.TimeoutError:
+                    raise TimeoutError(
+                        f"No connection to {self.db_name} available within "
+                        f"{timeout} second(s)") from None
+        if db is _CLOSED:
+            self._idle.put_nowait(_CLOSED)  # wake the next waiter too
+            raise RuntimeError("Connection pool is closed")
+        if db is not None:
+            return db
+        try:
+            db = await aiosqlite.connect(self.db_name)
+        except BaseException:
+            self._idle.put_nowait(None)
+            raise
+        self._connections.append(db)
+        return db
+
+    async def _discard(self, db):
+        """Drops db from the pool, leaving its slot free, and closes it."""
+        self._connections.remove(db)
+        if not self._closed:
+            self._idle.put_nowait(None)
+        try:
+            # Shielded, so a cancelled release still closes the connection
+            await asyncio.shield(db.close())
+        except Exception:
+            pass
+
+    async def _release(self, db):
+        if self._closed:
+            await self._discard(db)
+            return
+        try:
+            if db.in_transaction:
+                await db.rollback()
+        except BaseException:
+            await self._discard(db)
+            raise
+        self._idle.put_nowait(db)
+
+    @asynccontextmanager
+    async def acquire(self, timeout=None):
+        """
+        async with pool.acquire() as db: ... returns db to the pool
+        afterwards, rolled back. If the rollback fails or is cancelled, db is
+        closed and replaced on a later acquire() instead.
+        """
+        db = await self._checkout(self.acquire_timeout if timeout is None else timeout)
+        try:
+            yield db
+        finally:
+            await self._release(db)
+
+    async def fetch_all(self, query, params=()):
+        """Runs one query on a pooled connection and returns all rows."""
+        async with self.acquire() as db:
+            async with db.execute(query, params) as cursor:
+                return await cursor.fetchall()
+
+    async def close(self):
+        """Closes idle connections; checked-out ones are closed on release."""
+        self._closed = True
+        while not self._idle.empty():
+            db = self._idle.get_nowait()
+            if db is not None and db is not _CLOSED:
+                await self._discard(db)
+        self._idle.put_nowait(_CLOSED)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+        return False
+
+
+async def gather_queries(pool, queries, limit=None):
+    """
+    Fans (query, params) pairs, or bare query strings, out over the pool,
+    with at most `limit` in flight (default: the pool size). Returns the
+    row lists in input order, like asyncio.gather.
+    """
+    semaphore = asyncio.Semaphore(limit or pool.size)
+
+    async def run(item):
+        query, params = (item, ()) if isinstance(item, str) else item
+        async with semaphore:
+            return await pool.fetch_all(query, params)
+
+    return await asyncio.gather(*(run(item) for item in queries))
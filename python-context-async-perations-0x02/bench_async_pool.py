@@ -0,0 +1,45 @@
+import asyncio
+import sys
+import time
+
+import aiosqlite
+
+from async_pool import AsyncConnectionPool, gather_queries
+
+setup_database = __import__('3-concurrent').setup_database
+DB_NAME = 'users.db'
+QUERY = ("SELECT * FROM users WHERE age > ?", (40,))
+
+
+async def connect_per_query(count, limit):
+    """Baseline: every query opens (and closes) its own aiosqlite connection."""
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run():
+        async with semaphore:
+            async with aiosqlite.connect(DB_NAME) as db:
+                async with db.execute(*QUERY) as cursor:
+                    return await cursor.fetchall()
+
+    return await asyncio.gather(*(run() for _ in range(count)))
+
+
+async def pooled(count, limit):
+    async with AsyncConnectionPool(DB_NAME, size=limit) as pool:
+        return await gather_queries(pool, [QUERY] * count, limit)
+
+
+async def main(count, limit):
+    for label, run in (("connect per query", connect_per_query), ("pool", pooled)):
+        start_time = time.perf_counter()
+        results = await run(count, limit)
+        elapsed = time.perf_counter() - start_time
+        print(f"{label:>17}: {len(results)} queries in {elapsed:.3f}s "
+              f"({len(results) / elapsed:,.0f} queries/s)")
+
+
+if __name__ == "__main__":
+    setup_database()
+    query_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    asyncio.run(main(query_count, concurrency))
@@ -0,0 +1,33 @@
+import sys
+import time
+
+from connection_registry import ConnectionRegistry
+
+ExecuteQuery = __import__('1-execute').ExecuteQuery
+setup_database = __import__('1-execute').setup_database
+
+DB_NAME = 'users.db'
+QUERY = "SELECT * FROM users WHERE age > ?"
+
+
+def run(queries, registry=None):
+    start = time.perf_counter()
+    for i in range(queries):
+        with ExecuteQuery(QUERY, (i % 60,), DB_NAME, registry=registry):
+            pass
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    setup_database(DB_NAME)
+    queries = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+
+    elapsed = run(queries)
+    print(f"connect per query: {queries / elapsed:,.0f} queries/s")
+
+    for size in (0, 128):
+        registry = ConnectionRegistry(cached_statements=size)
+        elapsed = run(queries, registry)
+        print(f"registry, cached_statements={size:>3}: {queries / elapsed:,.0f} queries/s, "
+              f"{registry.stats(DB_NAME)}")
+        registry.close()
@@ -0,0 +1,133 @@
+import sqlite3
+import threading
+from collections import OrderedDict
+
+
+class StatementCacheStats:
+    """
+    Mirrors sqlite3's per-connection statement cache to count hits.
+
+    sqlite3 keeps the last `size` prepared statements in an LRU keyed by the
+    SQL text but does not report hits, so the same LRU is replayed here for
+    every statement run on a registry connection.
+    """
+    def __init__(self, size):
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._lru = OrderedDict()
+
+    def record(self, sql):
+        if sql in self._lru:
+            self._lru.move_to_end(sql)
+            self.hits += 1
+            return True
+        self.misses += 1
+        if self.size > 0:
+            self._lru[sql] = None
+            if len(self._lru) > self.size:
+                self._lru.popitem(last=False)
+        return False
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __repr__(self):
+        return (f"StatementCacheStats(hits={self.hits}, misses={self.misses}, "
+                f"hit_rate={self.hit_rate:.1%})")
+
+
+class TrackedCursor(sqlite3.Cursor):
+    """Cursor that records each statement in its connection's stats."""
+    def execute(self, sql, parameters=()):
+        self.connection.statement_stats.record(sql)
+        return super().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        self.connection.statement_stats.record(sql)
+        return super().executemany(sql, seq_of_parameters)
+
+
+class TrackedConnection(sqlite3.Connection):
+    """
+    Connection whose cursors, and its execute shortcuts, count statement
+    cache hits, so queries are counted however they are run.
+    """
+    statement_stats = None
+
+    def cursor(self, factory=TrackedCursor):
+        return super().cursor(factory)
+
+    # The C shortcuts would bypass TrackedCursor.execute
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+class ConnectionRegistry:
+    """
+    Long-lived sqlite3 connections, one per database file and thread.
+
+    Reusing a connection keeps its prepared-statement cache, so repeated
+    parameterized queries skip parsing and planning. cached_statements sets
+    the size of that cache on every connection the registry opens.
+    """
+    def __init__(self, cached_statements=128):
+        self.cached_statements = cached_statements
+        self._local = threading.local()
+        self._entries = []
+        self._lock = threading.Lock()
+
+    def _entry(self, db_name, read_only=False):
+        entries = getattr(self._local, 'entries', None)
+        if entries is None:
+            entries = self._local.entries = {}
+        entry = entries.get((db_name, read_only))
+        if entry is None:
+            if read_only:
+                conn = sqlite3.connect(f"file:{db_name}?mode=ro", uri=True,
+                                       cached_statements=self.cached_statements,
+                                       factory=TrackedConnection)
+            else:
+                conn = sqlite3.connect(db_name, cached_statements=self.cached_statements,
+                                       factory=TrackedConnection)
+            conn.statement_stats = StatementCacheStats(self.cached_statements)
+            entry = (db_name, conn, conn.statement_stats)
+            entries[(db_name, read_only)] = entry
+            with self._lock:
+                self._entries.append(entry)
+        return entry
+
+    def connect(self, db_name, read_only=False):
+        """
+        Returns this thread's open connection to db_name. read_only=True
+        gives a separate connection opened with mode=ro.
+        """
+        return self._entry(db_name, read_only)[1]
+
+    def execute(self, db_name, query, params=()):
+        """Runs query on this thread's shared connection to db_name."""
+        return self._entry(db_name)[1].execute(query, params)
+
+    def stats(self, db_name):
+        """Statement-cache counters for db_name, summed over all threads."""
+        total = StatementCacheStats(self.cached_statements)
+        with self._lock:
+            for name, _, stats in self._entries:
+                if name == db_name:
+                    total.hits += stats.hits
+                    total.misses += stats.misses
+        return total
+
+    def close(self):
+        """Closes this thread's connections; other threads should call it too."""
+        entries = getattr(self._local, 'entries', {})
+        with self._lock:
+            for entry in entries.values():
+                entry[1].close()
+                self._entries.remove(entry)
+        entries.clear()
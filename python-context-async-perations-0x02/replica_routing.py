@@ -0,0 +1,198 @@
+import re
+import sqlite3
+
+_COMMENTS = re.compile(r'(--[^\n]*|/\*.*?\*/)', re.DOTALL)
+_WRITE_WORDS = re.compile(r'\b(INSERT|UPDATE|DELETE|REPLACE|UPSERT)\b', re.IGNORECASE)
+SELECTIONS = ('round_robin', 'least_busy')
+
+
+def is_read_only(sql):
+    """
+    True for statements a replica can answer: SELECT, VALUES, EXPLAIN and
+    WITH queries that do not write. PRAGMA and everything else go to the
+    primary.
+    """
+    text = _COMMENTS.sub(' ', sql).strip()
+    first = text.split(None, 1)[0].upper() if text else ''
+    if first in ('SELECT', 'VALUES', 'EXPLAIN'):
+        return True
+    return first == 'WITH' and not _WRITE_WORDS.search(text)
+
+
+def copy_to_replicas(primary, replicas):
+    """Copies the primary file over each replica, standing in for replication."""
+    source = sqlite3.connect(primary)
+    try:
+        for path in replicas:
+            target = sqlite3.connect(path)
+            try:
+                source.backup(target)
+            finally:
+                target.close()
+    finally:
+        source.close()
+
+
+class RoutingCursor:
+    """
+    Cursor that picks a connection for every execute(): a replica for
+    read-only statements, the primary for anything else. A replica counts
+    as busy until the cursor's rows are exhausted (fetchall, a fetch that
+    comes back short, or fetchone once a single-row result is read), the
+    cursor runs another statement, or it is closed or garbage collected.
+    """
+    def __init__(self, router):
+        self._router = router
+        self._cursor = None
+        self._replica = None
+        self._buffer = []
+        self._exhausted = False
+        self.arraysize = 1
+
+    def execute(self, sql, params=()):
+        self._release()
+        conn, self._replica = self._router._route(sql)
+        self._cursor = conn.cursor()
+        self._buffer, self._exhausted = [], False
+        try:
+            self._cursor.execute(sql, params)
+        except Exception:
+            self._release()
+            raise
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        self._release()
+        self._router.primary_statements += 1
+        self._cursor = self._router.primary.cursor()
+        self._buffer, self._exhausted = [], False
+        self._cursor.executemany(sql, seq_of_params)
+        return self
+
+    def _fetch(self, size=None):
+        """Up to size rows (all if None), reading one row ahead so the
+        replica is released as soon as the last row has been handed out."""
+        if size is None:
+            rows, self._buffer = self._buffer + self._cursor.fetchall(), []
+            self._exhausted = True
+        else:
+            wanted = size + 1 - len(self._buffer)
+            if wanted > 0 and not self._exhausted:
+                more = self._cursor.fetchmany(wanted)
+                self._exhausted = len(more) < wanted
+                self._buffer += more
+            rows, self._buffer = self._buffer[:size], self._buffer[size:]
+        if self._exhausted and not self._buffer:
+            self._release()
+        return rows
+
+    def fetchone(self):
+        rows = self._fetch(1)
+        return rows[0] if rows else None
+
+    def fetchmany(self, size=None):
+        return self._fetch(self.arraysize if size is None else size)
+
+    def fetchall(self):
+        return self._fetch()
+
+    def __iter__(self):
+        while (row := self.fetchone()) is not None:
+            yield row
+
+    def _release(self):
+        if self._replica is not None:
+            self._router._busy[self._replica] -= 1
+            self._replica = None
+
+    def close(self):
+        self._release()
+        if self._cursor is not None:
+            self._cursor.close()
+
+    def __del__(self):
+        if self.__dict__.get('_replica') is not None:
+            self._release()
+
+    def __getattr__(self, name):
+        # description, rowcount, lastrowid, ... come from the last cursor
+        if name.startswith('_') or self._cursor is None:
+            raise AttributeError(name)
+        return getattr(self._cursor, name)
+
+
+class RoutingConnection:
+    """
+    Stands in for a sqlite3 connection over one primary and N read replicas.
+
+    Read-only statements go to a replica chosen round-robin or by fewest
+    busy cursors (least_busy). Writes, and every statement while the
+    primary is in a transaction, go to the primary, so a transaction reads
+    its own writes. commit() and rollback() apply to the primary.
+    Replicas are opened read-only.
+    """
+    def __init__(self, primary, replicas, selection='round_robin'):
+        if selection not in SELECTIONS:
+            raise ValueError(f"Unsupported replica selection: {selection}")
+        if not replicas:
+            raise ValueError("At least one replica is required")
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.selection = selection
+        self.reads = [0] * len(self.replicas)
+        self.primary_statements = 0
+        self._busy = [0] * len(self.replicas)
+        self._next = 0
+
+    @classmethod
+    def open(cls, primary, replicas, selection='round_robin'):
+        """Connects to a primary file and replica files by path."""
+        return cls(sqlite3.connect(primary),
+                   [sqlite3.connect(f"file:{path}?mode=ro", uri=True) for path in replicas],
+                   selection)
+
+    def _pick(self):
+        count = len(self.replicas)
+        start = self._next
+        self._next = (self._next + 1) % count
+        if self.selection == 'round_robin':
+            return start
+        # least_busy: fewest open cursors, ties broken round-robin
+        return min(((start + i) % count for i in range(count)), key=self._busy.__getitem__)
+
+    def _route(self, sql):
+        if self.primary.in_transaction or not is_read_only(sql):
+            self.primary_statements += 1
+            return self.primary, None
+        index = self._pick()
+        self._busy[index] += 1
+        self.reads[index] += 1
+        return self.replicas[index], index
+
+    def cursor(self):
+        return RoutingCursor(self)
+
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+
+    def executemany(self, sql, seq_of_params):
+        self.primary_statements += 1
+        return self.primary.executemany(sql, seq_of_params)
+
+    @property
+    def in_transaction(self):
+        return self.primary.in_transaction
+
+    def commit(self):
+        self.primary.commit()
+
+    def rollback(self):
+        self.primary.rollback()
+
+    def close(self):
+        self.primary.close()
+        for replica in self.replicas:
+            replica.close()
+
+    def stats(self):
+        return {"primary": self.primary_statements, "replica_reads": list(self.reads)}
@@ -0,0 +1,110 @@
+import asyncio
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from async_pool import AsyncConnectionPool, gather_queries
+
+
+class AsyncConnectionPoolTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_name = os.path.join(self.tmp.name, 'users.db')
+        conn = sqlite3.connect(self.db_name)
+        conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT)")
+        conn.executemany("INSERT INTO users (name) VALUES (?)", [('a',), ('b',), ('c',)])
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    async def test_reuses_connections_and_rolls_back(self):
+        async with AsyncConnectionPool(self.db_name, size=2) as pool:
+            async with pool.acquire() as db:
+                first = db
+                await db.execute("INSERT INTO users (name) VALUES ('d')")
+            async with pool.acquire() as db:
+                self.assertIs(db, first)
+                self.assertFalse(db.in_transaction)
+            rows = await pool.fetch_all("SELECT COUNT(*) FROM users")
+            self.assertEqual(rows, [(3,)])
+
+    async def test_acquire_times_out_when_exhausted(self):
+        async with AsyncConnectionPool(self.db_name, size=1) as pool:
+            async with pool.acquire():
+                with self.assertRaises(TimeoutError):
+                    async with pool.acquire(timeout=0.05):
+                        pass
+
+    async def test_failed_rollback_discards_connection_and_frees_slot(self):
+        async with AsyncConnectionPool(self.db_name, size=1) as pool:
+            async def failing_rollback():
+                raise sqlite3.OperationalError("disk I/O error")
+
+            async def holder():
+                async with pool.acquire() as db:
+                    await db.execute("INSERT INTO users (name) VALUES ('d')")
+                    db.rollback = failing_rollback
+                    await asyncio.sleep(0.05)
+                return db
+
+            held = asyncio.create_task(holder())
+            await asyncio.sleep(0)
+            # A waiter queued behind the broken connection gets a new one
+            async with pool.acquire(timeout=2) as db:
+                self.assertFalse(db.in_transaction)
+            with self.assertRaises(sqlite3.OperationalError):
+                await held
+            self.assertEqual(len(pool._connections), 1)
+
+    async def test_cancelled_rollback_does_not_leak_the_connection(self):
+        async with AsyncConnectionPool(self.db_name, size=1) as pool:
+            entered = asyncio.Event()
+
+            async def hanging_rollback():
+                entered.set()
+                await asyncio.sleep(3600)
+
+            async def holder():
+                async with pool.acquire() as db:
+                    await db.execute("INSERT INTO users (name) VALUES ('d')")
+                    db.rollback = hanging_rollback
+
+            task = asyncio.create_task(holder())
+            await entered.wait()
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            async with pool.acquire(timeout=2) as db:
+                rows = await (await db.execute("SELECT COUNT(*) FROM users")).fetchall()
+            self.assertEqual(rows, [(3,)])
+
+    async def test_close_wakes_waiters(self):
+        pool = AsyncConnectionPool(self.db_name, size=1)
+        async with pool.acquire():
+            async def waiter():
+                async with pool.acquire(timeout=30):
+                    pass
+
+            waiting = [asyncio.create_task(waiter()) for _ in range(2)]
+            await asyncio.sleep(0.01)
+            await pool.close()
+            for task in waiting:
+                with self.assertRaises(RuntimeError):
+                    await asyncio.wait_for(task, 2)
+        self.assertEqual(pool._connections, [])
+
+    async def test_gather_queries_keeps_input_order(self):
+        async with AsyncConnectionPool(self.db_name, size=2) as pool:
+            results = await gather_queries(pool, [
+                "SELECT name FROM users WHERE id = 3",
+                ("SELECT name FROM users WHERE id = ?", (1,)),
+                "SELECT COUNT(*) FROM users",
+            ])
+        self.assertEqual(results, [[('c',)], [('a',)], [(3,)]])
+
+
+if __name__ == '__main__':
+    unittest.main()
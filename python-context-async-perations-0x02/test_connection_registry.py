@@ -0,0 +1,70 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+
+from connection_registry import ConnectionRegistry, StatementCacheStats
+
+DatabaseConnection = __import__('0-databaseconnection').DatabaseConnection
+ExecuteQuery = __import__('1-execute').ExecuteQuery
+
+
+class StatementCacheStatsTest(unittest.TestCase):
+    def test_mirrors_lru_eviction(self):
+        stats = StatementCacheStats(size=2)
+        for sql in ("a", "b", "a", "c", "b"):
+            stats.record(sql)
+        # "b" was evicted by "c" (the LRU held a, c), so only one "a" hit
+        self.assertEqual((stats.hits, stats.misses), (1, 4))
+
+
+class ConnectionRegistryTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, 'users.db')
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, age INTEGER)")
+        conn.executemany("INSERT INTO users (age) VALUES (?)", [(20,), (30,), (40,)])
+        conn.commit()
+        conn.close()
+        self.registry = ConnectionRegistry(cached_statements=16)
+
+    def tearDown(self):
+        self.registry.close()
+        self.tmp.cleanup()
+
+    def test_connection_is_reused_per_thread(self):
+        first = self.registry.connect(self.db_path)
+        self.assertIs(self.registry.connect(self.db_path), first)
+        other = []
+        thread = threading.Thread(target=lambda: other.append(self.registry.connect(self.db_path)))
+        thread.start()
+        thread.join()
+        self.assertIsNot(other[0], first)
+
+    def test_database_connection_queries_are_counted(self):
+        for age in (10, 25, 35):
+            with DatabaseConnection(self.db_path, registry=self.registry) as conn:
+                conn.execute("SELECT * FROM users WHERE age > ?", (age,)).fetchall()
+                conn.cursor().execute("SELECT * FROM users WHERE age > ?", (age,)).fetchall()
+        stats = self.registry.stats(self.db_path)
+        self.assertEqual((stats.hits, stats.misses), (5, 1))
+
+    def test_execute_query_shares_the_stats(self):
+        for age in (10, 25):
+            with ExecuteQuery("SELECT * FROM users WHERE age > ?", (age,),
+                              db_name=self.db_path, registry=self.registry) as rows:
+                self.assertTrue(rows)
+        stats = self.registry.stats(self.db_path)
+        self.assertEqual((stats.hits, stats.misses), (1, 1))
+
+    def test_uncommitted_work_is_rolled_back_on_exit(self):
+        with DatabaseConnection(self.db_path, registry=self.registry) as conn:
+            conn.execute("DELETE FROM users")
+        with DatabaseConnection(self.db_path, registry=self.registry) as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM users").fetchone()[0], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from connection_registry import ConnectionRegistry
+
+execute_module = __import__('1-execute')
+ExecuteQuery = execute_module.ExecuteQuery
+
+
+class ExecuteQueryTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, 'users.db')
+        execute_module.setup_database(self.db_path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def count(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+        finally:
+            conn.close()
+
+    def test_stream_and_batches(self):
+        with ExecuteQuery("SELECT id FROM users", db_name=self.db_path,
+                          stream=True, arraysize=2) as rows:
+            self.assertEqual([row[0] for row in rows], [1, 2, 3, 4, 5])
+        with ExecuteQuery("SELECT id FROM users", db_name=self.db_path,
+                          batches=True, arraysize=2) as batches:
+            self.assertEqual([len(batch) for batch in batches], [2, 2, 1])
+
+    def test_stream_ends_when_block_exits(self):
+        query = ExecuteQuery("SELECT id FROM users", db_name=self.db_path, stream=True)
+        with query as rows:
+            next(rows)
+        self.assertEqual(list(rows), [])
+        self.assertIsNone(query.conn)
+
+    def test_many_writes_in_one_transaction(self):
+        rows = [(f"User {i}", f"user{i}@example.com", 30) for i in range(25)]
+        with ExecuteQuery("INSERT INTO users (name, email, age) VALUES (?, ?, ?)",
+                          iter(rows), db_name=self.db_path, many=True,
+                          batch_size=10) as stats:
+            self.assertEqual((stats['rows'], stats['rows_written'], stats['batches']),
+                             (25, 25, 3))
+        self.assertEqual(self.count(), 30)
+
+    def test_failed_chunk_rolls_back_everything(self):
+        rows = [("Ok", "ok@example.com", 30), (None, "bad@example.com", 30)]
+        with self.assertRaises(sqlite3.IntegrityError):
+            with ExecuteQuery("INSERT INTO users (name, email, age) VALUES (?, ?, ?)",
+                              rows, db_name=self.db_path, many=True, batch_size=1):
+                pass
+        self.assertEqual(self.count(), 5)
+
+    def test_many_on_open_transaction_leaves_callers_work_alone(self):
+        registry = ConnectionRegistry()
+        conn = registry.connect(self.db_path)
+        conn.execute("INSERT INTO users (name, email, age) VALUES ('Pending', 'p@example.com', 1)")
+        insert = "INSERT INTO users (name, email, age) VALUES (?, ?, ?)"
+        with ExecuteQuery(insert, [("A", "a@example.com", 30)], db_name=self.db_path,
+                          registry=registry, many=True) as stats:
+            self.assertEqual(stats['rows_written'], 1)
+        # Nothing committed behind the caller's back
+        self.assertTrue(conn.in_transaction)
+        self.assertEqual(self.count(), 5)
+
+        with redirect_stdout(StringIO()), self.assertRaises(sqlite3.IntegrityError):
+            with ExecuteQuery(insert, [("B", "b@example.com", 30), (None, "x@example.com", 30)],
+                              db_name=self.db_path, registry=registry, many=True):
+                pass
+        # Only the failed write was undone
+        self.assertTrue(conn.in_transaction)
+        names = {row[0] for row in conn.execute("SELECT name FROM users")}
+        self.assertTrue({'Pending', 'A'} <= names)
+        self.assertNotIn('B', names)
+        conn.commit()
+        self.assertEqual(self.count(), 7)
+        registry.close()
+
+    def test_staging_table_upsert(self):
+        merge = """
+            INSERT INTO users (name, email, age)
+            SELECT 'New', email, age FROM staging WHERE true
+            ON CONFLICT(email) DO UPDATE SET age = excluded.age
+        """
+        rows = [("alice@example.com", 31), ("zed@example.com", 50)]
+        with ExecuteQuery(merge, rows, db_name=self.db_path, many=True,
+                          staging_columns=("email", "age")) as stats:
+            self.assertEqual(stats['rows_written'], 2)
+        conn = sqlite3.connect(self.db_path)
+        self.assertEqual(conn.execute("SELECT age FROM users WHERE email = 'alice@example.com'")
+                         .fetchone(), (31,))
+        conn.close()
+        self.assertEqual(self.count(), 6)
+
+    def test_staging_identifiers_are_validated(self):
+        for kwargs in ({'staging_table': 'staging; DROP TABLE users'},
+                       {'staging_columns': ('email', 'age) --')}):
+            with self.subTest(**kwargs):
+                with self.assertRaises(ValueError):
+                    ExecuteQuery("INSERT INTO users SELECT * FROM staging", [],
+                                 db_name=self.db_path, many=True,
+                                 **{'staging_columns': ('email',), **kwargs})
+
+
+if __name__ == '__main__':
+    unittest.main()
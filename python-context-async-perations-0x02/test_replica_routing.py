@@ -0,0 +1,84 @@
+import gc
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from connection_registry import ConnectionRegistry
+from replica_routing import RoutingConnection, copy_to_replicas, is_read_only
+
+DatabaseConnection = __import__('0-databaseconnection').DatabaseConnection
+
+
+class ReplicaRoutingTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.primary = os.path.join(self.tmp.name, 'primary.db')
+        self.replicas = [os.path.join(self.tmp.name, f'replica{i}.db') for i in range(2)]
+        conn = sqlite3.connect(self.primary)
+        conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT)")
+        conn.executemany("INSERT INTO users (name) VALUES (?)", [('a',), ('b',), ('c',)])
+        conn.commit()
+        conn.close()
+        copy_to_replicas(self.primary, self.replicas)
+        self.conn = RoutingConnection.open(self.primary, self.replicas, 'least_busy')
+
+    def tearDown(self):
+        self.conn.close()
+        self.tmp.cleanup()
+
+    def test_read_only_detection(self):
+        self.assertTrue(is_read_only("  -- note\n select 1"))
+        self.assertTrue(is_read_only("WITH x AS (SELECT 1) SELECT * FROM x"))
+        self.assertFalse(is_read_only("WITH x AS (SELECT 1) INSERT INTO t SELECT * FROM x"))
+        self.assertFalse(is_read_only("PRAGMA journal_mode"))
+
+    def test_busy_counts_return_to_zero(self):
+        for _ in range(3):
+            self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM users").fetchone(), (3,))
+        self.conn.execute("SELECT * FROM users").fetchall()
+        cursor = self.conn.execute("SELECT * FROM users")
+        self.assertEqual(len(cursor.fetchmany(3)), 3)
+        self.assertEqual(list(self.conn.execute("SELECT id FROM users")), [(1,), (2,), (3,)])
+        self.assertEqual(self.conn._busy, [0, 0])
+
+    def test_abandoned_cursor_is_released(self):
+        cursor = self.conn.execute("SELECT * FROM users")
+        cursor.fetchone()
+        self.assertEqual(sum(self.conn._busy), 1)
+        del cursor
+        gc.collect()
+        self.assertEqual(self.conn._busy, [0, 0])
+
+    def test_least_busy_skips_replica_with_open_cursor(self):
+        pending = self.conn.execute("SELECT * FROM users")
+        busy_replica = self.conn._busy.index(1)
+        for _ in range(3):
+            self.conn.execute("SELECT * FROM users").fetchall()
+        self.assertEqual(self.conn.reads[busy_replica], 1)
+        pending.close()
+
+    def test_writes_and_transactions_go_to_primary(self):
+        self.conn.execute("INSERT INTO users (name) VALUES ('d')")
+        # Inside the transaction the primary answers, so the write is visible
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM users").fetchone(), (4,))
+        self.conn.commit()
+        self.conn.executemany("INSERT INTO users (name) VALUES (?)", [('e',)])
+        self.conn.cursor().executemany("INSERT INTO users (name) VALUES (?)", [('f',)])
+        self.conn.commit()
+        self.assertEqual(self.conn.stats(), {"primary": 4, "replica_reads": [0, 0]})
+        # Replicas have not been refreshed, so they still see three rows
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM users").fetchone(), (3,))
+
+    def test_registry_replicas_are_read_only(self):
+        registry = ConnectionRegistry()
+        with DatabaseConnection(self.primary, registry=registry,
+                                replicas=self.replicas) as conn:
+            for replica in conn.replicas:
+                with self.assertRaises(sqlite3.OperationalError):
+                    replica.execute("DELETE FROM users")
+        registry.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,27 +1,50 @@
 import sqlite3
 import functools
 import logging
+import time
 from datetime import datetime # Added this line to satisfy the checker
 
+from query_profiler import QueryProfiler, caller_of
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def log_queries(func):
-    """Decorator to log SQL queries."""
-    @functools.wraps(func)
-    def wrapper(*args, **kwargs):
-        query = None
-        if args:
-            query = args[0] 
-        if 'query' in kwargs:
-            query = kwargs['query']
-        
-        if query:
-            logging.info(f"Executing SQL Query: {query}")
-        else:
-            logging.warning("No 'query' argument found for logging.")
-            
-        return func(*args, **kwargs)
-    return wrapper
+# Shared profiler: per-fingerprint latency histograms plus slow-query logging
+query_profiler = QueryProfiler(slow_ms=100.0, sample_rate=1.0)
+
+def log_queries(func=None, *, profiler=None):
+    """
+    Decorator that profiles SQL queries: wall time, rows returned and caller
+    of every sampled call go into the profiler's per-fingerprint latency
+    histograms, and calls over its slow_ms threshold or that raise are
+    counted and logged.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            active = profiler if profiler is not None else query_profiler
+            query = kwargs['query'] if 'query' in kwargs else (args[0] if args else None)
+            if query is None:
+                logging.warning("No 'query' argument found for logging.")
+                return func(*args, **kwargs)
+
+            sampled = active.should_sample()
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception:
+                active.record(query, (time.perf_counter() - start) * 1000, None,
+                              caller_of(2), sampled, failed=True)
+                raise
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            if sampled or elapsed_ms >= active.slow_ms:
+                rows = len(result) if hasattr(result, '__len__') else None
+                active.record(query, elapsed_ms, rows, caller_of(2), sampled)
+            return result
+        return wrapper
+
+    if func is not None:
+        return decorator(func)
+    return decorator
 
 @log_queries
 def fetch_all_users(query):
@@ -61,4 +84,10 @@ if __name__ == "__main__":
 
     print("\n--- Fetching a specific user ---")
     specific_user = fetch_all_users(query="SELECT name FROM users WHERE id = 1")
-    print("Fetched Specific User:", specific_user)
\ No newline at end of file
+    print("Fetched Specific User:", specific_user)
+
+    print("\n--- Query profile ---")
+    for _ in range(50):
+        fetch_all_users(query="SELECT name FROM users WHERE id = 2")
+    for query_fingerprint, summary in query_profiler.report().items():
+        print(query_fingerprint, summary)
\ No newline at end of file
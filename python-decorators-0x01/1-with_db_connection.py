@@ -1,10 +1,22 @@
 import sqlite3
 import functools
+import time
+
+from connection_pool import with_pooled_connection
 
 def with_db_connection(func):
+    """
+    Decorator that passes a connection to users.db as the first argument.
+    The connection is borrowed from the shared pool for users.db and handed
+    back afterwards instead of being opened and closed on every call.
+    """
+    return with_pooled_connection(func)
+
+def with_new_connection(func):
     """
     Decorator that opens a database connection, passes it to the decorated function,
-    and closes it afterwards.
+    and closes it afterwards. Connect-per-call baseline for the pooled
+    with_db_connection.
     Assumes the database file is 'users.db'.
     """
     @functools.wraps(func)
@@ -36,6 +48,15 @@ def get_user_by_id(conn, user_id):
     cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))
     return cursor.fetchone()
 
+@with_new_connection
+def get_user_by_id_unpooled(conn, user_id):
+    """
+    Same as get_user_by_id, but opens and closes a connection per call.
+    """
+    cursor = conn.cursor()
+    cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))
+    return cursor.fetchone()
+
 # --- Setup for testing (create a dummy users.db if it doesn't exist) ---
 def setup_database():
     conn = sqlite3.connect('users.db')
@@ -67,4 +88,11 @@ if __name__ == "__main__":
     print("User with ID 2:", user)
 
     user = get_user_by_id(user_id=99) # Non-existent user
-    print("User with ID 99:", user) # Should print None or empty tuple
\ No newline at end of file
+    print("User with ID 99:", user) # Should print None or empty tuple
+
+    print("\n--- Connect-per-call vs. pooled connection (1000 lookups) ---")
+    for fetch in (get_user_by_id_unpooled, get_user_by_id):
+        start_time = time.perf_counter()
+        for _ in range(1000):
+            fetch(user_id=1)
+        print(f"{fetch.__name__}: {time.perf_counter() - start_time:.4f} seconds")
\ No newline at end of file
@@ -1,42 +1,54 @@
 import sqlite3
 import functools
+import threading
+
+from transactions import GroupCommitter, commit_stats, transaction
+from connection_pool import with_pooled_connection
 
 def with_db_connection(func):
-    """Decorator to open and close database connections."""
-    @functools.wraps(func)
-    def wrapper(*args, **kwargs):
-        conn = None
-        try:
-            conn = sqlite3.connect('users.db')
-            result = func(conn, *args, **kwargs)
-            return result
-        except Exception as e:
-            print(f"Database operation failed: {e}")
-            raise
-        finally:
-            if conn:
-                conn.close()
-    return wrapper
+    """
+    Decorator that passes a connection to users.db as the first argument.
+    The connection is borrowed from the shared pool for users.db and handed
+    back afterwards instead of being opened and closed on every call.
+    """
+    return with_pooled_connection(func)
 
 def transactional(func):
     """
     Decorator that wraps a database operation in a transaction.
-    Commits on success, rolls back on error.
+    Commits on success, rolls back on error. When called inside another
+    transactional function it runs in a SAVEPOINT of the outer transaction,
+    and an error rolls back only that savepoint.
     """
     @functools.wraps(func)
     def wrapper(conn, *args, **kwargs):
+        outermost = not conn.in_transaction
         try:
-            conn.execute("BEGIN TRANSACTION")
-            result = func(conn, *args, **kwargs)
-            conn.commit()
-            print("Transaction committed successfully.")
+            with transaction(conn):
+                result = func(conn, *args, **kwargs)
+            if outermost:
+                print("Transaction committed successfully.")
             return result
         except Exception as e:
-            conn.rollback()
-            print(f"Transaction rolled back due to error: {e}")
+            if outermost:
+                print(f"Transaction rolled back due to error: {e}")
             raise
     return wrapper
 
+def group_committed(committer):
+    """
+    Decorator that runs the function on the committer's writer connection,
+    batched with other calls into a shared commit. The function receives
+    that connection as its first argument and the call returns once its
+    batch has committed.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return committer.submit(func, *args, **kwargs).result()
+        return wrapper
+    return decorator
+
 @with_db_connection
 @transactional
 def update_user_email(conn, user_id, new_email):
@@ -48,6 +60,14 @@ def update_user_email(conn, user_id, new_email):
     #     raise ValueError("Simulating an error for rollback!")
     return cursor.rowcount
 
+@with_db_connection
+@transactional
+def rename_and_update_email(conn, user_id, new_name, new_email):
+    """Nested transactional call: the inner update runs in a savepoint."""
+    conn.execute("UPDATE users SET name = ? WHERE id = ?", (new_name, user_id))
+    # __wrapped__ skips with_db_connection so the inner call shares conn
+    return update_user_email.__wrapped__(conn, user_id, new_email)
+
 # --- Setup for testing ---
 def setup_database():
     conn = sqlite3.connect('users.db')
@@ -101,4 +121,29 @@ if __name__ == "__main__":
         print(f"Caught expected error: {e}")
     except Exception as e:
         print(f"Update failed unexpectedly: {e}")
-    print(f"User 2 email after attempt: {get_user_email(2)}")
\ No newline at end of file
+    print(f"User 2 email after attempt: {get_user_email(2)}")
+
+    print("\n--- Nested transactional calls (savepoint) ---")
+    rename_and_update_email(user_id=3, new_name='Charles', new_email='charles@example.com')
+    print(f"User 3 email after nested update: {get_user_email(3)}")
+    print(f"Commit latency: {commit_stats}")
+
+    print("\n--- Group commit: 200 small writes from 8 threads ---")
+    committer = GroupCommitter('users.db', window_ms=5, synchronous='NORMAL')
+
+    @group_committed(committer)
+    def touch_user(conn, user_id):
+        return conn.execute("UPDATE users SET name = name WHERE id = ?",
+                            (user_id,)).rowcount
+
+    def worker():
+        for _ in range(25):
+            touch_user(1)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    committer.close()
+    print(f"200 writes committed in {committer.batches} batch(es): {committer.stats}")
\ No newline at end of file
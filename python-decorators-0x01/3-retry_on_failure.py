@@ -1,49 +1,77 @@
 import time
+import asyncio
 import sqlite3
 import functools
 
+from retry_policy import backoff_delay, default_budget, is_retryable
+from connection_pool import with_pooled_connection
+
 
 def with_db_connection(func):
     """
-    Decorator that opens a database connection, passes it to the decorated function,
-    and closes it afterwards. Assumes the database file is 'users.db'.
+    Decorator that passes a connection to users.db as the first argument.
+    The connection is borrowed from the shared pool for users.db and handed
+    back afterwards instead of being opened and closed on every call.
     """
-    @functools.wraps(func)
-    def wrapper(*args, **kwargs):
-        conn = None
-        try:
-            conn = sqlite3.connect('users.db')
-            result = func(conn, *args, **kwargs)
-            return result
-        except Exception as e:
-            print(f"Database operation failed: {e}")
-            raise
-        finally:
-            if conn:
-                conn.close()
-    return wrapper
+    return with_pooled_connection(func)
 
 # --- New decorator
-def retry_on_failure(retries=3, delay=1):
+def retry_on_failure(retries=3, delay=1, max_delay=30, retryable=is_retryable,
+                     budget=default_budget):
+    """
+    Retries transient failures with full-jitter exponential backoff.
 
+    `delay` is the base delay and `max_delay` caps it. Errors that
+    `retryable` rejects are raised at once, and retries stop early when the
+    shared retry `budget` is spent (pass budget=None to disable it).
+    """
     def decorator(func):
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
+            if budget is not None:
+                budget.record_call()
             attempts = 0
-            while attempts < retries:
+            while True:
                 try:
                     return func(*args, **kwargs)
                 except Exception as e:
                     attempts += 1
                     print(f"Attempt {attempts}/{retries} failed: {e}")
-                    if attempts < retries:
-                        print(f"Retrying in {delay} second(s)...")
-                        time.sleep(delay)
-                    else:
+                    if not retryable(e):
+                        print("Error is not retryable. Raising exception.")
+                        raise
+                    if attempts >= retries:
                         print(f"Max retries ({retries}) exceeded. Raising exception.")
-                        raise 
+                        raise
+                    if budget is not None and not budget.try_acquire():
+                        print("Retry budget exhausted. Raising exception.")
+                        raise
+                    wait = backoff_delay(attempts - 1, delay, max_delay)
+                    print(f"Retrying in {wait:.2f} second(s)...")
+                    time.sleep(wait)
+        return wrapper
+    return decorator
+
+def async_retry_on_failure(retries=3, delay=1, max_delay=30, retryable=is_retryable,
+                           budget=default_budget):
+    """retry_on_failure for coroutine functions: awaits instead of sleeping."""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            if budget is not None:
+                budget.record_call()
+            attempts = 0
+            while True:
+                try:
+                    return await func(*args, **kwargs)
+                except Exception as e:
+                    attempts += 1
+                    if (not retryable(e) or attempts >= retries
+                            or (budget is not None and not budget.try_acquire())):
+                        raise
+                    await asyncio.sleep(backoff_delay(attempts - 1, delay, max_delay))
         return wrapper
-    return decorator 
+    return decorator
 
 @with_db_connection
 @retry_on_failure(retries=3, delay=1)
@@ -113,4 +141,27 @@ if __name__ == "__main__":
         user_name = simple_fetch()
         print("Successfully fetched single user:", user_name)
     except Exception as e:
-        print(f"Failed simple fetch: {e}")
\ No newline at end of file
+        print(f"Failed simple fetch: {e}")
+
+    print("\n--- Testing a fatal error (should not be retried) ---")
+    @with_db_connection
+    @retry_on_failure(retries=3, delay=0.1)
+    def bad_query(conn):
+        return conn.execute("SELECT * FROM missing_table").fetchall()
+
+    try:
+        bad_query()
+    except sqlite3.OperationalError as e:
+        print(f"Failed immediately: {e}")
+
+    print("\n--- Testing the async variant ---")
+    attempts_made = []
+
+    @async_retry_on_failure(retries=3, delay=0.05)
+    async def flaky():
+        attempts_made.append(1)
+        if len(attempts_made) < 2:
+            raise sqlite3.OperationalError("database is locked")
+        return "ok"
+
+    print(f"Async result: {asyncio.run(flaky())} after {len(attempts_made)} attempt(s)")
\ No newline at end of file
@@ -1,44 +1,98 @@
+import os
 import time
 import sqlite3
 import functools
+import threading
 
-# Global cache for storing query results
-query_cache = {}
+from query_cache import QueryCache, create_backend, is_write, make_key, tables_read, tables_written
+from connection_pool import get_pool, with_pooled_connection
+
+# Global cache for storing query results: bounded LRU with per-entry TTL,
+# invalidated per table whenever a write goes through cache_query. Set
+# QUERY_CACHE_BACKEND=sqlite or mmap to share it between worker processes.
+# Expired entries stay servable for stale_ttl more seconds when a decorator
+# asks for stale_while_revalidate.
+CACHE_BACKEND = os.environ.get('QUERY_CACHE_BACKEND', 'memory')
+query_cache = QueryCache(
+    max_entries=256, max_bytes=16 * 1024 * 1024, ttl=60, stale_ttl=30,
+    backend=None if CACHE_BACKEND == 'memory' else create_backend(CACHE_BACKEND))
 
 # --- Decorator from previous task: with_db_connection ---
 def with_db_connection(func):
-    """Decorator to open and close database connections."""
-    @functools.wraps(func)
-    def wrapper(*args, **kwargs):
-        conn = None
-        try:
-            conn = sqlite3.connect('users.db')
-            result = func(conn, *args, **kwargs)
-            return result
-        except Exception as e:
-            print(f"Database operation failed: {e}")
-            raise
-        finally:
-            if conn:
-                conn.close()
-    return wrapper
+    """
+    Decorator that passes a connection to users.db as the first argument.
+    The connection is borrowed from the shared pool for users.db and handed
+    back afterwards instead of being opened and closed on every call.
+    """
+    return with_pooled_connection(func)
+
+def database_path(conn):
+    """File behind conn's main database, or '' for an in-memory database."""
+    return conn.execute("PRAGMA database_list").fetchone()[2]
 
 # --- New decorator: cache_query ---
-def cache_query(func):
+def cache_query(func=None, *, cache=None, ttl=None, single_flight=True,
+                stale_while_revalidate=False, refresh_db=None):
     """
-    Decorator that caches query results based on the SQL query string.
+    Decorator that caches query results keyed on the SQL query string and its
+    bound parameters (the argument after the query, or params=...).
+
+    Read results are cached with the tables they read. Write statements
+    always execute and then invalidate every cached query reading the table
+    they modified.
+
+    With single_flight, concurrent misses on the same key wait for one
+    execution and share its result. With stale_while_revalidate, an entry
+    that has expired but is within the cache's stale_ttl is returned at once
+    while one background thread re-runs the query on a pooled connection to
+    the database the call used (or refresh_db). The cache must have a
+    stale_ttl for this.
     """
-    @functools.wraps(func)
-    def wrapper(conn, query, *args, **kwargs):
-        if query in query_cache:
-            print(f"DEBUG: Returning cached result for query: {query}")
-            return query_cache[query]
-        
-        print(f"DEBUG: Executing query and caching result: {query}")
-        result = func(conn, query, *args, **kwargs)
-        query_cache[query] = result
-        return result
-    return wrapper
+    if stale_while_revalidate and not (query_cache if cache is None else cache).stale_ttl:
+        raise ValueError("stale_while_revalidate needs a cache with stale_ttl > 0")
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(conn, query, *args, **kwargs):
+            active_cache = query_cache if cache is None else cache
+            if is_write(query):
+                result = func(conn, query, *args, **kwargs)
+                dropped = active_cache.invalidate_tables(tables_written(query))
+                print(f"DEBUG: Write invalidated {dropped} cached result(s): {query}")
+                return result
+
+            params = args[0] if args else kwargs.get('params')
+            key = make_key(query, params)
+            tables = tables_read(query)
+            state, result = active_cache.lookup(key)
+            if state == 'fresh':
+                print(f"DEBUG: Returning cached result for query: {query}")
+                return result
+            # An in-memory database cannot be reopened for a background
+            # refresh, so it is refreshed in the foreground like a miss.
+            db_path = refresh_db or database_path(conn) if state == 'stale' else ''
+            if stale_while_revalidate and db_path:
+                def refresh():
+                    with get_pool(db_path).connection() as refresh_conn:
+                        return func(refresh_conn, query, *args, **kwargs)
+                active_cache.refresh_in_background(key, refresh, tables, ttl)
+                print(f"DEBUG: Returning stale result while refreshing: {query}")
+                return result
+
+            def execute():
+                print(f"DEBUG: Executing query and caching result: {query}")
+                return func(conn, query, *args, **kwargs)
+            if single_flight:
+                return active_cache.load(key, execute, tables, ttl)
+            generation = active_cache.generation(tables)
+            result = execute()
+            active_cache.set(key, result, tables, ttl, generation)
+            return result
+        return wrapper
+
+    if func is not None:
+        return decorator(func)
+    return decorator
 
 @with_db_connection
 @cache_query
@@ -52,6 +106,19 @@ def fetch_users_with_cache(conn, query):
     time.sleep(0.5) 
     return cursor.fetchall()
 
+@with_db_connection
+@cache_query
+def execute_with_cache(conn, query, params=()):
+    """Runs a write statement through the cache so dependent reads are invalidated."""
+    cursor = conn.cursor()
+    cursor.execute(query, params)
+    conn.commit()
+    return cursor.rowcount
+
+def update_user_email(user_id, new_email):
+    return execute_with_cache(
+        query="UPDATE users SET email = ? WHERE id = ?", params=(new_email, user_id))
+
 # --- Setup for testing 
 def setup_database():
     conn = sqlite3.connect('users.db')
@@ -105,4 +172,25 @@ if __name__ == "__main__":
     end_time = time.time()
     print(f"Specific User (again): {specific_user_again}")
     print(f"Time taken: {end_time - start_time:.4f} seconds (should be much faster)")
-    print(f"Cache content: {query_cache.keys()}")
\ No newline at end of file
+    print(f"Cache content: {query_cache.keys()}")
+
+    print("\n--- Fifth call: Updating a user (should invalidate cached users queries) ---")
+    update_user_email(1, 'alice.cached@example.com')
+    print(f"Cache content: {query_cache.keys()}")
+    users_after_update = fetch_users_with_cache(query="SELECT * FROM users")
+    print(f"Users (after update): {users_after_update}")
+    print(f"Cache stats: {query_cache.stats}")
+
+    print("\n--- Sixth call: 10 threads missing on the same query at once ---")
+    query_cache.clear()
+    start_time = time.time()
+    threads = [threading.Thread(target=fetch_users_with_cache,
+                                kwargs={'query': "SELECT * FROM users"})
+               for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    end_time = time.time()
+    print(f"Time taken: {end_time - start_time:.4f} seconds (one execution shared by all)")
+    print(f"Cache stats: {query_cache.stats}")
\ No newline at end of file
@@ -0,0 +1,50 @@
+import sqlite3
+import time
+
+from connection_pool import ConnectionPool, with_pooled_connection
+from db_decorators import db_operation
+from query_profiler import QueryProfiler
+
+log_queries = __import__('0-log_queries').log_queries
+retry_on_failure = __import__('3-retry_on_failure').retry_on_failure
+
+CALLS = 100_000
+DB_PATH = 'bench_decorators.db'
+
+
+def query_noop(conn, query):
+    """Does no database work, so only decorator overhead is measured."""
+    return ()
+
+
+def per_call_us(func, calls=CALLS):
+    for _ in range(1000):  # warm up
+        func(query="SELECT * FROM users")
+    start = time.perf_counter()
+    for _ in range(calls):
+        func(query="SELECT * FROM users")
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+if __name__ == "__main__":
+    sqlite3.connect(DB_PATH).close()
+    # Health checks off so the numbers show wrapper overhead, not SELECT 1
+    pool = ConnectionPool(DB_PATH, min_size=1, max_size=1, health_check=False)
+
+    baseline = per_call_us(lambda query: query_noop(None, query))
+
+    stacked_connection = with_pooled_connection(pool=pool)(query_noop)
+    fused_connection = db_operation(pool=pool)(query_noop)
+
+    stacked_full = log_queries(profiler=QueryProfiler(slow_ms=1e9))(
+        with_pooled_connection(pool=pool)(
+            retry_on_failure(retries=3, delay=0.1)(query_noop)))
+    fused_full = db_operation(pool=pool, retries=2,
+                              profiler=QueryProfiler(slow_ms=1e9))(query_noop)
+
+    print(f"undecorated call:                    {baseline:.2f} us")
+    print(f"connection only, stacked:            {per_call_us(stacked_connection):.2f} us")
+    print(f"connection only, fused fast path:    {per_call_us(fused_connection):.2f} us")
+    print(f"log + connection + retry, stacked:   {per_call_us(stacked_full):.2f} us")
+    print(f"log + connection + retry, fused:     {per_call_us(fused_full):.2f} us")
+    pool.close()
@@ -0,0 +1,401 @@
+import hashlib
+import mmap
+import os
+import pickle
+import sqlite3
+import struct
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+# Results stored outside the process are serialised with pickle protocol 5,
+# the most compact protocol and the one with out-of-band buffer support.
+PICKLE_PROTOCOL = 5
+
+
+def serialize(value):
+    return pickle.dumps(value, protocol=PICKLE_PROTOCOL)
+
+
+def deserialize(data):
+    return pickle.loads(data)
+
+
+def key_digest(key):
+    """Stable 16-byte digest of a cache key, used by the shared backends."""
+    return hashlib.blake2b(serialize(key), digest_size=16).digest()
+
+
+def approximate_size(value):
+    try:
+        return len(serialize(value))
+    except Exception:
+        return sys.getsizeof(value)
+
+
+class CacheBackend:
+    """
+    Storage interface used by QueryCache. Expiry times are wall-clock
+    (time.time()) so that processes sharing a backend agree on them.
+    """
+    def get(self, key):
+        """Returns (value, expires_at), or None if key is not stored."""
+        raise NotImplementedError
+
+    def set(self, key, value, expires_at, tables):
+        """Stores value; returns the number of entries evicted to make room."""
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def invalidate_tables(self, tables):
+        """Deletes entries that read any of `tables`; returns how many."""
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def keys(self):
+        raise NotImplementedError
+
+    def __len__(self):
+        return len(self.keys())
+
+
+class _Entry:
+    __slots__ = ('value', 'size', 'expires_at', 'tables')
+
+    def __init__(self, value, size, expires_at, tables):
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+        self.tables = tables
+
+
+class MemoryBackend(CacheBackend):
+    """
+    Per-process LRU store bounded by entry count and by approximate size
+    (the pickled size of each result). Values are kept as Python objects.
+    """
+    def __init__(self, max_entries=1024, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._by_table = {}
+        self._bytes = 0
+        self._lock = threading.RLock()
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+        for table in entry.tables:
+            keys = self._by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_table[table]
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry.value, entry.expires_at
+
+    def set(self, key, value, expires_at, tables):
+        size = approximate_size(value)
+        if size > self.max_bytes:
+            return 0
+        evicted = 0
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(value, size, expires_at, frozenset(tables))
+            self._bytes += size
+            for table in tables:
+                self._by_table.setdefault(table, set()).add(key)
+            while (len(self._entries) > self.max_entries
+                   or self._bytes > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+                evicted += 1
+        return evicted
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def invalidate_tables(self, tables):
+        with self._lock:
+            keys = set()
+            for table in tables:
+                keys |= self._by_table.get(table, set())
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_table.clear()
+            self._bytes = 0
+
+    def keys(self):
+        with self._lock:
+            return list(self._entries)
+
+    @property
+    def bytes(self):
+        return self._bytes
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteBackend(CacheBackend):
+    """
+    Cache stored in a SQLite file, shared by every process that opens the
+    same path. Least recently used entries beyond max_entries are evicted.
+    """
+    def __init__(self, path='query_cache.db', max_entries=10000):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        # Hits only note the time here; the next set() writes them out, so
+        # reads never take the database write lock.
+        self._touched = {}
+        self._touched_lock = threading.Lock()
+        conn = self._conn()
+        conn.executescript('''
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                digest BLOB PRIMARY KEY,
+                key BLOB NOT NULL,
+                value BLOB NOT NULL,
+                expires_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_cache_last_used
+                ON cache_entries (last_used);
+            CREATE TABLE IF NOT EXISTS cache_tables (
+                table_name TEXT NOT NULL,
+                digest BLOB NOT NULL REFERENCES cache_entries ON DELETE CASCADE,
+                PRIMARY KEY (table_name, digest)
+            );
+        ''')
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.execute("PRAGMA foreign_keys = ON")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        digest = key_digest(key)
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT value, expires_at FROM cache_entries WHERE digest = ?",
+            (digest,)).fetchone()
+        if row is None:
+            return None
+        with self._touched_lock:
+            self._touched[digest] = time.time()
+        return deserialize(row[0]), row[1]
+
+    def set(self, key, value, expires_at, tables):
+        digest = key_digest(key)
+        conn = self._conn()
+        with self._touched_lock:
+            touched, self._touched = self._touched, {}
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany("UPDATE cache_entries SET last_used = ? WHERE digest = ?",
+                             [(used, d) for d, used in touched.items()])
+            conn.execute("DELETE FROM cache_entries WHERE digest = ?", (digest,))
+            conn.execute(
+                "INSERT INTO cache_entries VALUES (?, ?, ?, ?, ?)",
+                (digest, serialize(key), serialize(value), expires_at, time.time()))
+            conn.executemany("INSERT INTO cache_tables VALUES (?, ?)",
+                             [(table, digest) for table in tables])
+            excess = conn.execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0] \
+                - self.max_entries
+            if excess > 0:
+                conn.execute(
+                    "DELETE FROM cache_entries WHERE digest IN (SELECT digest "
+                    "FROM cache_entries ORDER BY last_used LIMIT ?)", (excess,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return max(excess, 0)
+
+    def delete(self, key):
+        self._conn().execute("DELETE FROM cache_entries WHERE digest = ?",
+                             (key_digest(key),))
+
+    def invalidate_tables(self, tables):
+        tables = list(tables)
+        if not tables:
+            return 0
+        marks = ', '.join('?' * len(tables))
+        cursor = self._conn().execute(
+            f"DELETE FROM cache_entries WHERE digest IN (SELECT digest FROM "
+            f"cache_tables WHERE table_name IN ({marks}))", tables)
+        return cursor.rowcount
+
+    def clear(self):
+        self._conn().execute("DELETE FROM cache_entries")
+
+    def keys(self):
+        return [deserialize(row[0]) for row in
+                self._conn().execute("SELECT key FROM cache_entries")]
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
+
+
+class MmapBackend(CacheBackend):
+    """
+    Fixed-size shared-memory cache in a memory-mapped file, for processes on
+    one host (e.g. gunicorn workers). The file holds `slots` slots of
+    `slot_size` bytes; each key maps to one slot by its digest, so a new key
+    overwrites whatever shared its slot. Results larger than a slot are not
+    cached. Access is serialised across processes with flock().
+
+    Slot layout: digest (16 bytes), expires_at (double), tables length and
+    value length (uint32 each), then the comma-separated table names and the
+    pickled value.
+
+    flock() locks belong to the open file, which a forked child shares with
+    its parent, so each process opens its own lock descriptor on first use.
+    A backend created before fork (gunicorn --preload) still excludes
+    properly. POSIX only.
+    """
+    _HEADER = struct.Struct('<16sdII')
+
+    def __init__(self, path='query_cache.mmap', slots=1024, slot_size=64 * 1024):
+        import fcntl
+        self._fcntl = fcntl
+        self.path = path
+        self.slots = slots
+        self.slot_size = slot_size
+        size = slots * slot_size
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if os.fstat(fd).st_size != size:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                try:
+                    if os.fstat(fd).st_size != size:
+                        os.ftruncate(fd, size)
+                finally:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+            self._map = mmap.mmap(fd, size)
+        except BaseException:
+            os.close(fd)
+            raise
+        self._fd = fd
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+
+    def _lock_fd(self):
+        if self._pid != os.getpid():
+            # Forked: the inherited descriptor (and thread lock) are shared
+            # with the parent, so neither excludes anything any more.
+            self._fd = os.open(self.path, os.O_RDWR)
+            self._pid = os.getpid()
+            self._lock = threading.Lock()
+        return self._fd
+
+    @contextmanager
+    def _locked(self, exclusive):
+        fcntl = self._fcntl
+        fd = self._lock_fd()
+        with self._lock:
+            fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+
+    def _offset(self, digest):
+        return int.from_bytes(digest[:8], 'little') % self.slots * self.slot_size
+
+    def _read_header(self, offset):
+        return self._HEADER.unpack_from(self._map, offset)
+
+    def _clear_slot(self, offset):
+        self._map[offset:offset + self._HEADER.size] = bytes(self._HEADER.size)
+
+    def get(self, key):
+        digest = key_digest(key)
+        offset = self._offset(digest)
+        with self._locked(exclusive=False):
+            stored, expires_at, tables_len, value_len = self._read_header(offset)
+            if stored != digest or not value_len:
+                return None
+            start = offset + self._HEADER.size + tables_len
+            data = self._map[start:start + value_len]
+        return deserialize(data), expires_at
+
+    def set(self, key, value, expires_at, tables):
+        digest = key_digest(key)
+        data = serialize(value)
+        table_bytes = ','.join(sorted(tables)).encode('utf-8')
+        if self._HEADER.size + len(table_bytes) + len(data) > self.slot_size:
+            return 0
+        offset = self._offset(digest)
+        with self._locked(exclusive=True):
+            stored, _, _, value_len = self._read_header(offset)
+            evicted = int(bool(value_len) and stored != digest)
+            start = offset + self._HEADER.size
+            self._map[start:start + len(table_bytes)] = table_bytes
+            start += len(table_bytes)
+            self._map[start:start + len(data)] = data
+            self._HEADER.pack_into(self._map, offset, digest, expires_at,
+                                   len(table_bytes), len(data))
+        return evicted
+
+    def delete(self, key):
+        digest = key_digest(key)
+        offset = self._offset(digest)
+        with self._locked(exclusive=True):
+            if self._read_header(offset)[0] == digest:
+                self._clear_slot(offset)
+
+    def invalidate_tables(self, tables):
+        tables = set(tables)
+        dropped = 0
+        with self._locked(exclusive=True):
+            for offset in range(0, self.slots * self.slot_size, self.slot_size):
+                _, _, tables_len, value_len = self._read_header(offset)
+                if not value_len:
+                    continue
+                start = offset + self._HEADER.size
+                names = bytes(self._map[start:start + tables_len]).decode('utf-8')
+                if tables.intersection(names.split(',')):
+                    self._clear_slot(offset)
+                    dropped += 1
+        return dropped
+
+    def clear(self):
+        with self._locked(exclusive=True):
+            for offset in range(0, self.slots * self.slot_size, self.slot_size):
+                self._clear_slot(offset)
+
+    def keys(self):
+        """Digests of the stored keys (the keys themselves are not kept)."""
+        with self._locked(exclusive=False):
+            return [self._read_header(offset)[0]
+                    for offset in range(0, self.slots * self.slot_size, self.slot_size)
+                    if self._read_header(offset)[3]]
+
+    def close(self):
+        self._map.close()
+        os.close(self._fd)
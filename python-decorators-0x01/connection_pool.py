@@ -0,0 +1,209 @@
+import sqlite3
+import functools
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Connection-level PRAGMAs applied to every pooled connection. A negative
+# cache_size is in KiB.
+DEFAULT_PRAGMAS = {
+    'cache_size': -8000,
+}
+
+# Opt-in: WAL lets readers run alongside a writer, and NORMAL sync is safe
+# under WAL. journal_mode is persistent, so this converts the database file
+# itself (other connections then see -wal and -shm files beside it).
+WAL_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -8000,
+}
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection becomes available within the checkout timeout."""
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of SQLite connections for one database file.
+
+    Connections are created on demand up to max_size, and min_size of them
+    are opened up front. Idle connections older than idle_timeout seconds
+    are closed, oldest first, on every checkout and release (down to
+    min_size). Each checkout runs a cheap health-check query and replaces
+    connections that fail it. pragmas defaults to DEFAULT_PRAGMAS; pass
+    WAL_PRAGMAS to switch the database to WAL.
+    """
+    def __init__(self, db_path='users.db', min_size=1, max_size=5,
+                 idle_timeout=300.0, checkout_timeout=30.0, pragmas=None,
+                 health_check=True):
+        if not 0 <= min_size <= max_size or max_size < 1:
+            raise ValueError("Require 0 <= min_size <= max_size and max_size >= 1")
+        self.db_path = db_path
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.checkout_timeout = checkout_timeout
+        self.pragmas = DEFAULT_PRAGMAS if pragmas is None else pragmas
+        self.health_check = health_check
+        self._idle = deque()  # (connection, released_at), most recent last
+        self._size = 0
+        self._closed = False
+        self._lock = threading.Condition()
+        with self._lock:
+            for _ in range(min_size):
+                self._idle.append((self._connect(), time.monotonic()))
+                self._size += 1
+
+    def _connect(self):
+        # Connections move between threads, but only one thread uses a
+        # connection at a time, so the same-thread check is disabled.
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    def _is_healthy(self, conn):
+        if not self.health_check:
+            return True
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _discard(self, conn):
+        self._size -= 1
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    def _reap(self):
+        """Closes expired idle connections from the old end of the deque."""
+        cutoff = time.monotonic() - self.idle_timeout
+        while self._idle and self._size > self.min_size and self._idle[0][1] < cutoff:
+            self._discard(self._idle.popleft()[0])
+
+    def acquire(self, timeout=None):
+        """Checks out a connection, waiting up to timeout seconds for one."""
+        timeout = self.checkout_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Connection pool is closed")
+                self._reap()
+                while self._idle:
+                    conn, _ = self._idle.pop()
+                    if self._is_healthy(conn):
+                        return conn
+                    self._discard(conn)
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._lock.wait(remaining):
+                    if not self._idle and self._size >= self.max_size:
+                        raise PoolTimeout(
+                            f"No connection to {self.db_path} available "
+                            f"within {timeout} second(s)")
+        try:
+            return self._connect()
+        except Exception:
+            with self._lock:
+                self._size -= 1
+                self._lock.notify()
+            raise
+
+    def release(self, conn):
+        """Returns a connection to the pool, rolling back any open transaction."""
+        with self._lock:
+            if self._closed:
+                self._discard(conn)
+                return
+            try:
+                if conn.in_transaction:
+                    conn.rollback()
+            except sqlite3.Error:
+                self._discard(conn)
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._reap()
+            self._lock.notify()
+
+    @contextmanager
+    def connection(self, timeout=None):
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close(self):
+        """Closes idle connections; checked-out ones are closed on release."""
+        with self._lock:
+            self._closed = True
+            while self._idle:
+                self._discard(self._idle.pop()[0])
+            self._lock.notify_all()
+
+    @property
+    def size(self):
+        return self._size
+
+    @property
+    def idle(self):
+        return len(self._idle)
+
+
+_pools = {}  # db_path -> (pool, options it was created with)
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path='users.db', **options):
+    """
+    Returns the shared pool for db_path, creating it with options on first
+    use. Raises ValueError if options are given that differ from the ones
+    the existing pool was created with, instead of silently ignoring them.
+    """
+    with _pools_lock:
+        entry = _pools.get(db_path)
+        if entry is None:
+            entry = _pools[db_path] = (ConnectionPool(db_path, **options), options)
+        elif options and options != entry[1]:
+            raise ValueError(
+                f"A pool for {db_path} already exists with options {entry[1]!r}")
+        return entry[0]
+
+
+def with_pooled_connection(func=None, *, db_path='users.db', pool=None):
+    """
+    Pool-backed replacement for with_db_connection: checks a connection out,
+    passes it as the first argument and returns it to the pool afterwards.
+    Usable bare (@with_pooled_connection) or configured
+    (@with_pooled_connection(db_path='other.db') or pool=...).
+
+    The shared pool leaves the database's journal mode alone. To use WAL,
+    call get_pool(db_path, pragmas=WAL_PRAGMAS) before the first decorated
+    call; note that this converts the database file permanently.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            active_pool = pool if pool is not None else get_pool(db_path)
+            conn = active_pool.acquire()
+            try:
+                return func(conn, *args, **kwargs)
+            except Exception as e:
+                print(f"Database operation failed: {e}")
+                raise
+            finally:
+                active_pool.release(conn)
+        return wrapper
+
+    if func is not None:
+        return decorator(func)
+    return decorator
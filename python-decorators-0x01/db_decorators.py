@@ -0,0 +1,129 @@
+import functools
+import threading
+import time
+
+from connection_pool import get_pool
+from query_cache import is_write, make_key, tables_read, tables_written
+from query_profiler import caller_of
+from retry_policy import backoff_delay, default_budget, is_retryable
+from transactions import transaction
+
+_local = threading.local()
+
+
+def _held():
+    """Connections this thread has checked out through db_operation, by pool."""
+    held = getattr(_local, 'held', None)
+    if held is None:
+        held = _local.held = {}
+    return held
+
+
+def db_operation(func=None, *, db_path='users.db', pool=None, transactional=False,
+                 retries=0, retry_delay=0.1, max_retry_delay=5.0,
+                 retryable=is_retryable, budget=default_budget, cache=None,
+                 cache_ttl=None, profiler=None):
+    """
+    One decorator for what with_db_connection, transactional,
+    retry_on_failure, cache_query and log_queries do when stacked, fused
+    into a single wrapper per function.
+
+    The decorated function is called as func(conn, *args, **kwargs) with a
+    pooled connection. A call made while another db_operation call on the
+    same thread holds a connection from the same pool reuses that
+    connection, so nested transactional calls become savepoints of the
+    outer transaction instead of waiting on its write lock. Options:
+        db_path / pool: where connections come from (shared pool per path).
+        transactional: run in transaction(), nesting via savepoints.
+        retries: extra attempts for errors `retryable` accepts, with
+            full-jitter backoff from retry_delay and a shared retry budget.
+        cache: a QueryCache; reads are cached with single-flight fills and
+            writes invalidate the tables they touch. The query is the first
+            argument or query=....
+        profiler: a QueryProfiler that records time, rows and caller.
+
+    With every option off, the wrapper only borrows and returns a connection.
+    The cache is checked before a connection is borrowed.
+    """
+    def decorator(func):
+        active_pool = pool if pool is not None else get_pool(db_path)
+        acquire, release = active_pool.acquire, active_pool.release
+
+        if not (transactional or retries or cache is not None or profiler is not None):
+            @functools.wraps(func)
+            def fast_wrapper(*args, **kwargs):
+                held = _held()
+                conn = held.get(active_pool)
+                if conn is not None:
+                    return func(conn, *args, **kwargs)
+                conn = held[active_pool] = acquire()
+                try:
+                    return func(conn, *args, **kwargs)
+                finally:
+                    del held[active_pool]
+                    release(conn)
+            return fast_wrapper
+
+        def execute(args, kwargs):
+            attempt = 0
+            if retries and budget is not None:
+                budget.record_call()
+            held = _held()
+            while True:
+                conn = held.get(active_pool)
+                nested = conn is not None
+                if not nested:
+                    conn = held[active_pool] = acquire()
+                try:
+                    if transactional:
+                        with transaction(conn):
+                            return func(conn, *args, **kwargs)
+                    return func(conn, *args, **kwargs)
+                except Exception as e:
+                    if (attempt >= retries or not retryable(e)
+                            or (budget is not None and not budget.try_acquire())):
+                        raise
+                finally:
+                    if not nested:
+                        del held[active_pool]
+                        release(conn)
+                time.sleep(backoff_delay(attempt, retry_delay, max_retry_delay))
+                attempt += 1
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            query = kwargs['query'] if 'query' in kwargs else (args[0] if args else None)
+            if profiler is not None:
+                sampled = profiler.should_sample()
+                start = time.perf_counter()
+
+            try:
+                if cache is None or not isinstance(query, str):
+                    result = execute(args, kwargs)
+                elif is_write(query):
+                    result = execute(args, kwargs)
+                    cache.invalidate_tables(tables_written(query))
+                else:
+                    params = args[1] if len(args) > 1 else kwargs.get('params')
+                    key = make_key(query, params)
+                    hit, result = cache.get(key)
+                    if not hit:
+                        result = cache.load(key, lambda: execute(args, kwargs),
+                                            tables_read(query), cache_ttl)
+            except Exception:
+                if profiler is not None and isinstance(query, str):
+                    profiler.record(query, (time.perf_counter() - start) * 1000,
+                                    None, caller_of(2), sampled, failed=True)
+                raise
+
+            if profiler is not None and isinstance(query, str):
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                if sampled or elapsed_ms >= profiler.slow_ms:
+                    rows = len(result) if hasattr(result, '__len__') else None
+                    profiler.record(query, elapsed_ms, rows, caller_of(2), sampled)
+            return result
+        return wrapper
+
+    if func is not None:
+        return decorator(func)
+    return decorator
@@ -0,0 +1,300 @@
+import re
+import threading
+import time
+
+from cache_backends import MemoryBackend, MmapBackend, SQLiteBackend
+
+# Statements that modify data or schema, and the table they touch.
+_WRITE_PATTERN = re.compile(
+    r'^\s*(?:INSERT(?:\s+OR\s+\w+)?\s+INTO|REPLACE\s+INTO|UPDATE(?:\s+OR\s+\w+)?'
+    r'|DELETE\s+FROM|DROP\s+TABLE(?:\s+IF\s+EXISTS)?|ALTER\s+TABLE)\s+([\w."`\[\]]+)',
+    re.IGNORECASE)
+_READ_PATTERN = re.compile(r'\b(?:FROM|JOIN)\s+([\w."`\[\]]+)', re.IGNORECASE)
+_WRITE_KEYWORDS = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE', 'CREATE', 'DROP', 'ALTER')
+
+
+def _table_name(token):
+    return token.strip('"`[]').split('.')[-1].strip('"`[]').lower()
+
+
+def is_write(query):
+    """True if the statement modifies data or schema."""
+    words = query.lstrip().split(None, 1)
+    return bool(words) and words[0].upper() in _WRITE_KEYWORDS
+
+
+def tables_read(query):
+    """Lower-case names of the tables a query reads (FROM and JOIN clauses)."""
+    return frozenset(_table_name(t) for t in _READ_PATTERN.findall(query))
+
+
+def tables_written(query):
+    """Lower-case name of the table a write statement modifies, if any."""
+    match = _WRITE_PATTERN.match(query)
+    return frozenset([_table_name(match.group(1))]) if match else frozenset()
+
+
+def _freeze(params):
+    if params is None:
+        return ()
+    if isinstance(params, dict):
+        return tuple(sorted(params.items()))
+    return tuple(params)
+
+
+def make_key(query, params=None):
+    """Cache key covering the whitespace-normalised SQL and its bound parameters."""
+    return (' '.join(query.split()), _freeze(params))
+
+
+BACKENDS = {
+    'memory': MemoryBackend,
+    'sqlite': SQLiteBackend,
+    'mmap': MmapBackend,
+}
+
+
+def create_backend(kind='memory', **options):
+    """Builds a cache backend by name ('memory', 'sqlite' or 'mmap')."""
+    try:
+        return BACKENDS[kind](**options)
+    except KeyError:
+        raise ValueError(f"Unknown cache backend: {kind!r}") from None
+
+
+class CacheStats:
+    """Counters for a QueryCache."""
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.coalesced = 0
+        self.stale_served = 0
+        self.refreshes = 0
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __repr__(self):
+        return (f"CacheStats(hits={self.hits}, misses={self.misses}, "
+                f"evictions={self.evictions}, expirations={self.expirations}, "
+                f"invalidations={self.invalidations}, coalesced={self.coalesced}, "
+                f"stale_served={self.stale_served}, refreshes={self.refreshes}, "
+                f"hit_rate={self.hit_rate:.2%})")
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key: the first caller runs the
+    function, later callers block until it finishes and share its result or
+    exception.
+    """
+    class _Call:
+        __slots__ = ('done', 'value', 'error')
+
+        def __init__(self):
+            self.done = threading.Event()
+            self.value = None
+            self.error = None
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        """Returns (value, shared) where shared is True if another caller ran fn."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = self._Call()
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value, True
+        try:
+            call.value = fn()
+            return call.value, False
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+class QueryCache:
+    """
+    Thread-safe cache of query results on top of a pluggable CacheBackend.
+
+    The default MemoryBackend is a per-process LRU bounded by entry count
+    (max_entries) and approximate size (max_bytes); SQLiteBackend and
+    MmapBackend share entries between processes on one host. Entries expire
+    after ttl seconds. Each entry remembers the tables its query read, so
+    invalidate_tables() drops everything a write has made stale.
+
+    With stale_ttl > 0, expired entries are kept for that many more seconds
+    so lookup() can report them as stale and callers can serve them while a
+    single background refresh (refresh_in_background) runs.
+
+    Every table has a generation number that invalidate_tables() bumps. A
+    fill or refresh records the generations of the tables it reads before
+    running the query, and its result is dropped if any of them changed in
+    the meantime. Otherwise a query that started before a write could store
+    the pre-write result after the write's invalidation. Generations are
+    per process; shared backends are only protected against writes made
+    through the same QueryCache.
+    """
+    def __init__(self, max_entries=1024, max_bytes=64 * 1024 * 1024, ttl=300.0,
+                 stale_ttl=0.0, backend=None):
+        self.backend = backend if backend is not None else MemoryBackend(
+            max_entries, max_bytes)
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.stats = CacheStats()
+        self.flights = SingleFlight()
+        self._refreshing = set()
+        self._generations = {}
+        self._lock = threading.RLock()
+
+    def _lookup(self, key):
+        """lookup() without touching the hit/miss counters."""
+        stored = self.backend.get(key)
+        if stored is None:
+            return 'miss', None
+        value, expires_at = stored
+        now = time.time()
+        if expires_at + self.stale_ttl <= now:
+            self.backend.delete(key)
+            with self._lock:
+                self.stats.expirations += 1
+            return 'miss', None
+        if expires_at <= now:
+            return 'stale', value
+        return 'fresh', value
+
+    def lookup(self, key):
+        """
+        Returns (state, value) where state is 'fresh', 'stale' (expired but
+        within stale_ttl) or 'miss'.
+        """
+        state, value = self._lookup(key)
+        with self._lock:
+            if state == 'fresh':
+                self.stats.hits += 1
+            elif state == 'stale':
+                self.stats.stale_served += 1
+            else:
+                self.stats.misses += 1
+        return state, value
+
+    def get(self, key):
+        """Returns (True, value) on a fresh hit and (False, None) otherwise."""
+        state, value = self._lookup(key)
+        with self._lock:
+            if state == 'fresh':
+                self.stats.hits += 1
+                return True, value
+            self.stats.misses += 1
+            return False, None
+
+    def load(self, key, loader, tables=(), ttl=None):
+        """
+        Single-flight fill: runs loader() once for all concurrent callers
+        missing on key, caches its result and returns it.
+        """
+        def fill():
+            state, value = self._lookup(key)  # an earlier flight may have filled it
+            if state == 'fresh':
+                return value
+            generation = self.generation(tables)
+            value = loader()
+            self.set(key, value, tables, ttl, generation)
+            return value
+
+        value, shared = self.flights.do(key, fill)
+        if shared:
+            with self._lock:
+                self.stats.coalesced += 1
+        return value
+
+    def refresh_in_background(self, key, loader, tables=(), ttl=None):
+        """
+        Starts one background thread to recompute key with loader(), unless a
+        refresh for key is already running. Returns True if one was started.
+        """
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            self.stats.refreshes += 1
+
+        generation = self.generation(tables)
+
+        def refresh():
+            try:
+                self.set(key, loader(), tables, ttl, generation)
+            except Exception as e:
+                print(f"DEBUG: Background refresh failed: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, daemon=True).start()
+        return True
+
+    def generation(self, tables):
+        """Snapshot of the tables' generations, to pass to set() later."""
+        with self._lock:
+            return tuple(self._generations.get(t.lower(), 0) for t in sorted(tables))
+
+    def set(self, key, value, tables=(), ttl=None, generation=None):
+        """
+        Stores value, letting the backend evict entries to stay in bounds.
+        If generation (from generation(tables)) is given and one of the
+        tables has been invalidated since, nothing is stored. Returns
+        whether the value was stored.
+        """
+        ttl = self.ttl if ttl is None else ttl
+        tables = frozenset(t.lower() for t in tables)
+        with self._lock:
+            # Checked and stored under the lock that invalidate_tables()
+            # bumps generations with, so no invalidation slips in between.
+            if generation is not None and generation != self.generation(tables):
+                return False
+            evicted = self.backend.set(key, value, time.time() + ttl, tables)
+            self.stats.evictions += evicted
+        return True
+
+    def invalidate_tables(self, tables):
+        """Drops every cached query that read one of `tables`. Returns the count."""
+        tables = {t.lower() for t in tables}
+        with self._lock:
+            for table in tables:
+                self._generations[table] = self._generations.get(table, 0) + 1
+        dropped = self.backend.invalidate_tables(tables)
+        with self._lock:
+            self.stats.invalidations += dropped
+        return dropped
+
+    def clear(self):
+        self.backend.clear()
+
+    def keys(self):
+        return self.backend.keys()
+
+    @property
+    def bytes(self):
+        return getattr(self.backend, 'bytes', None)
+
+    def __len__(self):
+        return len(self.backend)
+
+    def __contains__(self, key):
+        return self._lookup(key)[0] != 'miss'
@@ -0,0 +1,182 @@
+import functools
+import logging
+import random
+import re
+import sys
+import threading
+from bisect import bisect_left
+from collections import Counter
+
+logger = logging.getLogger('query_profiler')
+
+# Literals replaced when fingerprinting, so queries that differ only in their
+# values share one fingerprint (and one histogram).
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+# Upper bounds, in milliseconds, of the latency histogram buckets; the last
+# bucket catches everything slower.
+BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+
+@functools.lru_cache(maxsize=4096)
+def fingerprint(query):
+    """Normalises a query: literals become ?, IN lists collapse, case and
+    whitespace are folded."""
+    query = _STRING_LITERAL.sub('?', query)
+    query = _NUMBER_LITERAL.sub('?', query)
+    query = _IN_LIST.sub('IN (?)', query)
+    return _WHITESPACE.sub(' ', query).strip().lower()
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket latency histogram for one query fingerprint. Each call is
+    recorded with a weight (1 / sample_rate for sampled calls), so calls,
+    rows, mean and percentiles estimate the full traffic. slow and errors
+    are exact counts kept beside the histogram.
+    """
+    def __init__(self):
+        self.counts = [0.0] * (len(BUCKETS_MS) + 1)
+        self.calls = 0.0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0.0
+        self.callers = Counter()
+        self.slow = 0
+        self.errors = 0
+
+    def record(self, elapsed_ms, rows, caller=None, weight=1.0):
+        self.counts[bisect_left(BUCKETS_MS, elapsed_ms)] += weight
+        if caller is not None:
+            self.callers[caller] += weight
+        self.calls += weight
+        self.total_ms += elapsed_ms * weight
+        self.rows += (rows or 0) * weight
+        if elapsed_ms > self.max_ms:
+            self.max_ms = elapsed_ms
+
+    @property
+    def mean_ms(self):
+        return self.total_ms / self.calls if self.calls else 0.0
+
+    def percentile(self, p):
+        """Upper bound of the bucket holding the p-th percentile (0-100)."""
+        if not self.calls:
+            return 0.0
+        target = p / 100 * self.calls
+        seen = 0
+        for bound, count in zip(BUCKETS_MS + (self.max_ms,), self.counts):
+            seen += count
+            if seen >= target:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+
+class QueryProfiler:
+    """
+    Records per-call wall time, rows returned and caller, and keeps a latency
+    histogram per query fingerprint.
+
+    Only a `sample_rate` fraction of calls is recorded in the histograms,
+    each weighted by 1 / sample_rate, and, if log_all is set, logged at
+    DEBUG, so the profiler can stay on in production. Slow calls (over
+    slow_ms) and calls that raised are counted and logged at WARNING
+    whether sampled or not, without skewing the histograms.
+    """
+    def __init__(self, slow_ms=100.0, sample_rate=1.0, log_all=False,
+                 logger=logger):
+        self.slow_ms = slow_ms
+        self.sample_rate = sample_rate
+        self.log_all = log_all
+        self.logger = logger
+        self.histograms = {}
+        self.slow_queries = 0
+        self.failed_queries = 0
+        self._weight = 1.0 / sample_rate if 0 < sample_rate < 1 else 1.0
+        self._lock = threading.Lock()
+
+    def should_sample(self):
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+    def record(self, query, elapsed_ms, rows=None, caller=None, sampled=True,
+               failed=False):
+        """
+        Records one call. Only sampled calls enter the histogram; slow and
+        failed calls are always counted and logged. caller is a
+        (filename, lineno, function) tuple as returned by caller_of().
+        """
+        slow = elapsed_ms >= self.slow_ms
+        if not (sampled or slow or failed):
+            return
+        key = fingerprint(query)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = LatencyHistogram()
+            if sampled:
+                histogram.record(elapsed_ms, rows, caller, self._weight)
+            if slow:
+                histogram.slow += 1
+                self.slow_queries += 1
+            if failed:
+                histogram.errors += 1
+                self.failed_queries += 1
+        if failed:
+            self.logger.warning("Failed query (%.1f ms) from %s: %s",
+                                elapsed_ms, format_caller(caller), query)
+        elif slow:
+            self.logger.warning("Slow query (%.1f ms, %s rows) from %s: %s",
+                                elapsed_ms, rows, format_caller(caller), query)
+        elif self.log_all:
+            self.logger.debug("Query (%.1f ms, %s rows) from %s: %s",
+                              elapsed_ms, rows, format_caller(caller), query)
+
+    def report(self):
+        """
+        Returns {fingerprint: {calls, rows, mean_ms, p50_ms, p95_ms, p99_ms,
+        max_ms, slow, errors, top_callers}}. calls, rows and top_callers
+        counts are estimates scaled up from the sample; slow and errors are
+        exact.
+        """
+        with self._lock:
+            return {
+                key: {
+                    'calls': round(h.calls),
+                    'rows': round(h.rows),
+                    'mean_ms': h.mean_ms,
+                    'p50_ms': h.percentile(50),
+                    'p95_ms': h.percentile(95),
+                    'p99_ms': h.percentile(99),
+                    'max_ms': h.max_ms,
+                    'slow': h.slow,
+                    'errors': h.errors,
+                    'top_callers': [(format_caller(c), round(n))
+                                    for c, n in h.callers.most_common(3)],
+                }
+                for key, h in self.histograms.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.slow_queries = 0
+            self.failed_queries = 0
+
+
+def caller_of(depth=2):
+    """
+    (filename, lineno, function) of the frame `depth` levels above the
+    caller. Kept as a tuple so nothing is formatted unless it is logged.
+    """
+    frame = sys._getframe(depth)
+    return frame.f_code.co_filename, frame.f_lineno, frame.f_code.co_name
+
+
+def format_caller(caller):
+    if caller is None:
+        return 'unknown'
+    filename, lineno, function = caller
+    return f"{filename}:{lineno} {function}"
@@ -0,0 +1,68 @@
+import random
+import sqlite3
+import threading
+
+# OperationalError messages that describe a transient condition. Anything
+# else (syntax errors, missing tables, constraint violations) fails the same
+# way on every attempt and is treated as fatal.
+RETRYABLE_MESSAGES = (
+    'database is locked',
+    'database table is locked',
+    'database is busy',
+    'temporarily unavailable',
+)
+
+
+def is_retryable(exc):
+    """True if exc is a transient error worth retrying."""
+    if isinstance(exc, sqlite3.OperationalError):
+        message = str(exc).lower()
+        return any(pattern in message for pattern in RETRYABLE_MESSAGES)
+    return isinstance(exc, (TimeoutError, ConnectionError))
+
+
+def backoff_delay(attempt, base=1.0, cap=30.0):
+    """
+    Full-jitter exponential backoff: a random delay between 0 and
+    min(cap, base * 2**attempt) seconds, attempt counting from 0. The jitter
+    spreads concurrent retries out instead of sending them in waves.
+    """
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class RetryBudget:
+    """
+    Limits retries to a fraction of calls across the process.
+
+    Every call deposits `ratio` tokens, up to max_tokens, and every retry
+    withdraws one. When fewer than one token is left, failing calls are not
+    retried, so a broad outage adds at most `ratio` extra load instead of
+    multiplying it by the retry count.
+    """
+    def __init__(self, ratio=0.2, max_tokens=10.0, initial_tokens=None):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self._tokens = max_tokens if initial_tokens is None else initial_tokens
+        self._lock = threading.Lock()
+        self.denied = 0
+
+    def record_call(self):
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_acquire(self):
+        """Withdraws a token for one retry; False if the budget is spent."""
+        with self._lock:
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            self.denied += 1
+            return False
+
+    @property
+    def tokens(self):
+        return self._tokens
+
+
+# Shared by every decorated function in the process unless one is passed in.
+default_budget = RetryBudget()
@@ -0,0 +1,86 @@
+import os
+import tempfile
+import time
+import unittest
+
+from cache_backends import MemoryBackend, MmapBackend, SQLiteBackend
+
+
+class BackendContractMixin:
+    """The same behaviour is expected from every backend."""
+    def make_backend(self):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.backend = self.make_backend()
+
+    def tearDown(self):
+        close = getattr(self.backend, 'close', None)
+        if close is not None:
+            close()
+        self.tmp.cleanup()
+
+    def test_set_get_and_invalidate(self):
+        expires_at = time.time() + 60
+        self.backend.set(('SELECT * FROM users', ()), [(1, 'a')], expires_at, {'users'})
+        self.backend.set(('SELECT * FROM orders', ()), [(2,)], expires_at, {'orders'})
+        self.assertEqual(self.backend.get(('SELECT * FROM users', ())),
+                         ([(1, 'a')], expires_at))
+        self.assertEqual(self.backend.invalidate_tables({'users'}), 1)
+        self.assertIsNone(self.backend.get(('SELECT * FROM users', ())))
+        self.assertIsNotNone(self.backend.get(('SELECT * FROM orders', ())))
+
+
+class MemoryBackendTest(BackendContractMixin, unittest.TestCase):
+    def make_backend(self):
+        return MemoryBackend()
+
+
+class SQLiteBackendTest(BackendContractMixin, unittest.TestCase):
+    def make_backend(self):
+        return SQLiteBackend(os.path.join(self.tmp.name, 'cache.db'), max_entries=2)
+
+    def test_hits_are_not_written_until_next_set(self):
+        backend = self.backend
+        backend.set('a', 1, time.time() + 60, ())
+        backend.set('b', 2, time.time() + 60, ())
+        backend.get('a')
+        self.assertFalse(backend._conn().in_transaction)
+        # 'a' was used more recently than 'b', so 'b' is evicted
+        backend.set('c', 3, time.time() + 60, ())
+        self.assertIsNotNone(backend.get('a'))
+        self.assertIsNone(backend.get('b'))
+
+
+@unittest.skipUnless(hasattr(os, 'fork'), "needs fork")
+class MmapBackendTest(BackendContractMixin, unittest.TestCase):
+    def make_backend(self):
+        return MmapBackend(os.path.join(self.tmp.name, 'cache.mmap'),
+                           slots=64, slot_size=4096)
+
+    def test_lock_excludes_processes_forked_after_creation(self):
+        flag = os.path.join(self.tmp.name, 'held')
+        children = []
+        for _ in range(2):
+            pid = os.fork()
+            if pid == 0:
+                status = 0
+                try:
+                    with self.backend._locked(exclusive=True):
+                        try:
+                            os.close(os.open(flag, os.O_CREAT | os.O_EXCL))
+                        except FileExistsError:
+                            status = 1  # the other child holds the lock too
+                        else:
+                            time.sleep(0.2)
+                            os.remove(flag)
+                finally:
+                    os._exit(status)
+            children.append(pid)
+        statuses = [os.waitpid(pid, 0)[1] for pid in children]
+        self.assertEqual(statuses, [0, 0])
+
+
+if __name__ == '__main__':
+    unittest.main()
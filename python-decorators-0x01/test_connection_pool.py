@@ -0,0 +1,87 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from connection_pool import WAL_PRAGMAS, ConnectionPool, PoolTimeout, get_pool
+
+
+class ConnectionPoolTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, 'pool.db')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_reuses_released_connection(self):
+        pool = ConnectionPool(self.db_path, min_size=0, max_size=2)
+        conn = pool.acquire()
+        pool.release(conn)
+        self.assertIs(pool.acquire(), conn)
+        self.assertEqual(pool.size, 1)
+        pool.close()
+
+    def test_checkout_times_out_when_exhausted(self):
+        pool = ConnectionPool(self.db_path, min_size=0, max_size=1)
+        conn = pool.acquire()
+        with self.assertRaises(PoolTimeout):
+            pool.acquire(timeout=0.05)
+        pool.release(conn)
+        pool.close()
+
+    def test_waiter_gets_released_connection(self):
+        pool = ConnectionPool(self.db_path, min_size=0, max_size=1)
+        conn = pool.acquire()
+        threading.Timer(0.05, pool.release, args=(conn,)).start()
+        self.assertIs(pool.acquire(timeout=5), conn)
+        pool.close()
+
+    def test_release_rolls_back_open_transaction(self):
+        pool = ConnectionPool(self.db_path, min_size=0, max_size=1)
+        with pool.connection() as conn:
+            conn.execute("CREATE TABLE items (value INTEGER)")
+            conn.commit()
+            conn.execute("INSERT INTO items VALUES (1)")
+        with pool.connection() as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM items").fetchone()[0], 0)
+        pool.close()
+
+    def test_idle_connections_expire_under_light_load(self):
+        pool = ConnectionPool(self.db_path, min_size=1, max_size=5, idle_timeout=0.2)
+        held = [pool.acquire() for _ in range(5)]
+        for conn in held:
+            pool.release(conn)
+        self.assertEqual(pool.size, 5)
+        # One checkout at a time keeps reusing the newest connection; the
+        # older ones still have to be closed once they pass idle_timeout.
+        deadline = time.monotonic() + 0.6
+        while time.monotonic() < deadline:
+            with pool.connection():
+                pass
+            time.sleep(0.05)
+        self.assertEqual(pool.size, 1)
+        pool.close()
+
+    def test_default_pragmas_leave_journal_mode_alone(self):
+        pool = ConnectionPool(self.db_path, min_size=0)
+        with pool.connection() as conn:
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], 'delete')
+        pool.close()
+        pool = ConnectionPool(self.db_path, min_size=0, pragmas=WAL_PRAGMAS)
+        with pool.connection() as conn:
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], 'wal')
+        pool.close()
+
+    def test_get_pool_rejects_conflicting_options(self):
+        pool = get_pool(self.db_path, max_size=3)
+        self.addCleanup(pool.close)
+        self.assertIs(get_pool(self.db_path), pool)
+        self.assertIs(get_pool(self.db_path, max_size=3), pool)
+        with self.assertRaises(ValueError):
+            get_pool(self.db_path, max_size=4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+
+from connection_pool import ConnectionPool
+from db_decorators import db_operation
+from query_cache import QueryCache
+from query_profiler import QueryProfiler, fingerprint
+
+
+class DbOperationTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, 'ops.db')
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("CREATE TABLE items (value INTEGER)")
+        conn.commit()
+        conn.close()
+        self.pool = ConnectionPool(self.db_path, min_size=0, max_size=2,
+                                   checkout_timeout=1.0)
+
+    def tearDown(self):
+        self.pool.close()
+        self.tmp.cleanup()
+
+    def values(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return sorted(row[0] for row in conn.execute("SELECT value FROM items"))
+        finally:
+            conn.close()
+
+    def test_nested_transactional_calls_share_the_connection(self):
+        @db_operation(pool=self.pool, transactional=True)
+        def insert(conn, value):
+            conn.execute("INSERT INTO items (value) VALUES (?)", (value,))
+            if value < 0:
+                raise ValueError(value)
+
+        @db_operation(pool=self.pool, transactional=True)
+        def insert_pair(conn, first, second):
+            insert(first)
+            try:
+                insert(second)
+            except ValueError:
+                pass
+            return conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+
+        start = time.perf_counter()
+        self.assertEqual(insert_pair(1, 2), 2)
+        self.assertEqual(insert_pair(3, -1), 3)
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertEqual(self.values(), [1, 2, 3])
+        self.assertEqual((self.pool.size, self.pool.idle), (1, 1))
+
+    def test_outer_failure_rolls_back_nested_writes(self):
+        @db_operation(pool=self.pool, transactional=True)
+        def insert(conn, value):
+            conn.execute("INSERT INTO items (value) VALUES (?)", (value,))
+
+        @db_operation(pool=self.pool, transactional=True)
+        def insert_then_fail(conn):
+            insert(1)
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            insert_then_fail()
+        self.assertEqual(self.values(), [])
+
+    def test_retries_transient_errors(self):
+        attempts = []
+
+        @db_operation(pool=self.pool, transactional=True, retries=2,
+                      retry_delay=0, budget=None)
+        def flaky(conn):
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise sqlite3.OperationalError("database is locked")
+            conn.execute("INSERT INTO items (value) VALUES (1)")
+            return len(attempts)
+
+        self.assertEqual(flaky(), 2)
+        self.assertEqual(self.values(), [1])
+
+    def test_cached_reads_are_invalidated_by_writes(self):
+        cache = QueryCache()
+
+        @db_operation(pool=self.pool, cache=cache)
+        def run(conn, query, params=()):
+            result = conn.execute(query, params).fetchall()
+            conn.commit()
+            return result
+
+        self.assertEqual(run("SELECT value FROM items"), [])
+        run("INSERT INTO items (value) VALUES (?)", (5,))
+        self.assertEqual(run("SELECT value FROM items"), [(5,)])
+        self.assertEqual(run("SELECT value FROM items"), [(5,)])
+        self.assertEqual(cache.stats.hits, 1)
+
+    def test_profiler_records_failed_calls(self):
+        profiler = QueryProfiler(sample_rate=1.0)
+
+        @db_operation(pool=self.pool, profiler=profiler)
+        def run(conn, query):
+            return conn.execute(query).fetchall()
+
+        self.assertEqual(run("SELECT value FROM items"), [])
+        with self.assertLogs('query_profiler', 'WARNING'):
+            with self.assertRaises(sqlite3.OperationalError):
+                run("SELECT value FROM missing")
+        report = profiler.report()
+        self.assertEqual(report[fingerprint("SELECT value FROM items")]['calls'], 1)
+        self.assertEqual(report[fingerprint("SELECT value FROM missing")]['errors'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
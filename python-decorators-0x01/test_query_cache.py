@@ -0,0 +1,113 @@
+import importlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+
+from query_cache import QueryCache, make_key, tables_read, tables_written
+
+cache_query_module = importlib.import_module('4-cache_query')
+
+
+class QueryCacheTest(unittest.TestCase):
+    def test_write_invalidates_tables_it_touches(self):
+        cache = QueryCache()
+        users = make_key("SELECT * FROM users")
+        orders = make_key("SELECT * FROM orders JOIN users ON users.id = orders.user_id")
+        cache.set(users, [1], tables_read("SELECT * FROM users"))
+        cache.set(orders, [2], tables_read(orders[0]))
+        cache.set(make_key("SELECT * FROM items"), [3], {'items'})
+        self.assertEqual(cache.invalidate_tables(tables_written("UPDATE users SET x = 1")), 2)
+        self.assertEqual(cache.get(users), (False, None))
+        self.assertEqual(cache.get(orders), (False, None))
+        self.assertEqual(cache.get(make_key("SELECT * FROM items")), (True, [3]))
+
+    def test_fill_started_before_write_is_not_stored(self):
+        cache = QueryCache()
+        key = make_key("SELECT * FROM users")
+        started, finish = threading.Event(), threading.Event()
+
+        def slow_loader():
+            started.set()
+            finish.wait(5)
+            return ['pre-write']
+
+        thread = threading.Thread(target=cache.load, args=(key, slow_loader, {'users'}))
+        thread.start()
+        started.wait(5)
+        cache.invalidate_tables({'users'})  # the write lands mid-query
+        finish.set()
+        thread.join(5)
+        self.assertEqual(cache.get(key), (False, None))
+
+    def test_concurrent_misses_share_one_load(self):
+        cache = QueryCache()
+        key = make_key("SELECT * FROM users")
+        calls = []
+
+        def loader():
+            calls.append(1)
+            time.sleep(0.1)
+            return ['rows']
+
+        threads = [threading.Thread(target=cache.load, args=(key, loader, {'users'}))
+                   for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache.stats.coalesced, 4)
+
+    def test_entry_is_stale_within_stale_ttl(self):
+        cache = QueryCache(ttl=0.05, stale_ttl=0.5)
+        key = make_key("SELECT 1")
+        cache.set(key, [1])
+        time.sleep(0.1)
+        self.assertEqual(cache.lookup(key), ('stale', [1]))
+
+
+class CacheQueryDecoratorTest(unittest.TestCase):
+    def setUp(self):
+        handle, self.db_path = tempfile.mkstemp(suffix='.db')
+        os.close(handle)
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, email TEXT)")
+        conn.execute("INSERT INTO users (email) VALUES ('a@example.com')")
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        os.remove(self.db_path)
+
+    def test_stale_while_revalidate_requires_stale_ttl(self):
+        with self.assertRaises(ValueError):
+            cache_query_module.cache_query(cache=QueryCache(stale_ttl=0),
+                                           stale_while_revalidate=True)
+
+    def test_refresh_uses_the_callers_database(self):
+        cache = QueryCache(ttl=0.05, stale_ttl=5)
+
+        @cache_query_module.cache_query(cache=cache, stale_while_revalidate=True)
+        def fetch(conn, query):
+            return conn.execute(query).fetchall()
+
+        conn = sqlite3.connect(self.db_path)
+        query = "SELECT email FROM users"
+        self.assertEqual(fetch(conn, query), [('a@example.com',)])
+        conn.execute("UPDATE users SET email = 'b@example.com'")
+        conn.commit()
+        time.sleep(0.1)
+        # Stale value served at once; the refresh reads the same file
+        self.assertEqual(fetch(conn, query), [('a@example.com',)])
+        deadline = time.monotonic() + 5
+        while cache.lookup(make_key(query))[1] != [('b@example.com',)]:
+            self.assertLess(time.monotonic(), deadline, "refresh never stored")
+            time.sleep(0.02)
+        conn.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
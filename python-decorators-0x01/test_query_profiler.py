@@ -0,0 +1,67 @@
+import importlib
+import logging
+import random
+import unittest
+
+from query_profiler import QueryProfiler, fingerprint
+
+log_queries = importlib.import_module('0-log_queries').log_queries
+
+QUIET = logging.getLogger('test_query_profiler')
+QUIET.addHandler(logging.NullHandler())
+QUIET.propagate = False
+
+
+class QueryProfilerTest(unittest.TestCase):
+    def test_fingerprint_folds_literals(self):
+        self.assertEqual(fingerprint("SELECT * FROM users WHERE id = 1"),
+                         fingerprint("select *  from users where id = 42"))
+        self.assertEqual(fingerprint("SELECT * FROM t WHERE x IN (?, ?, ?)"),
+                         "select * from t where x in (?)")
+
+    def test_exact_counts_without_sampling(self):
+        profiler = QueryProfiler(slow_ms=100, logger=QUIET)
+        for elapsed_ms in (1, 2, 3, 200):
+            profiler.record("SELECT 1", elapsed_ms, rows=2)
+        summary = profiler.report()[fingerprint("SELECT 1")]
+        self.assertEqual((summary['calls'], summary['rows'], summary['slow']), (4, 8, 1))
+        self.assertEqual(summary['mean_ms'], 51.5)
+        self.assertEqual(summary['max_ms'], 200)
+
+    def test_sampled_histogram_is_not_skewed_by_slow_calls(self):
+        random.seed(1)
+        profiler = QueryProfiler(slow_ms=100, sample_rate=0.1, logger=QUIET)
+        for i in range(10000):
+            elapsed_ms = 150.0 if i % 100 == 0 else 1.0
+            profiler.record("SELECT * FROM users", elapsed_ms,
+                            sampled=profiler.should_sample())
+        summary = profiler.report()[fingerprint("SELECT * FROM users")]
+        self.assertAlmostEqual(summary['calls'], 10000, delta=1000)
+        self.assertAlmostEqual(summary['mean_ms'], 2.5, delta=1.5)
+        self.assertEqual(summary['p95_ms'], 1)
+        self.assertEqual(summary['slow'], 100)
+        self.assertEqual(profiler.slow_queries, 100)
+
+    def test_failed_calls_are_recorded(self):
+        profiler = QueryProfiler(sample_rate=0.0, logger=QUIET)
+
+        @log_queries(profiler=profiler)
+        def run(query):
+            raise RuntimeError("no such table")
+
+        with self.assertRaises(RuntimeError):
+            run("SELECT * FROM missing")
+        summary = profiler.report()[fingerprint("SELECT * FROM missing")]
+        self.assertEqual((summary['errors'], summary['calls']), (1, 0))
+        self.assertEqual(profiler.failed_queries, 1)
+
+    def test_reset(self):
+        profiler = QueryProfiler(slow_ms=0, logger=QUIET)
+        profiler.record("SELECT 1", 5, failed=True)
+        profiler.reset()
+        self.assertEqual((profiler.report(), profiler.slow_queries,
+                          profiler.failed_queries), ({}, 0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,199 @@
+import importlib
+import os
+import sqlite3
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from transactions import CommitStats, GroupCommitter, transaction
+
+transactional = importlib.import_module('2-transactional').transactional
+
+
+def insert_value(conn, value):
+    conn.execute("INSERT INTO items (value) VALUES (?)", (value,))
+    return value
+
+
+def insert_and_commit(conn, value):
+    insert_value(conn, value)
+    conn.commit()
+    return value
+
+
+def fail(conn):
+    raise ValueError("boom")
+
+
+def interrupt(conn):
+    raise KeyboardInterrupt
+
+
+class GroupCommitterTest(unittest.TestCase):
+    def setUp(self):
+        handle, self.db_path = tempfile.mkstemp(suffix='.db')
+        os.close(handle)
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("CREATE TABLE items (value INTEGER)")
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        os.remove(self.db_path)
+
+    def values(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return sorted(row[0] for row in conn.execute("SELECT value FROM items"))
+        finally:
+            conn.close()
+
+    def test_batches_calls_and_isolates_failures(self):
+        committer = GroupCommitter(self.db_path, window_ms=50)
+        futures = [committer.submit(insert_value, 1), committer.submit(fail),
+                   committer.submit(insert_value, 2)]
+        self.assertEqual(futures[0].result(timeout=5), 1)
+        with self.assertRaises(ValueError):
+            futures[1].result(timeout=5)
+        self.assertEqual(futures[2].result(timeout=5), 2)
+        committer.close()
+        self.assertEqual(self.values(), [1, 2])
+
+    def test_function_that_commits_does_not_kill_writer(self):
+        committer = GroupCommitter(self.db_path, window_ms=50)
+        first = committer.submit(insert_and_commit, 1)
+        rest = [committer.submit(insert_value, value) for value in (2, 3)]
+        with self.assertRaises(sqlite3.ProgrammingError):
+            first.result(timeout=5)
+        self.assertEqual([future.result(timeout=5) for future in rest], [2, 3])
+        # The writer thread is still alive and serving new calls
+        self.assertEqual(committer.submit(insert_value, 4).result(timeout=5), 4)
+        committer.close()
+        # The failed call's write was rolled back with its savepoint
+        self.assertEqual(self.values(), [2, 3, 4])
+
+    def test_failed_commit_fails_batch_and_next_batch_commits(self):
+        reader = sqlite3.connect(self.db_path, isolation_level=None)
+        reader.execute("BEGIN")
+        reader.execute("SELECT * FROM items").fetchall()  # holds a SHARED lock
+        committer = GroupCommitter(self.db_path, window_ms=10, timeout=0.1)
+        with self.assertRaises(sqlite3.OperationalError):
+            committer.submit(insert_value, 1).result(timeout=5)
+        reader.execute("COMMIT")
+        reader.close()
+        self.assertEqual(committer.submit(insert_value, 2).result(timeout=5), 2)
+        self.assertEqual((committer.stats.commits, committer.stats.rollbacks), (1, 1))
+        # The writer holds no lock once its batch has committed
+        self.assertEqual(self.values(), [2])
+        committer.close()
+
+    def test_escaping_base_exception_fails_whole_batch(self):
+        committer = GroupCommitter(self.db_path, window_ms=50)
+        futures = [committer.submit(insert_value, 1), committer.submit(interrupt),
+                   committer.submit(insert_value, 2)]
+        for future in futures:
+            self.assertIsInstance(future.exception(timeout=5), KeyboardInterrupt)
+        self.assertEqual(committer.submit(insert_value, 3).result(timeout=5), 3)
+        committer.close()
+        self.assertEqual(self.values(), [3])
+
+    def test_calls_within_window_share_one_commit(self):
+        committer = GroupCommitter(self.db_path, window_ms=500)
+        futures = [committer.submit(insert_value, value) for value in range(10)]
+        self.assertEqual([future.result(timeout=5) for future in futures], list(range(10)))
+        committer.close()
+        self.assertEqual(committer.batches, 1)
+        self.assertEqual(committer.stats.commits, 1)
+        self.assertGreater(committer.stats.max_ms, 0)
+
+    def test_max_batch_splits_batches(self):
+        committer = GroupCommitter(self.db_path, window_ms=500, max_batch=3)
+        futures = [committer.submit(insert_value, value) for value in range(7)]
+        committer.close()
+        self.assertTrue(all(future.done() for future in futures))
+        self.assertEqual(committer.batches, 3)
+        self.assertEqual(self.values(), list(range(7)))
+
+    def test_rejects_unknown_synchronous_mode(self):
+        with self.assertRaises(ValueError):
+            GroupCommitter(self.db_path, synchronous='EXTRA')
+
+    def test_connect_failure_fails_calls(self):
+        committer = GroupCommitter(os.path.join(self.db_path, 'missing', 'x.db'))
+        with self.assertRaises(sqlite3.OperationalError):
+            committer.submit(insert_value, 1).result(timeout=5)
+        committer.close()
+
+
+class TransactionTest(unittest.TestCase):
+    def test_nested_failure_rolls_back_only_savepoint(self):
+        conn = sqlite3.connect(':memory:')
+        conn.execute("CREATE TABLE items (value INTEGER)")
+        with transaction(conn):
+            insert_value(conn, 1)
+            with self.assertRaises(ValueError):
+                with transaction(conn):
+                    insert_value(conn, 2)
+                    raise ValueError
+        self.assertEqual(conn.execute("SELECT value FROM items").fetchall(), [(1,)])
+        conn.close()
+
+    def test_failed_commit_is_rolled_back(self):
+        handle, path = tempfile.mkstemp(suffix='.db')
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+        conn = sqlite3.connect(path, timeout=0.1)
+        conn.execute("CREATE TABLE items (value INTEGER)")
+        conn.commit()
+        reader = sqlite3.connect(path, isolation_level=None)
+        reader.execute("BEGIN")
+        reader.execute("SELECT * FROM items").fetchall()
+        stats = CommitStats()
+        with self.assertRaises(sqlite3.OperationalError):
+            with transaction(conn, stats):
+                insert_value(conn, 1)
+        self.assertFalse(conn.in_transaction)
+        self.assertEqual((stats.commits, stats.rollbacks), (0, 1))
+        reader.execute("COMMIT")
+        reader.close()
+        self.assertEqual(conn.execute("SELECT value FROM items").fetchall(), [])
+        conn.close()
+
+    def test_commits_and_rollbacks_are_counted(self):
+        conn = sqlite3.connect(':memory:')
+        conn.execute("CREATE TABLE items (value INTEGER)")
+        stats = CommitStats()
+        with transaction(conn, stats):
+            insert_value(conn, 1)
+        with self.assertRaises(ValueError):
+            with transaction(conn, stats):
+                raise ValueError
+        self.assertEqual((stats.commits, stats.rollbacks), (1, 1))
+        conn.close()
+
+    def test_nested_transactional_functions(self):
+        @transactional
+        def inner(conn, value):
+            insert_value(conn, value)
+            if value < 0:
+                raise ValueError(value)
+
+        @transactional
+        def outer(conn):
+            inner(conn, 1)
+            with self.assertRaises(ValueError):
+                inner(conn, -1)
+            inner(conn, 2)
+
+        conn = sqlite3.connect(':memory:')
+        conn.execute("CREATE TABLE items (value INTEGER)")
+        with redirect_stdout(StringIO()):
+            outer(conn)
+        self.assertFalse(conn.in_transaction)
+        self.assertEqual(conn.execute("SELECT value FROM items").fetchall(), [(1,), (2,)])
+        conn.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
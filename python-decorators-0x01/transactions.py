@@ -0,0 +1,203 @@
+import itertools
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+_savepoint_ids = itertools.count(1)
+
+
+class CommitStats:
+    """Commit latency and outcome counters."""
+    def __init__(self):
+        self.commits = 0
+        self.rollbacks = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._lock = threading.Lock()
+
+    def record_commit(self, elapsed_ms):
+        with self._lock:
+            self.commits += 1
+            self.total_ms += elapsed_ms
+            if elapsed_ms > self.max_ms:
+                self.max_ms = elapsed_ms
+
+    def record_rollback(self):
+        with self._lock:
+            self.rollbacks += 1
+
+    @property
+    def mean_ms(self):
+        return self.total_ms / self.commits if self.commits else 0.0
+
+    def __repr__(self):
+        return (f"CommitStats(commits={self.commits}, rollbacks={self.rollbacks}, "
+                f"mean_ms={self.mean_ms:.3f}, max_ms={self.max_ms:.3f})")
+
+
+commit_stats = CommitStats()
+
+
+@contextmanager
+def transaction(conn, stats=commit_stats):
+    """
+    Runs the block in a transaction, or in a SAVEPOINT when conn is already
+    inside one, so transactional code can call other transactional code.
+    An error in a nested block rolls back only that block's savepoint.
+    """
+    if conn.in_transaction:
+        name = f"sp_{next(_savepoint_ids)}"
+        conn.execute(f"SAVEPOINT {name}")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute(f"ROLLBACK TO SAVEPOINT {name}")
+            conn.execute(f"RELEASE SAVEPOINT {name}")
+            raise
+        conn.execute(f"RELEASE SAVEPOINT {name}")
+        return
+
+    conn.execute("BEGIN TRANSACTION")
+    try:
+        yield conn
+        start = time.perf_counter()
+        # A failed COMMIT (e.g. "database is locked") leaves the
+        # transaction open, so it is rolled back like any other error
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        stats.record_rollback()
+        raise
+    stats.record_commit((time.perf_counter() - start) * 1000)
+
+
+class _BatchConnection:
+    """
+    The writer connection as seen by a batched call. commit() and rollback()
+    are refused: they would end the batch's shared transaction, committing
+    or discarding the other calls' writes.
+    """
+    def __init__(self, conn):
+        self._conn = conn
+
+    def commit(self):
+        raise sqlite3.ProgrammingError("commit() inside a group-committed call")
+
+    def rollback(self):
+        raise sqlite3.ProgrammingError("rollback() inside a group-committed call")
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+class GroupCommitter:
+    """
+    Coalesces many small transactional calls into one commit.
+
+    Calls submitted within window_ms of each other (up to max_batch) run on a
+    single writer thread and connection, each in its own SAVEPOINT so one
+    failing call does not undo the others, and are committed together. A
+    call's result is only delivered after its batch has committed.
+
+    Durability is traded for throughput by the window size and by
+    `synchronous` (FULL, NORMAL or OFF), applied to the writer connection.
+    Calls must not commit or roll back themselves; doing so fails the call.
+    If the batch's COMMIT fails, it is rolled back and every call in it fails.
+    """
+    _STOP = object()
+
+    def __init__(self, db_path='users.db', window_ms=5.0, max_batch=100,
+                 synchronous='FULL', stats=None, timeout=5.0):
+        if synchronous.upper() not in ('FULL', 'NORMAL', 'OFF'):
+            raise ValueError(f"Unsupported synchronous mode: {synchronous}")
+        self.db_path = db_path
+        self.timeout = timeout
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.synchronous = synchronous.upper()
+        self.stats = stats if stats is not None else CommitStats()
+        self.batches = 0
+        self._jobs = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, func, *args, **kwargs):
+        """Queues func(conn, *args, **kwargs); returns a Future for its result."""
+        future = Future()
+        self._jobs.put((future, func, args, kwargs))
+        return future
+
+    def _collect(self):
+        job = self._jobs.get()
+        if job is self._STOP:
+            return None
+        batch = [job]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                job = self._jobs.get(timeout=max(remaining, 0)) if remaining > 0 \
+                    else self._jobs.get_nowait()
+            except queue.Empty:
+                break
+            if job is self._STOP:
+                self._jobs.put(job)
+                break
+            batch.append(job)
+        return batch
+
+    def _run(self):
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=self.timeout)
+            conn.execute(f"PRAGMA synchronous = {self.synchronous}")
+        except Exception as e:
+            # Fail every call instead of leaving callers waiting forever
+            while (batch := self._collect()) is not None:
+                self._fail(batch, e)
+            return
+        try:
+            while (batch := self._collect()) is not None:
+                self._commit_batch(conn, batch)
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _fail(batch, error):
+        for future, _, _, _ in batch:
+            if not future.done():
+                future.set_exception(error)
+
+    def _commit_batch(self, conn, batch):
+        outcomes = []
+        view = _BatchConnection(conn)
+        try:
+            with transaction(conn, self.stats):
+                for future, func, args, kwargs in batch:
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    try:
+                        with transaction(conn):
+                            result = func(view, *args, **kwargs)
+                    except Exception as e:
+                        outcomes.append((future, False, e))
+                    else:
+                        # Only once the savepoint has been released
+                        outcomes.append((future, True, result))
+        except BaseException as e:
+            # The batch was rolled back (or never began): nothing succeeded
+            self._fail(batch, e)
+            return
+        self.batches += 1
+        for future, ok, value in outcomes:
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+    def close(self):
+        """Commits everything already submitted and stops the writer thread."""
+        self._jobs.put(self._STOP)
+        self._thread.join()
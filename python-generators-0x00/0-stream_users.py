@@ -3,19 +3,81 @@
 
 import sqlite3
 
-def stream_users():
+
+class Record:
+    """
+    Lightweight row: the raw tuple from the cursor plus a column-index map
+    shared by every row of the same query. Fields are readable by attribute,
+    by column name or by position; a dict is only built by as_dict().
+    """
+    __slots__ = ('_values', '_index')
+
+    def __init__(self, values, index):
+        self._values = values
+        self._index = index
+
+    def __getattr__(self, name):
+        if name.startswith('_'):  # unset slots, e.g. during copy/pickle
+            raise AttributeError(name)
+        try:
+            return self._values[self._index[name]]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self._values[self._index[key]]
+        return self._values[key]
+
+    def __len__(self):
+        return len(self._values)
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __eq__(self, other):
+        if isinstance(other, Record):
+            return self._values == other._values and self._index == other._index
+        return NotImplemented
+
+    def keys(self):
+        return list(self._index)
+
+    def get(self, key, default=None):
+        index = self._index.get(key)
+        return default if index is None else self._values[index]
+
+    def as_dict(self):
+        return dict(zip(self._index, self._values))
+
+    def __repr__(self):
+        fields = ', '.join(f"{k}={v!r}" for k, v in zip(self._index, self._values))
+        return f"Record({fields})"
+
+
+def stream_users(db_path='user_data.db', row_type='dict'):
     # Connect to the database
-    conn = sqlite3.connect('user_data.db')
-    conn.row_factory = sqlite3.Row  # Enable dictionary-like row access
+    conn = sqlite3.connect(db_path)
+    if row_type == 'dict':
+        conn.row_factory = sqlite3.Row  # Enable dictionary-like row access
+    elif row_type != 'record':
+        conn.close()
+        raise ValueError(f"Unknown row type: {row_type!r}")
     cursor = conn.cursor()
-    
+
     # Execute query to fetch all rows from user_data
     cursor.execute("SELECT * FROM user_data")
-    
+
     # Yield each row one by one
-    for row in cursor:
-        yield dict(row)
-    
+    if row_type == 'record':
+        # One column-index map for the whole result set
+        index = {column[0]: i for i, column in enumerate(cursor.description)}
+        for row in cursor:
+            yield Record(row, index)
+    else:
+        for row in cursor:
+            yield dict(row)
+
     # Close connection
     cursor.close()
     conn.close()
\ No newline at end of file
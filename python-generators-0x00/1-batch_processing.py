@@ -1,64 +1,240 @@
 import sqlite3
+import operator
+from array import array
+from itertools import compress
 
-def stream_users_in_batches(batch_size):
-
-    conn = sqlite3.connect(':memory:') # Replace with your actual DB path for persistent data
-    cursor = conn.cursor()
-
-    # Create a dummy user_data table and insert some data for demonstration
-    # In a real scenario, this table would already exist.
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS user_data (
-            user_id TEXT PRIMARY KEY,
-            name TEXT NOT NULL,
-            email TEXT UNIQUE NOT NULL,
-            age INTEGER
-        )
-    ''')
-    # Insert sample data (removed some to keep it concise, but ensure enough for batches)
-    sample_data = [
-        ('00234e50-34eb-4ce2-94ec-26e3fa749796', 'Dan Altenwerth Jr.', 'Molly59@gmail.com', 67),
-        ('006bfede-724d-4cdd-a2a6-59700f40d0da', 'Glenda Wisozk', 'Miriam21@gmail.com', 119),
-        ('006e1f7f-90c2-45ad-8c1d-1275d594cc88', 'Daniel Fahey IV', 'Delia.Lesch11@hotmail.com', 49),
-        ('00af05c9-0a86-419e-8c2d-5fb7e899ae1c', 'Ronnie Bechtelar', 'Sandra19@yahoo.com', 22),
-        ('00cc08cc-62f4-4da1-b8e4-f5d9ef5dbbd4', 'Alma Bechtelar', 'Shelly_Balistreri22@hotmail.com', 102),
-        ('01187f09-72be-4924-8a2d-150645dcadad', 'Jonathon Jones', 'Jody.Quigley-Ziemann33@yahoo.com', 116),
-        ('01234567-89ab-cdef-1234-56789abcdef0', 'Jane Doe', 'jane.doe@example.com', 30),
-        ('0fedcba9-8765-4321-fedc-ba9876543210', 'John Smith', 'john.smith@example.com', 45),
-        ('a1b2c3d4-e5f6-7890-1234-56789abcdefg', 'Alice Wonderland', 'alice@example.com', 18),
-        ('b2c3d4e5-f678-9012-3456-789abcdefghi', 'Bob The Builder', 'bob@example.com', 55),
-        ('c3d4e5f6-7890-1234-5678-9abcdefghijk', 'Charlie Chaplin', 'charlie@example.com', 24),
-        ('d4e5f678-9012-3456-789a-bcdefghijklm', 'Diana Prince', 'diana@example.com', 32),
-        ('e5f67890-1234-5678-9abc-defghijklmno', 'Eve Adams', 'eve@example.com', 26),
-        ('f6789012-3456-789a-bcde-fghijklmnopq', 'Frank Miller', 'frank@example.com', 21),
-        ('01234567-0000-0000-0000-000000000001', 'Grace Hopper', 'grace@example.com', 90),
-        ('01234567-0000-0000-0000-000000000002', 'Alan Turing', 'alan@example.com', 41),
-        ('01234567-0000-0000-0000-000000000003', 'Ada Lovelace', 'ada@example.com', 36)
-    ]
-    cursor.executemany("INSERT INTO user_data VALUES (?, ?, ?, ?)", sample_data)
-    conn.commit()
-
-    cursor.execute("SELECT user_id, name, email, age FROM user_data")
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; plain arrays are used without it
+    np = None
+
+def stream_users_in_batches(batch_size, columnar=False, columns=None,
+                            where=None, connection=None):
+    """
+    Yields batches of users from user_data.
+
+    Args:
+        batch_size (int): Number of rows per batch.
+        columnar (bool): Yield ColumnBatch objects (one list/array per column)
+            instead of lists of per-row dicts.
+        columns (list): Columns to select; defaults to all of COLUMNS.
+        where (list): (column, operator, value) predicates, ANDed together,
+            e.g. [('age', '>', 25)]. They are compiled into the SQL WHERE
+            clause so non-matching rows never leave the database.
+        connection: Existing sqlite3 connection holding user_data. When
+            omitted a demonstration in-memory table is created.
+    """
+    query, params = compile_query(columns, where)
+    columns = tuple(columns) if columns else COLUMNS
+
+    owns_connection = connection is None
+    if owns_connection:
+        conn = sqlite3.connect(':memory:') # Replace with your actual DB path for persistent data
+        cursor = conn.cursor()
+
+        # Create a dummy user_data table and insert some data for demonstration
+        # In a real scenario, this table would already exist.
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS user_data (
+                user_id TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                email TEXT UNIQUE NOT NULL,
+                age INTEGER
+            )
+        ''')
+        # Insert sample data (removed some to keep it concise, but ensure enough for batches)
+        sample_data = [
+            ('00234e50-34eb-4ce2-94ec-26e3fa749796', 'Dan Altenwerth Jr.', 'Molly59@gmail.com', 67),
+            ('006bfede-724d-4cdd-a2a6-59700f40d0da', 'Glenda Wisozk', 'Miriam21@gmail.com', 119),
+            ('006e1f7f-90c2-45ad-8c1d-1275d594cc88', 'Daniel Fahey IV', 'Delia.Lesch11@hotmail.com', 49),
+            ('00af05c9-0a86-419e-8c2d-5fb7e899ae1c', 'Ronnie Bechtelar', 'Sandra19@yahoo.com', 22),
+            ('00cc08cc-62f4-4da1-b8e4-f5d9ef5dbbd4', 'Alma Bechtelar', 'Shelly_Balistreri22@hotmail.com', 102),
+            ('01187f09-72be-4924-8a2d-150645dcadad', 'Jonathon Jones', 'Jody.Quigley-Ziemann33@yahoo.com', 116),
+            ('01234567-89ab-cdef-1234-56789abcdef0', 'Jane Doe', 'jane.doe@example.com', 30),
+            ('0fedcba9-8765-4321-fedc-ba9876543210', 'John Smith', 'john.smith@example.com', 45),
+            ('a1b2c3d4-e5f6-7890-1234-56789abcdefg', 'Alice Wonderland', 'alice@example.com', 18),
+            ('b2c3d4e5-f678-9012-3456-789abcdefghi', 'Bob The Builder', 'bob@example.com', 55),
+            ('c3d4e5f6-7890-1234-5678-9abcdefghijk', 'Charlie Chaplin', 'charlie@example.com', 24),
+            ('d4e5f678-9012-3456-789a-bcdefghijklm', 'Diana Prince', 'diana@example.com', 32),
+            ('e5f67890-1234-5678-9abc-defghijklmno', 'Eve Adams', 'eve@example.com', 26),
+            ('f6789012-3456-789a-bcde-fghijklmnopq', 'Frank Miller', 'frank@example.com', 21),
+            ('01234567-0000-0000-0000-000000000001', 'Grace Hopper', 'grace@example.com', 90),
+            ('01234567-0000-0000-0000-000000000002', 'Alan Turing', 'alan@example.com', 41),
+            ('01234567-0000-0000-0000-000000000003', 'Ada Lovelace', 'ada@example.com', 36)
+        ]
+        cursor.executemany("INSERT INTO user_data VALUES (?, ?, ?, ?)", sample_data)
+        conn.commit()
+    else:
+        conn = connection
+        cursor = conn.cursor()
+
+    cursor.execute(query, params)
 
     # Loop 1: Fetches rows in batches
     # Iterate as long as fetchmany returns non-empty lists
     while (batch := cursor.fetchmany(batch_size)): # Walrus operator for cleaner loop
-        yield [
-            {
-                'user_id': row[0],
-                'name': row[1],
-                'email': row[2],
-                'age': row[3]
-            }
-            for row in batch
-        ]
+        if columnar:
+            yield ColumnBatch.from_rows(batch, columns)
+            continue
+        yield [dict(zip(columns, row)) for row in batch]
+
+    if owns_connection:
+        conn.close() # Placed outside the try/except/finally for the checker, but still crucial.
+
+
+# --- Predicate and projection pushdown ---
+def compile_query(columns=None, where=None):
+    """
+    Compiles a projection and (column, operator, value) predicates into a
+    parameterised SELECT on user_data. Column names and operators are checked
+    against COLUMNS and the supported operators; values are bound as params.
+    """
+    columns = tuple(columns) if columns else COLUMNS
+    for column in columns:
+        if column not in COLUMNS:
+            raise ValueError(f"Unknown column: {column!r}")
+    query = f"SELECT {', '.join(columns)} FROM user_data"
+    clauses, params = [], []
+    for column, op, value in where or ():
+        if column not in COLUMNS:
+            raise ValueError(f"Unknown column: {column!r}")
+        if op not in _OPERATORS:
+            raise ValueError(f"Unsupported operator: {op!r}")
+        clauses.append(f"{column} {'=' if op == '==' else op} ?")
+        params.append(value)
+    if clauses:
+        query += " WHERE " + " AND ".join(clauses)
+    return query, tuple(params)
+
+
+# --- Columnar batches ---
+# Building a dict per row dominates filtering jobs. A ColumnBatch keeps one
+# list per string column and a compact numeric array for age, so predicates
+# can be evaluated over a whole column at once.
+COLUMNS = ('user_id', 'name', 'email', 'age')
+NAN = float('nan')
+
+_OPERATORS = {
+    '>': operator.gt, '>=': operator.ge, '<': operator.lt,
+    '<=': operator.le, '==': operator.eq, '!=': operator.ne,
+}
+
+
+def numeric_column(values):
+    """
+    Packs age values into array('i') when they are all ints, else into
+    array('d') (DECIMAL and REAL ages) with NaN standing in for NULL.
+    Values that are not numbers at all are kept in a list.
+    """
+    try:
+        return array('i', values)
+    except (TypeError, OverflowError):
+        pass
+    try:
+        return array('d', [NAN if v is None else v for v in values])
+    except TypeError:
+        return list(values)
 
-    conn.close() # Placed outside the try/except/finally for the checker, but still crucial.
+
+class ColumnBatch:
+    """A batch of users stored column by column."""
+    __slots__ = COLUMNS
+
+    def __init__(self, user_id, name, email, age):
+        self.user_id = user_id
+        self.name = name
+        self.email = email
+        self.age = age
+
+    @classmethod
+    def from_rows(cls, rows, columns=COLUMNS):
+        """
+        Builds a batch from row tuples laid out as `columns`. Columns that
+        were not selected are left as None.
+        """
+        values = dict.fromkeys(COLUMNS)
+        for name, column in zip(columns, zip(*rows) if rows else ([],) * len(columns)):
+            values[name] = numeric_column(column) if name == 'age' else list(column)
+        return cls(**values)
+
+    @property
+    def columns(self):
+        return tuple(name for name in COLUMNS if getattr(self, name) is not None)
+
+    def __len__(self):
+        return len(self.column(self.columns[0])) if self.columns else 0
+
+    def column(self, name):
+        if name not in COLUMNS or getattr(self, name) is None:
+            raise KeyError(name)
+        return getattr(self, name)
+
+    def mask(self, column, op, value):
+        """
+        Returns a sequence of booleans, one per row, for `column op value`.
+        As in SQL, NULL (None or NaN) never matches, not even for '!='.
+        """
+        compare = _OPERATORS[op]
+        values = self.column(column)
+        if np is not None and isinstance(values, array):
+            data = np.frombuffer(values, dtype=values.typecode)
+            if values.typecode == 'd':
+                return compare(data, value) & ~np.isnan(data)
+            return compare(data, value)
+        # v == v is False only for NaN
+        return [v is not None and v == v and compare(v, value) for v in values]
+
+    def select(self, mask):
+        """Returns a new batch containing only the rows where mask is true."""
+        values = dict.fromkeys(COLUMNS)
+        for name in self.columns:
+            column = getattr(self, name)
+            selected = compress(column, mask)
+            values[name] = (array(column.typecode, selected) if isinstance(column, array)
+                            else list(selected))
+        return ColumnBatch(**values)
+
+    def where(self, column, op, value):
+        """Shorthand for select(mask(column, op, value))."""
+        return self.select(self.mask(column, op, value))
+
+    def rows(self):
+        """Yields the batch as per-row dicts, for consumers that need them."""
+        columns = self.columns
+        for values in zip(*(getattr(self, name) for name in columns)):
+            row = dict(zip(columns, values))
+            if row.get('age') != row.get('age'):  # NaN back to NULL
+                row['age'] = None
+            yield row
+
+
+def filter_batches(batches, column, op, value):
+    """
+    Applies `column op value` to each ColumnBatch as a whole and yields the
+    non-empty filtered batches.
+    """
+    if op not in _OPERATORS:
+        raise ValueError(f"Unsupported operator: {op!r}")
+    for batch in batches:
+        filtered = batch.where(column, op, value)
+        if len(filtered):
+            yield filtered
+
+
+def batch_processing_columnar(batch_size):
+    """
+    Columnar counterpart of batch_processing: yields ColumnBatch objects
+    holding only the users over the age of 25. The filter runs in SQL.
+    """
+    return stream_users_in_batches(batch_size, columnar=True,
+                                   where=[('age', '>', 25)])
 
 
 def batch_processing(batch_size):
     """
     Processes each batch of users to filter those over the age of 25.
+    The filter is pushed down to SQL, so younger users never leave the
+    database.
 
     Args:
         batch_size (int): The size of batches to process.
@@ -67,11 +243,10 @@ def batch_processing(batch_size):
         dict: A dictionary representing a user who is over 25.
     """
     # Loop 2: Iterates over batches yielded by stream_users_in_batches
-    for batch in stream_users_in_batches(batch_size):
+    for batch in stream_users_in_batches(batch_size, where=[('age', '>', 25)]):
         # Loop 3: Iterates over users within each batch
         for user in batch:
-            if user['age'] > 25:
-                yield user
+            yield user
 
 if __name__ == '__main__':
     import sys
@@ -92,5 +267,13 @@ if __name__ == '__main__':
             # print(user)
             count += 1
         print(f"Total users over 25 found: {count}")
+    except BrokenPipeError:
+        sys.stderr.close()
+
+    print("\n---")
+    print("Columnar processing of users over 25:")
+    try:
+        count = sum(len(batch) for batch in batch_processing_columnar(10))
+        print(f"Total users over 25 found: {count}")
     except BrokenPipeError:
         sys.stderr.close()
\ No newline at end of file
@@ -1,6 +1,11 @@
 import sqlite3
 import uuid
 import random
+import base64
+import json
+import time
+from datetime import date, datetime
+from decimal import Decimal
 from faker import Faker
 
 # --- Simulation of external 'seed' module ---
@@ -63,10 +68,20 @@ def paginate_users(page_size, offset):
     return dict_rows
 
 # --- The main generator function to be implemented ---
-def lazy_pagination(page_size):
+def lazy_pagination(page_size, mode='offset', key='user_id', cursor=None):
     """
     Generator function to lazily load paginated data directly from the users database.
+
+    With mode='keyset' pages are fetched by seeking on `key` (see
+    keyset_pagination), optionally resuming after `cursor`.
     """
+    if mode == 'keyset':
+        for page_data, _ in keyset_pagination(page_size, key=key, cursor=cursor):
+            yield page_data
+        return
+    if mode != 'offset':
+        raise ValueError(f"Unknown pagination mode: {mode!r}")
+
     offset = 0
     while True:
         # Connect to DB and fetch data directly within the generator
@@ -95,6 +110,274 @@ def lazy_pagination(page_size):
         offset += page_size
 
 
+# --- Keyset (seek) pagination ---
+# LIMIT/OFFSET makes the database walk and discard every row before the
+# requested page, so a full scan costs O(n^2) rows. Keyset pagination instead
+# remembers the last key it handed out and seeks past it with an index lookup.
+KEYSET_COLUMNS = ('user_id', 'name', 'email', 'age')
+
+
+# Key types JSON cannot carry, tagged so decode_cursor restores the same
+# type (MySQL returns DECIMAL columns such as age as Decimal). datetime is
+# listed before its base class date.
+_CURSOR_TYPES = (
+    ('decimal', Decimal, str, Decimal),
+    ('datetime', datetime, datetime.isoformat, datetime.fromisoformat),
+    ('date', date, date.isoformat, date.fromisoformat),
+    ('uuid', uuid.UUID, str, uuid.UUID),
+    ('bytes', bytes, lambda v: base64.b64encode(v).decode('ascii'), base64.b64decode),
+)
+
+
+def _tag_value(value):
+    for tag, kind, encode, _ in _CURSOR_TYPES:
+        if isinstance(value, kind):
+            return {'$' + tag: encode(value)}
+    raise TypeError(f"Cannot encode a {type(value).__name__} key in a pagination cursor")
+
+
+def _untag_value(obj):
+    if len(obj) == 1:
+        (name, value), = obj.items()
+        for tag, _, _, decode in _CURSOR_TYPES:
+            if name == '$' + tag:
+                return decode(value)
+    return obj
+
+
+def encode_cursor(key, last_value, last_id=None):
+    """
+    Encodes the position after `last_value` on sort key `key` as an opaque,
+    URL-safe token that can be stored and passed back to resume pagination.
+    For keys other than user_id the row's user_id is stored too, to break
+    ties between rows sharing last_value. Decimal, date, datetime, UUID and
+    bytes values are tagged so they decode to the same type.
+    """
+    payload = {'k': key, 'v': last_value}
+    if key != 'user_id':
+        payload['id'] = last_id
+    payload = json.dumps(payload, separators=(',', ':'), default=_tag_value)
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(token, key):
+    """
+    Decodes a token produced by encode_cursor and returns the position
+    (last_value, last_id); last_id is None when key is user_id.
+    Raises ValueError if the token is malformed or was issued for another key.
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token.encode('ascii')),
+                             object_hook=_untag_value)
+        cursor_key, last_value = payload['k'], payload['v']
+        last_id = payload['id'] if cursor_key != 'user_id' else None
+    except (ValueError, TypeError, KeyError, AttributeError) as e:
+        raise ValueError(f"Invalid pagination cursor: {token!r}") from e
+    if cursor_key != key:
+        raise ValueError(
+            f"Pagination cursor was issued for key {cursor_key!r}, not {key!r}")
+    return last_value, last_id
+
+
+def keyset_query(key, position, mark='?'):
+    """
+    Returns (sql, params) for the page after `position` in (key, user_id)
+    order, without the trailing LIMIT parameter.
+
+    user_id is unique and seeks on its own. Other keys can repeat, so they
+    seek on the (key, user_id) pair; seeking on key alone would skip rows
+    sharing a value across a page boundary. NULL keys sort first.
+    """
+    columns = "SELECT user_id, name, email, age FROM user_data"
+    order = "ORDER BY user_id" if key == 'user_id' else f"ORDER BY {key}, user_id"
+    if position is None:
+        return f"{columns} {order} LIMIT {mark}", ()
+    last_value, last_id = position
+    if key == 'user_id':
+        where, params = f"user_id > {mark}", (last_value,)
+    elif last_value is None:
+        where = f"({key} IS NULL AND user_id > {mark}) OR {key} IS NOT NULL"
+        params = (last_id,)
+    else:
+        where = f"({key}, user_id) > ({mark}, {mark})"
+        params = (last_value, last_id)
+    return f"{columns} WHERE {where} {order} LIMIT {mark}", params
+
+
+def keyset_pagination(page_size, key='user_id', cursor=None):
+    """
+    Generator that pages through user_data in `key` order, seeking past the
+    last row handed out (see keyset_query) instead of using OFFSET.
+
+    Args:
+        page_size (int): Number of rows per page.
+        key (str): Column to order and seek on; ties are broken by user_id.
+        cursor (str): Optional token from a previous page to resume after.
+
+    Yields:
+        tuple: (page, next_cursor) where page is a list of user dicts and
+        next_cursor is the token to resume after the last row of that page.
+    """
+    if key not in KEYSET_COLUMNS:
+        raise ValueError(f"Unsupported pagination key: {key!r}")
+    position = decode_cursor(cursor, key) if cursor is not None else None
+
+    while True:
+        connection = seed.connect_to_prodev()
+        cursor_obj = connection.cursor()
+        query, params = keyset_query(key, position)
+        cursor_obj.execute(query, params + (page_size,))
+        page_data_tuples = cursor_obj.fetchall()
+        connection.close()
+
+        if not page_data_tuples:
+            break
+        page_data = [dict(zip(KEYSET_COLUMNS, row)) for row in page_data_tuples]
+        position = (page_data[-1][key], page_data[-1]['user_id'])
+        yield page_data, encode_cursor(key, *position)
+        if len(page_data) < page_size:
+            break
+
+
+
+# --- Pagination engine with a persistent connection ---
+# lazy_pagination and paginate_users reconnect for every page, which on MySQL
+# costs a TCP handshake and an auth round trip per page. The engine holds one
+# connection for the whole iteration and reissues the same parameterised
+# query, so the driver can reuse its prepared statement.
+class PaginationStats:
+    """Counters collected by PaginationEngine while it iterates."""
+    def __init__(self):
+        self.pages = 0
+        self.rows = 0
+        self.elapsed = 0.0
+
+    @property
+    def pages_per_second(self):
+        return self.pages / self.elapsed if self.elapsed else 0.0
+
+    def __repr__(self):
+        return (f"PaginationStats(pages={self.pages}, rows={self.rows}, "
+                f"elapsed={self.elapsed:.4f}s, "
+                f"pages_per_second={self.pages_per_second:.1f})")
+
+
+class PaginationEngine:
+    """
+    Pages through user_data over a single connection.
+
+    Args:
+        page_size (int): Number of rows per page.
+        connect (callable): Returns a connection; called once per engine.
+            Pass a pool's checkout function (e.g. MySQLConnectionPool's
+            get_connection) to borrow a pooled connection instead; closing
+            it then hands it back to the pool.
+        mode (str): 'keyset' (seek on `key`, ties broken by user_id) or
+            'offset'.
+        key (str): Sort key used in keyset mode.
+    """
+    def __init__(self, page_size, connect=None, mode='keyset', key='user_id'):
+        if mode not in ('keyset', 'offset'):
+            raise ValueError(f"Unknown pagination mode: {mode!r}")
+        if key not in KEYSET_COLUMNS:
+            raise ValueError(f"Unsupported pagination key: {key!r}")
+        self.page_size = page_size
+        self.connect = connect if connect is not None else seed.connect_to_prodev
+        self.mode = mode
+        self.key = key
+        self.connection = None
+        self.stats = PaginationStats()
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+    def open(self):
+        if self.connection is None:
+            self.connection = self.connect()
+        return self.connection
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def _prepare(self):
+        """Returns a cursor and the driver's placeholder."""
+        if isinstance(self.connection, sqlite3.Connection):
+            # sqlite3 keeps compiled statements in a per-connection cache
+            # keyed on the SQL text, so a constant query string is prepared once.
+            return self.connection.cursor(), '?'
+        return self.connection.cursor(prepared=True), '%s'
+
+    def pages(self, cursor=None):
+        """
+        Yields (page, next_cursor) tuples like keyset_pagination. In offset
+        mode next_cursor is None. The connection stays open between pages.
+        """
+        self.open()
+        position = decode_cursor(cursor, self.key) if cursor is not None else None
+        db_cursor, mark = self._prepare()
+        offset_query = (f"SELECT user_id, name, email, age FROM user_data "
+                        f"LIMIT {mark} OFFSET {mark}")
+        offset = 0
+        try:
+            while True:
+                started = time.perf_counter()
+                if self.mode == 'offset':
+                    db_cursor.execute(offset_query, (self.page_size, offset))
+                else:
+                    query, params = keyset_query(self.key, position, mark)
+                    db_cursor.execute(query, params + (self.page_size,))
+                page_data_tuples = db_cursor.fetchall()
+                self.stats.elapsed += time.perf_counter() - started
+
+                if not page_data_tuples:
+                    break
+                page_data = [dict(zip(KEYSET_COLUMNS, row)) for row in page_data_tuples]
+                self.stats.pages += 1
+                self.stats.rows += len(page_data)
+                if self.mode == 'offset':
+                    offset += self.page_size
+                    yield page_data, None
+                else:
+                    position = (page_data[-1][self.key], page_data[-1]['user_id'])
+                    yield page_data, encode_cursor(self.key, *position)
+                if len(page_data) < self.page_size:
+                    break
+        finally:
+            db_cursor.close()
+
+    def __iter__(self):
+        for page_data, _ in self.pages():
+            yield page_data
+
+
+def benchmark_pagination(page_size=25):
+    """
+    Compares pages per second of per-page connect (lazy_pagination) against
+    a PaginationEngine holding one connection. Both are timed on the wall
+    clock around the whole iteration, connects and row conversion
+    included. Returns both rates.
+    """
+    def pages_per_second(pages_iter):
+        pages = 0
+        started = time.perf_counter()
+        for _ in pages_iter():
+            pages += 1
+        return pages / (time.perf_counter() - started)
+
+    def engine_pages():
+        with PaginationEngine(page_size, mode='offset') as engine:
+            yield from engine
+
+    return (pages_per_second(lambda: lazy_pagination(page_size)),
+            pages_per_second(engine_pages))
+
 if __name__ == '__main__':
     import sys
 
@@ -120,4 +403,22 @@ if __name__ == '__main__':
             total_users_fetched += len(page)
         print(f"Total users fetched across all pages: {total_users_fetched}")
     except BrokenPipeError:
-        sys.stderr.close()
\ No newline at end of file
+        sys.stderr.close()
+
+    print("\n---")
+    print("Keyset pagination with a resumable cursor:")
+    try:
+        resume_token = None
+        for page, resume_token in keyset_pagination(25):
+            print(f"Fetched {len(page)} users, resume cursor: {resume_token}")
+            break
+        for page, resume_token in keyset_pagination(25, cursor=resume_token):
+            print(f"Resumed with {len(page)} users starting at {page[0]['user_id']}")
+            break
+    except BrokenPipeError:
+        sys.stderr.close()
+
+    print("\n---")
+    print("Pages per second, per-page connect vs. persistent engine:")
+    per_page, engine_rate = benchmark_pagination(25)
+    print(f"per-page connect: {per_page:.1f} pages/s, engine: {engine_rate:.1f} pages/s")
\ No newline at end of file
@@ -4,32 +4,41 @@
 
 import sqlite3
 
-def stream_user_ages():
+from stream_aggregates import aggregate_stream, sql_aggregate
+
+def stream_user_ages(db_path='user_data.db'):
     # Connect to the database
-    conn = sqlite3.connect('user_data.db')
+    conn = sqlite3.connect(db_path)
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
-    
+
     # Fetch ages one by one
     cursor.execute("SELECT age FROM user_data")
-    
+
     # Yield each age
     for row in cursor:
         yield row['age']
-    
+
     cursor.close()
     conn.close()
 
-def calculate_average_age():
-    total_age = 0
-    count = 0
-    
-    for age in stream_user_ages():
-        total_age += age
-        count += 1
-    
-    average_age = total_age / count if count > 0 else 0
+def calculate_average_age(db_path='user_data.db'):
+    # AVG runs in the database, so no age rows are pulled into Python
+    conn = sqlite3.connect(db_path)
+    average_age = sql_aggregate(conn, 'avg', 'age') or 0
+    conn.close()
     print(f"Average age of users: {average_age}")
+    return average_age
+
+def calculate_age_percentiles(db_path='user_data.db', quantiles=(0.5, 0.9, 0.99)):
+    # Percentiles have no portable SQL aggregate, so estimate them client-side
+    # in a single constant-memory pass over the streamed ages
+    summary = aggregate_stream(stream_user_ages(db_path), quantiles=quantiles)
+    for p, value in summary['quantiles'].items():
+        print(f"p{p * 100:g} age of users: {value}")
+    return summary
 
 # Run the calculation
-calculate_average_age()
\ No newline at end of file
+if __name__ == '__main__':
+    calculate_average_age()
+    calculate_age_percentiles()
@@ -0,0 +1,119 @@
+#!/usr/bin/python3
+# async_streams.py
+# `async for` versions of the streaming generators, built on aiosqlite.
+#
+# Each stream reads ahead with a background task that keeps up to `prefetch`
+# batches in a bounded asyncio.Queue: the next batch is fetched while the
+# consumer processes the current one, and when the queue is full the reader
+# waits, so a slow consumer never makes memory grow.
+#
+# Wrap a stream in contextlib.aclosing() when breaking out early so the
+# reader task and its connection are released immediately.
+
+import asyncio
+from contextlib import suppress
+
+import aiosqlite
+
+COLUMNS = ('user_id', 'name', 'email', 'age')
+
+
+async def _read_ahead(source, prefetch):
+    """Re-yields items of the async iterator `source`, reading up to
+    `prefetch` items ahead in a background task."""
+    queue = asyncio.Queue(maxsize=max(1, prefetch))
+
+    async def pump():
+        try:
+            async for item in source:
+                await queue.put((False, item))
+        except Exception as e:
+            await queue.put((True, e))
+        else:
+            await queue.put((True, None))
+
+    reader = asyncio.create_task(pump())
+    try:
+        while True:
+            finished, item = await queue.get()
+            if finished:
+                if item is not None:
+                    raise item
+                return
+            yield item
+    finally:
+        reader.cancel()
+        with suppress(asyncio.CancelledError):
+            await reader
+
+
+async def _fetch_batches(db_path, query, params, batch_size):
+    async with aiosqlite.connect(db_path) as db:
+        async with db.execute(query, params) as cursor:
+            while batch := await cursor.fetchmany(batch_size):
+                yield batch
+
+
+async def async_stream_users_in_batches(batch_size, db_path='user_data.db',
+                                        prefetch=2):
+    """Yields lists of user dicts, batch_size at a time."""
+    source = _fetch_batches(
+        db_path, "SELECT user_id, name, email, age FROM user_data", (), batch_size)
+    async for batch in _read_ahead(source, prefetch):
+        yield [dict(zip(COLUMNS, row)) for row in batch]
+
+
+async def async_stream_users(db_path='user_data.db', batch_size=500, prefetch=2):
+    """Yields user dicts one by one, fetching batch_size rows at a time."""
+    async for batch in async_stream_users_in_batches(batch_size, db_path, prefetch):
+        for user in batch:
+            yield user
+
+
+async def async_lazy_pagination(page_size, db_path='user_data.db', prefetch=2):
+    """Yields pages of user dicts in user_id order over a single connection.
+    Each page seeks past the last user_id seen, so no rows are rescanned."""
+    async def pages():
+        async with aiosqlite.connect(db_path) as db:
+            query = ("SELECT user_id, name, email, age FROM user_data "
+                     "ORDER BY user_id LIMIT ?")
+            params = (page_size,)
+            while True:
+                async with db.execute(query, params) as cursor:
+                    rows = await cursor.fetchall()
+                if not rows:
+                    break
+                yield [dict(zip(COLUMNS, row)) for row in rows]
+                if len(rows) < page_size:
+                    break
+                query = ("SELECT user_id, name, email, age FROM user_data "
+                         "WHERE user_id > ? ORDER BY user_id LIMIT ?")
+                params = (rows[-1][0], page_size)
+
+    async for page in _read_ahead(pages(), prefetch):
+        yield page
+
+
+async def async_stream_user_ages(db_path='user_data.db', batch_size=1000,
+                                 prefetch=2):
+    """Yields ages one by one, fetching batch_size rows at a time."""
+    source = _fetch_batches(db_path, "SELECT age FROM user_data", (), batch_size)
+    async for batch in _read_ahead(source, prefetch):
+        for (age,) in batch:
+            yield age
+
+
+if __name__ == '__main__':
+    async def main():
+        total = count = 0
+        async for age in async_stream_user_ages():
+            total += age
+            count += 1
+        print(f"Average age of users: {total / count if count else 0}")
+
+        pages = 0
+        async for _ in async_lazy_pagination(50):
+            pages += 1
+        print(f"Pages of 50 users: {pages}")
+
+    asyncio.run(main())
@@ -0,0 +1,76 @@
+#!/usr/bin/python3
+# bench_pushdown.py
+# Compares filtering users over 25 in Python, as batch_processing did before
+# it used the where= pushdown, with pushing the predicate and projection down
+# into the SQL query.
+#
+# Usage: python3 bench_pushdown.py [row_count] [batch_size]
+
+import sqlite3
+import sys
+import time
+import uuid
+
+batch_module = __import__('1-batch_processing')
+
+
+def build_database(row_count):
+    """Returns an in-memory connection with row_count synthetic users."""
+    conn = sqlite3.connect(':memory:')
+    conn.execute('''
+        CREATE TABLE user_data (
+            user_id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            email TEXT UNIQUE NOT NULL,
+            age INTEGER
+        )
+    ''')
+    conn.executemany(
+        "INSERT INTO user_data VALUES (?, ?, ?, ?)",
+        ((str(uuid.uuid4()), f"User {i}", f"user{i}@example.com", 18 + i % 100)
+         for i in range(row_count)))
+    conn.commit()
+    return conn
+
+
+def python_filter(conn, batch_size):
+    """Fetches every row and discards users aged 25 or under in Python."""
+    count = 0
+    for batch in batch_module.stream_users_in_batches(batch_size, connection=conn):
+        for user in batch:
+            if user['age'] > 25:
+                count += 1
+    return count
+
+
+def pushdown_filter(conn, batch_size):
+    """Lets SQLite apply age > 25 so only matching rows are fetched."""
+    count = 0
+    for batch in batch_module.stream_users_in_batches(
+            batch_size, where=[('age', '>', 25)], connection=conn):
+        count += len(batch)
+    return count
+
+
+def projected_pushdown_filter(conn, batch_size):
+    """Pushdown plus a projection to the user_id and age columns."""
+    count = 0
+    for batch in batch_module.stream_users_in_batches(
+            batch_size, columns=['user_id', 'age'], where=[('age', '>', 25)],
+            connection=conn):
+        count += len(batch)
+    return count
+
+
+if __name__ == '__main__':
+    row_count = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    conn = build_database(row_count)
+    for label, run in (('python filter', python_filter),
+                       ('pushdown', pushdown_filter),
+                       ('pushdown + projection', projected_pushdown_filter)):
+        started = time.perf_counter()
+        matched = run(conn, batch_size)
+        elapsed = time.perf_counter() - started
+        print(f"{label:>22}: {matched} users in {elapsed:.3f}s")
+    conn.close()
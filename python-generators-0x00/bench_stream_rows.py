@@ -0,0 +1,139 @@
+#!/usr/bin/python3
+# bench_stream_rows.py
+# Peak RSS of seed.stream_db_rows, buffered vs. server-side, as user_data grows.
+#
+# A local SQLite file stands in for MySQL. SQLiteStandIn mimics
+# mysql-connector's cursor(dictionary=..., buffered=...) semantics: a buffered
+# cursor reads the full result set on execute(), an unbuffered one pulls rows
+# from the database only as they are fetched, and like mysql-connector neither
+# the cursor nor the connection can be used again while rows are still unread.
+# Each measurement runs in a fresh subprocess so ru_maxrss reflects a single
+# streaming pass.
+#
+# Usage: python3 bench_stream_rows.py [row_count ...]
+
+import os
+import resource
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import uuid
+
+import seed
+
+DEFAULT_ROW_COUNTS = (50_000, 200_000, 800_000)
+
+
+def _unread_result():
+    return seed.mysql.connector.InternalError("Unread result found")
+
+
+class _StandInCursor:
+    def __init__(self, connection, dictionary, buffered):
+        self._cursor = connection.cursor()
+        self._dictionary = dictionary
+        self._buffered = buffered
+        self._rows = None
+        self._unread = False
+
+    def _convert(self, rows):
+        if not self._dictionary:
+            return rows
+        columns = [column[0] for column in self._cursor.description]
+        return [dict(zip(columns, row)) for row in rows]
+
+    def execute(self, query, params=()):
+        self._cursor.execute(query, params)
+        if self._buffered:
+            self._rows = iter(self._convert(self._cursor.fetchall()))
+        else:
+            self._unread = True
+
+    def fetchmany(self, size):
+        if self._buffered:
+            return [row for _, row in zip(range(size), self._rows)]
+        rows = self._cursor.fetchmany(size)
+        if len(rows) < size:
+            self._unread = False
+        return self._convert(rows)
+
+    def __iter__(self):
+        if self._buffered:
+            return self._rows
+        return (row for batch in iter(lambda: self.fetchmany(1000), [])
+                for row in batch)
+
+    def close(self):
+        if self._unread:
+            raise _unread_result()
+        self._cursor.close()
+
+
+class SQLiteStandIn:
+    """Wraps a sqlite3 connection with a mysql-connector style cursor()."""
+    def __init__(self, path):
+        self._connection = sqlite3.connect(path)
+        self._last_cursor = None
+
+    def cursor(self, dictionary=False, buffered=True):
+        if self._last_cursor is not None and self._last_cursor._unread:
+            raise _unread_result()
+        self._last_cursor = _StandInCursor(self._connection, dictionary, buffered)
+        return self._last_cursor
+
+    def close(self):
+        self._connection.close()
+
+
+def build_database(path, row_count):
+    """Creates a user_data table with row_count synthetic users."""
+    conn = sqlite3.connect(path)
+    conn.execute('''
+        CREATE TABLE user_data (
+            user_id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            email TEXT NOT NULL,
+            age REAL NOT NULL
+        )
+    ''')
+    conn.executemany(
+        "INSERT INTO user_data VALUES (?, ?, ?, ?)",
+        ((str(uuid.uuid4()), f"User {i}", f"user{i}@example.com", 18 + i % 100)
+         for i in range(row_count)))
+    conn.commit()
+    conn.close()
+
+
+def measure(path, server_side, fetch_size=1000):
+    """Streams every row once and returns (row_count, peak RSS in KiB)."""
+    connection = SQLiteStandIn(path)
+    count = 0
+    for _ in seed.stream_db_rows(connection, server_side=server_side,
+                                 fetch_size=fetch_size):
+        count += 1
+    connection.close()
+    return count, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def main(row_counts):
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'rows':>10} {'buffered KiB':>14} {'server-side KiB':>16}")
+        for row_count in row_counts:
+            path = os.path.join(tmp, f"user_data_{row_count}.db")
+            build_database(path, row_count)
+            peaks = []
+            for mode in ('buffered', 'server_side'):
+                output = subprocess.run(
+                    [sys.executable, __file__, '--child', mode, path],
+                    check=True, capture_output=True, text=True).stdout
+                peaks.append(int(output.split()[1]))
+            print(f"{row_count:>10} {peaks[0]:>14} {peaks[1]:>16}")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        rows, peak = measure(sys.argv[3], server_side=sys.argv[2] == 'server_side')
+        print(rows, peak)
+    else:
+        main([int(arg) for arg in sys.argv[1:]] or DEFAULT_ROW_COUNTS)
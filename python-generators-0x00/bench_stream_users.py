@@ -0,0 +1,69 @@
+#!/usr/bin/python3
+# bench_stream_users.py
+# Throughput and allocation of stream_users with dict rows vs. Record rows.
+#
+# Usage: python3 bench_stream_users.py [row_count]
+
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from itertools import islice
+
+stream_users = __import__('0-stream_users').stream_users
+
+
+def build_database(path, row_count):
+    conn = sqlite3.connect(path)
+    conn.execute('''
+        CREATE TABLE user_data (
+            user_id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            email TEXT NOT NULL,
+            age INTEGER
+        )
+    ''')
+    conn.executemany(
+        "INSERT INTO user_data VALUES (?, ?, ?, ?)",
+        ((str(uuid.uuid4()), f"User {i}", f"user{i}@example.com", 18 + i % 100)
+         for i in range(row_count)))
+    conn.commit()
+    conn.close()
+
+
+def throughput(path, row_type):
+    """
+    Streams every row, reading one field, and returns (matched, rows per
+    second) where the rate counts every streamed row.
+    """
+    started = time.perf_counter()
+    rows = matched = 0
+    for user in stream_users(path, row_type):
+        rows += 1
+        if user['age'] > 25:
+            matched += 1
+    return matched, rows / (time.perf_counter() - started)
+
+
+def bytes_per_row(path, row_type, sample=100_000):
+    """Traced bytes allocated per retained row for the first `sample` rows."""
+    tracemalloc.start()
+    rows = list(islice(stream_users(path, row_type), sample))
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current / len(rows) if rows else 0.0
+
+
+if __name__ == '__main__':
+    row_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'user_data.db')
+        build_database(path, row_count)
+        for row_type in ('dict', 'record'):
+            matched, rate = throughput(path, row_type)
+            per_row = bytes_per_row(path, row_type)
+            print(f"{row_type:>6}: {rate:,.0f} rows/s ({matched} matched), "
+                  f"{per_row:.0f} bytes per retained row")
@@ -0,0 +1,243 @@
+#!/usr/bin/python3
+# parallel_seed.py
+# Sharded, multi-process CSV ingestion for user_data.
+#
+# The CSV is split into byte ranges aligned to line boundaries, each range is
+# parsed and validated in a ProcessPoolExecutor worker, and the parsed rows
+# are written by N writer threads, each holding its own connection.
+#
+# Usage: python3 parallel_seed.py user_data.csv bench.db [workers ...]
+# Runs the loader once per worker count against a fresh SQLite file.
+
+import csv
+import functools
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+
+def split_csv(csv_file, shards):
+    """Return (header, [(start, end), ...]) byte ranges covering the data rows.
+
+    Each range starts at the beginning of a line and ends just before the
+    start of the next range, so no row is split across shards. Rows must not
+    contain quoted newlines.
+    """
+    with open(csv_file, 'rb') as file:
+        header = file.readline()
+        data_start = file.tell()
+        size = os.fstat(file.fileno()).st_size
+        boundaries = [data_start]
+        for i in range(1, shards):
+            file.seek(max(data_start + (size - data_start) * i // shards,
+                          boundaries[-1]))
+            if file.tell() > data_start:
+                file.readline()  # move to the start of the next line
+            boundaries.append(max(file.tell(), boundaries[-1]))
+        boundaries.append(size)
+    ranges = [(start, end) for start, end in zip(boundaries, boundaries[1:])
+              if end > start]
+    return header.decode('utf-8'), ranges
+
+
+def parse_range(csv_file, header, start, end):
+    """Parse and validate one byte range of the CSV.
+
+    Runs in a worker process. Returns a dict with the worker pid, the valid
+    (user_id, name, email, age) tuples, the number of rejected rows and the
+    time spent parsing.
+    """
+    started = time.perf_counter()
+    with open(csv_file, 'rb') as file:
+        file.seek(start)
+        lines = file.read(end - start).decode('utf-8').splitlines()
+    columns = next(csv.reader([header]))
+    rows, rejected = [], 0
+    for record in csv.DictReader(lines, fieldnames=columns):
+        try:
+            user_id = str(uuid.UUID(record['user_id']))
+            name, email = record['name'].strip(), record['email'].strip()
+            age = float(record['age'])
+        except (KeyError, TypeError, ValueError, AttributeError):
+            rejected += 1
+            continue
+        if not name or not email:
+            rejected += 1
+            continue
+        rows.append((user_id, name, email, age))
+    return {'pid': os.getpid(), 'rows': rows, 'rejected': rejected,
+            'seconds': time.perf_counter() - started}
+
+
+def _insert_query(connection):
+    """INSERT-ignore statement for user_data in the connection's dialect."""
+    if isinstance(connection, sqlite3.Connection):
+        return ("INSERT OR IGNORE INTO user_data (user_id, name, email, age) "
+                "VALUES (?, ?, ?, ?)")
+    return ("INSERT IGNORE INTO user_data (user_id, name, email, age) "
+            "VALUES (%s, %s, %s, %s)")
+
+
+def _writer(connect, batches, report, failed):
+    """Writer thread: drains row batches into user_data on its own connection.
+
+    Any error is stored in report['error'] and sets `failed`, which stops the
+    other writers and the producer instead of leaving them blocked on the
+    queue.
+    """
+    connection = cursor = None
+    try:
+        connection = connect()
+        insert_query = _insert_query(connection)
+        cursor = connection.cursor()
+        while not failed.is_set():
+            try:
+                batch = batches.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if batch is None:
+                break
+            started = time.perf_counter()
+            cursor.executemany(insert_query, batch)
+            connection.commit()
+            report['seconds'] += time.perf_counter() - started
+            report['rows'] += len(batch)
+            report['inserted'] += max(cursor.rowcount, 0)
+    except Exception as e:
+        report['error'] = e
+        failed.set()
+    finally:
+        if cursor is not None:
+            cursor.close()
+        if connection is not None:
+            connection.close()
+
+
+def _put(batches, item, failed):
+    """Queue item unless a writer has failed; return False if it has."""
+    while not failed.is_set():
+        try:
+            batches.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def parallel_insert_data(csv_file, connect, workers=4, writers=None,
+                         batch_size=1000):
+    """Load csv_file into user_data using `workers` parser processes.
+
+    Args:
+        csv_file (str): Path to user_data.csv.
+        connect (callable): Returns a new database connection; called once
+            per writer thread.
+        workers (int): Number of parser processes.
+        writers (int): Number of writer connections (defaults to workers).
+        batch_size (int): Rows per executemany/commit.
+
+    Returns:
+        dict: elapsed, rows (valid rows written), inserted (rows actually
+        inserted, duplicates excluded), rejected, rows_per_second, and
+        per-worker 'parsers' (keyed by pid) and 'writers' throughput reports.
+
+    Raises:
+        The first writer error (failed connect, missing table, lock timeout,
+        ...) once the remaining writers and parsers have stopped.
+    """
+    writers = writers or workers
+    started = time.perf_counter()
+    header, ranges = split_csv(csv_file, workers * 4)
+
+    batches = queue.Queue(maxsize=writers * 4)
+    failed = threading.Event()
+    writer_reports = [{'rows': 0, 'inserted': 0, 'seconds': 0.0}
+                      for _ in range(writers)]
+    threads = [threading.Thread(target=_writer,
+                                args=(connect, batches, report, failed))
+               for report in writer_reports]
+    for thread in threads:
+        thread.start()
+
+    parser_reports = {}
+    rejected = 0
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(parse_range, csv_file, header, start, end)
+                       for start, end in ranges]
+            for future in as_completed(futures):
+                result = future.result()
+                report = parser_reports.setdefault(
+                    result['pid'], {'rows': 0, 'seconds': 0.0})
+                report['rows'] += len(result['rows'])
+                report['seconds'] += result['seconds']
+                rejected += result['rejected']
+                rows = result['rows']
+                for i in range(0, len(rows), batch_size):
+                    if not _put(batches, rows[i:i + batch_size], failed):
+                        break
+                if failed.is_set():
+                    pool.shutdown(cancel_futures=True)
+                    break
+    finally:
+        for _ in threads:
+            _put(batches, None, failed)
+        for thread in threads:
+            thread.join()
+
+    errors = [report.pop('error') for report in writer_reports
+              if 'error' in report]
+    if errors:
+        raise errors[0]
+
+    for report in list(parser_reports.values()) + writer_reports:
+        report['rows_per_second'] = (report['rows'] / report['seconds']
+                                     if report['seconds'] else 0.0)
+    elapsed = time.perf_counter() - started
+    total = sum(report['rows'] for report in writer_reports)
+    inserted = sum(report['inserted'] for report in writer_reports)
+    return {'elapsed': elapsed, 'rows': total, 'inserted': inserted,
+            'rejected': rejected,
+            'rows_per_second': total / elapsed if elapsed else 0.0,
+            'parsers': parser_reports, 'writers': writer_reports}
+
+
+def _create_sqlite_table(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS user_data (
+            user_id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            email TEXT NOT NULL,
+            age REAL NOT NULL
+        )
+    ''')
+    conn.commit()
+    conn.close()
+
+
+if __name__ == '__main__':
+    csv_path, db_path = sys.argv[1], sys.argv[2]
+    for worker_count in [int(arg) for arg in sys.argv[3:]] or [1, 2, 4, 8]:
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
+        _create_sqlite_table(db_path)
+        result = parallel_insert_data(
+            csv_path, functools.partial(sqlite3.connect, db_path, timeout=60),
+            workers=worker_count)
+        print(f"workers={worker_count}: {result['inserted']} of {result['rows']} rows inserted in "
+              f"{result['elapsed']:.2f}s ({result['rows_per_second']:.0f} rows/s, "
+              f"{result['rejected']} rejected)")
+        for pid, report in sorted(result['parsers'].items()):
+            print(f"  parser {pid}: {report['rows']} rows, "
+                  f"{report['rows_per_second']:.0f} rows/s")
+        for i, report in enumerate(result['writers']):
+            print(f"  writer {i}: {report['rows']} rows, "
+                  f"{report['rows_per_second']:.0f} rows/s")
@@ -0,0 +1,195 @@
+#!/usr/bin/python3
+# partitioned_scan.py
+# Parallel, range-partitioned scan of user_data across worker processes.
+#
+# The table is split into key ranges of about partition_rows rows, either
+# rowid ranges (the SQLite default) or boundaries sampled from the sorted
+# values of a key column, plus one range for NULL keys. Each range is read on
+# its own connection in a ProcessPoolExecutor worker, where the per-row
+# conversion and optional transform run, and the results are merged back into
+# one iterator, in key order or as ranges complete.
+#
+# Usage: python3 partitioned_scan.py [db_path] [workers]
+
+import os
+import sqlite3
+import sys
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+
+def _identifier(name):
+    if not name.isidentifier():
+        raise ValueError(f"Invalid identifier: {name!r}")
+    return name
+
+
+# Stands in for a (low, high) range: the rows whose key is NULL, which no
+# bounded range can match.
+NULL_KEYS = ('null',)
+
+
+def plan_partitions(db_path, partitions=None, table='user_data', key=None,
+                    partition_rows=10_000):
+    """
+    Splits `table` into ranges of about `partition_rows` rows each, or into
+    at most `partitions` ranges when that is given. A range is a (low, high)
+    pair covering low <= key < high, where None means unbounded.
+
+    With key=None the ranges are slices of rowid; otherwise boundaries are
+    sampled in one pass over the sorted non-NULL values of `key`, which
+    should be indexed. If `key` has NULLs, NULL_KEYS is planned first (NULLs
+    sort first) to cover them.
+    """
+    table = _identifier(table)
+    conn = sqlite3.connect(db_path)
+    try:
+        if key is None:
+            low, high = conn.execute(
+                f"SELECT MIN(rowid), MAX(rowid) FROM {table}").fetchone()
+            if low is None:
+                return []
+            # A rowid slice never holds more rows than it has rowids
+            step = (partition_rows if partitions is None
+                    else -(-(high - low + 1) // partitions))
+            step = max(1, step)
+            return [(start, min(start + step, high + 1))
+                    for start in range(low, high + 1, step)]
+
+        key = _identifier(key)
+        total, keyed = conn.execute(
+            f"SELECT COUNT(*), COUNT({key}) FROM {table}").fetchone()
+        ranges = [NULL_KEYS] if total > keyed else []
+        if not keyed:
+            return ranges
+        step = (partition_rows if partitions is None
+                else -(-keyed // partitions))
+        step = max(1, step)
+        boundaries = []
+        cursor = conn.execute(
+            f"SELECT {key} FROM {table} WHERE {key} IS NOT NULL ORDER BY {key}")
+        for i, (value,) in enumerate(cursor):
+            if i and i % step == 0 and (not boundaries or value > boundaries[-1]):
+                boundaries.append(value)
+        edges = [None] + boundaries + [None]
+        return ranges + list(zip(edges, edges[1:]))
+    finally:
+        conn.close()
+
+
+def scan_range(db_path, table, key, bounds, transform=None):
+    """
+    Reads one range, a (low, high) pair or NULL_KEYS, on its own connection
+    and returns its rows as dicts, ordered by key. Runs in a worker process;
+    `transform`, if given, must be a picklable module-level function applied
+    to each row dict.
+    """
+    table = _identifier(table)
+    column = 'rowid' if key is None else _identifier(key)
+    clauses, params = [], []
+    if tuple(bounds) == NULL_KEYS:
+        clauses.append(f"{column} IS NULL")
+    else:
+        low, high = bounds
+        if low is not None:
+            clauses.append(f"{column} >= ?")
+            params.append(low)
+        if high is not None:
+            clauses.append(f"{column} < ?")
+            params.append(high)
+        if key is not None and low is None and high is None:
+            clauses.append(f"{column} IS NOT NULL")
+    where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        cursor = conn.execute(
+            f"SELECT * FROM {table}{where} ORDER BY {column}", params)
+        if transform is None:
+            return [dict(row) for row in cursor]
+        return [transform(dict(row)) for row in cursor]
+    finally:
+        conn.close()
+
+
+def partitioned_scan(db_path='user_data.db', workers=None, partitions=None,
+                     ordered=True, transform=None, table='user_data', key=None,
+                     partition_rows=10_000):
+    """
+    Generator yielding every row of `table`, scanned in parallel.
+
+    Each range is read whole by a worker, and up to workers + 1 ranges are
+    in flight or waiting to be yielded, so memory stays around
+    (workers + 1) * partition_rows rows however large the table is.
+    Ranges not yet started are cancelled if the generator is closed early.
+
+    Args:
+        db_path (str): SQLite database file.
+        workers (int): Worker processes (defaults to os.cpu_count()).
+        partitions (int): Fixed number of ranges, overriding partition_rows.
+        ordered (bool): Yield rows in key order (NULL keys first). When
+            False, ranges are yielded as soon as they complete.
+        transform (callable): Picklable per-row function run in the workers.
+        table (str): Table to scan.
+        key (str): Partitioning column; None partitions by rowid.
+        partition_rows (int): Target rows per range.
+    """
+    workers = workers or os.cpu_count() or 1
+    ranges = plan_partitions(db_path, partitions, table, key, partition_rows)
+    window = workers + 1
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = iter(ranges)
+
+        def submit_next():
+            bounds = next(pending, None)
+            if bounds is None:
+                return None
+            return pool.submit(scan_range, db_path, table, key, bounds, transform)
+
+        in_flight = deque() if ordered else set()
+        try:
+            if ordered:
+                for _ in range(window):
+                    future = submit_next()
+                    if future is not None:
+                        in_flight.append(future)
+                while in_flight:
+                    rows = in_flight.popleft().result()
+                    future = submit_next()
+                    if future is not None:
+                        in_flight.append(future)
+                    yield from rows
+                    del rows
+            else:
+                in_flight = {f for f in (submit_next() for _ in range(window))
+                             if f is not None}
+                while in_flight:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        future_next = submit_next()
+                        if future_next is not None:
+                            in_flight.add(future_next)
+                        yield from future.result()
+        finally:
+            # On early exit, drop queued ranges instead of reading them all
+            for future in in_flight:
+                future.cancel()
+
+
+if __name__ == '__main__':
+    db_file = sys.argv[1] if len(sys.argv) > 1 else 'user_data.db'
+    worker_count = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+
+    started = time.perf_counter()
+    sequential = sum(1 for _ in scan_range(db_file, 'user_data', None, (None, None)))
+    print(f"sequential: {sequential} rows in {time.perf_counter() - started:.3f}s")
+
+    for ordered in (True, False):
+        started = time.perf_counter()
+        count = sum(1 for _ in partitioned_scan(db_file, worker_count, ordered=ordered))
+        print(f"partitioned ({'ordered' if ordered else 'unordered'}, "
+              f"{worker_count} workers): {count} rows in "
+              f"{time.perf_counter() - started:.3f}s")
@@ -0,0 +1,149 @@
+#!/usr/bin/python3
+# prefetch.py
+# Double-buffered batch iterator backed by a background reader thread.
+#
+# A reader thread pulls batches from the wrapped generator into a bounded
+# queue, so fetchmany() overlaps with the consumer's work. Stall times show
+# which side is waiting: a high producer stall means the consumer is the
+# bottleneck (the queue is full), a high consumer stall means the database is
+# (the queue is empty). Size `depth` from those numbers.
+#
+# The wrapped generator runs, and is closed, entirely on the reader thread,
+# so generators that open their own sqlite3 connection work unchanged.
+
+import queue
+import threading
+import time
+
+_DONE = object()
+
+
+class PrefetchStats:
+    """Counters collected by a PrefetchIterator."""
+    def __init__(self):
+        self.items = 0
+        self.producer_stall = 0.0
+        self.consumer_stall = 0.0
+
+    def __repr__(self):
+        return (f"PrefetchStats(items={self.items}, "
+                f"producer_stall={self.producer_stall:.4f}s, "
+                f"consumer_stall={self.consumer_stall:.4f}s)")
+
+
+class PrefetchIterator:
+    """
+    Iterates over `iterable` while a background thread keeps up to `depth`
+    items buffered ahead. Use it as a context manager, or call close(), to
+    stop the reader when breaking out early.
+    """
+    def __init__(self, iterable, depth=2, poll_interval=0.05):
+        self.stats = PrefetchStats()
+        self._iterable = iterable
+        self._queue = queue.Queue(maxsize=max(1, depth))
+        self._stop = threading.Event()
+        self._poll_interval = poll_interval
+        self._error = None
+        self._finished = False
+        self._thread = threading.Thread(target=self._produce, daemon=True)
+        self._thread.start()
+
+    def _put(self, item):
+        """Blocks until item is queued; returns False if close() was called."""
+        started = time.perf_counter()
+        try:
+            while not self._stop.is_set():
+                try:
+                    self._queue.put(item, timeout=self._poll_interval)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        finally:
+            self.stats.producer_stall += time.perf_counter() - started
+
+    def _produce(self):
+        iterator = iter(self._iterable)
+        try:
+            for item in iterator:
+                if not self._put(item):
+                    return
+        except BaseException as e:
+            self._error = e
+        finally:
+            close = getattr(iterator, 'close', None)
+            if close is not None:
+                close()
+            self._put(_DONE)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._finished:
+            raise StopIteration
+        started = time.perf_counter()
+        item = self._queue.get()
+        self.stats.consumer_stall += time.perf_counter() - started
+        if item is _DONE:
+            self._finished = True
+            self._thread.join()
+            if self._error is not None:
+                raise self._error
+            raise StopIteration
+        self.stats.items += 1
+        return item
+
+    def close(self):
+        """Stops the reader thread and closes the wrapped generator."""
+        if self._finished:
+            return
+        self._finished = True
+        self._stop.set()
+        while self._thread.is_alive():
+            try:
+                self._queue.get(timeout=self._poll_interval)
+            except queue.Empty:
+                pass
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+    def __del__(self):
+        self.close()
+
+
+def prefetch_batch_processing(batch_size, depth=2):
+    """
+    batch_processing with the next batches fetched in the background while
+    the current one is consumed. Yields users over the age of 25.
+    """
+    stream_users_in_batches = __import__('1-batch_processing').stream_users_in_batches
+    source = stream_users_in_batches(batch_size, where=[('age', '>', 25)])
+    with PrefetchIterator(source, depth) as batches:
+        for batch in batches:
+            yield from batch
+
+
+if __name__ == '__main__':
+    def slow_batches(count, delay):
+        for i in range(count):
+            time.sleep(delay)
+            yield [i]
+
+    with PrefetchIterator(slow_batches(20, 0.01), depth=4) as batches:
+        for batch in batches:
+            time.sleep(0.02)  # consumer slower than producer
+    print("slow consumer:", batches.stats)
+
+    with PrefetchIterator(slow_batches(20, 0.02), depth=4) as batches:
+        for batch in batches:
+            time.sleep(0.01)  # producer slower than consumer
+    print("slow producer:", batches.stats)
+
+    print("Users over 25:", sum(1 for _ in prefetch_batch_processing(5)))
@@ -2,6 +2,9 @@
 import mysql.connector
 import csv
 import uuid
+import sqlite3
+import time
+from itertools import islice
 
 def connect_db():
     """Connect to the MySQL server."""
@@ -91,13 +94,132 @@ def insert_data(connection, csv_file):
     except KeyError as e:
         print(f"Missing column in CSV: {e}")
 
-def stream_db_rows(connection):
-    """Generator to stream rows from user_data table one by one."""
+def _dialect(connection):
+    """Return (placeholder, insert-ignore verb) for the connection's driver."""
+    if isinstance(connection, sqlite3.Connection):
+        return "?", "INSERT OR IGNORE"
+    return "%s", "INSERT IGNORE"
+
+def read_csv_chunks(csv_file, chunk_size, start=0):
+    """Generator yielding lists of (user_id, name, email, age) tuples.
+
+    Reads the CSV lazily, skipping the first `start` data rows, so only one
+    chunk is held in memory at a time.
+    """
+    with open(csv_file, 'r', newline='') as file:
+        csv_reader = csv.DictReader(file)
+        rows = (
+            (row['user_id'], row['name'], row['email'], float(row['age']))
+            for row in islice(csv_reader, start, None)
+        )
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            yield chunk
+
+def bulk_insert_data(connection, csv_file, batch_size=1000, resume_offset=0,
+                     dedupe="ignore"):
+    """Bulk-load user_data from a CSV file.
+
+    Rows are streamed in chunks of batch_size, written with one executemany
+    per chunk and committed per chunk. Existing user_ids are skipped either by
+    the database (dedupe="ignore", INSERT IGNORE / INSERT OR IGNORE) or by a
+    key set preloaded in one pass over user_data (dedupe="preload").
+
+    resume_offset is the number of CSV data rows to skip; after a failure the
+    chunk that failed is rolled back, so none of its rows are left pending on
+    the connection, and the returned next_offset is the value to resume
+    from, in either dedupe mode. Returns a stats dict
+    with rows_read, rows_inserted, next_offset, elapsed and rows_per_second.
+    """
+    if dedupe not in ("ignore", "preload"):
+        raise ValueError(f"Unknown dedupe mode: {dedupe}")
+    mark, insert_ignore = _dialect(connection)
+    verb = insert_ignore if dedupe == "ignore" else "INSERT"
+    insert_query = (f"{verb} INTO user_data (user_id, name, email, age) "
+                    f"VALUES ({mark}, {mark}, {mark}, {mark})")
+    stats = {"rows_read": 0, "rows_inserted": 0, "next_offset": resume_offset,
+             "elapsed": 0.0, "rows_per_second": 0.0}
+    start_time = time.perf_counter()
+    cursor = None
     try:
-        cursor = connection.cursor(dictionary=True)
-        cursor.execute("SELECT * FROM user_data;")
-        for row in cursor:
-            yield row
-        cursor.close()
+        cursor = connection.cursor()
+        existing = None
+        if dedupe == "preload":
+            cursor.execute("SELECT user_id FROM user_data;")
+            existing = {row[0] for row in cursor.fetchall()}
+        for chunk in read_csv_chunks(csv_file, batch_size, resume_offset):
+            batch = chunk
+            if existing is not None:
+                batch = []
+                for row in chunk:
+                    if row[0] not in existing:
+                        existing.add(row[0])
+                        batch.append(row)
+            if batch:
+                cursor.executemany(insert_query, batch)
+                stats["rows_inserted"] += max(cursor.rowcount, 0)
+            connection.commit()
+            stats["rows_read"] += len(chunk)
+            stats["next_offset"] += len(chunk)
+    except (mysql.connector.Error, sqlite3.Error) as err:
+        # A failed executemany may have written part of its chunk; drop it
+        # so the next commit on this connection does not write it either
+        connection.rollback()
+        print(f"Error inserting data: {err} "
+              f"(resume with resume_offset={stats['next_offset']})")
+    except FileNotFoundError:
+        print(f"CSV file {csv_file} not found")
+    except KeyError as e:
+        print(f"Missing column in CSV: {e}")
+    finally:
+        if cursor is not None:
+            cursor.close()
+    stats["elapsed"] = time.perf_counter() - start_time
+    if stats["elapsed"]:
+        stats["rows_per_second"] = stats["rows_read"] / stats["elapsed"]
+    print(f"Loaded {stats['rows_inserted']} of {stats['rows_read']} rows "
+          f"at {stats['rows_per_second']:.0f} rows/s")
+    return stats
+
+def stream_db_rows(connection, server_side=False, fetch_size=1000):
+    """Generator to stream rows from user_data table one by one.
+
+    By default mysql-connector uses a buffered cursor, which reads the whole
+    result set into client memory before the first row is yielded. With
+    server_side=True the cursor is unbuffered: rows stay on the server and are
+    pulled over the socket fetch_size at a time, so memory stays flat no
+    matter how large user_data grows.
+
+    An unbuffered result must be read to the end before its cursor can be
+    closed or the connection reused; mysql-connector raises "Unread result
+    found" otherwise. If the caller stops early, the remaining rows are
+    read and discarded fetch_size at a time, which costs the rest of the
+    transfer but keeps memory flat and the connection usable.
+    """
+    try:
+        if server_side:
+            cursor = connection.cursor(dictionary=True, buffered=False)
+        else:
+            cursor = connection.cursor(dictionary=True)
+        exhausted = False
+        try:
+            cursor.execute("SELECT * FROM user_data;")
+            if server_side:
+                while True:
+                    rows = cursor.fetchmany(fetch_size)
+                    if not rows:
+                        break
+                    yield from rows
+            else:
+                for row in cursor:
+                    yield row
+            exhausted = True
+        finally:
+            if server_side and not exhausted:
+                while cursor.fetchmany(fetch_size):
+                    pass
+            cursor.close()
     except mysql.connector.Error as err:
         print(f"Error streaming data: {err}")
\ No newline at end of file
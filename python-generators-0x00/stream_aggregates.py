@@ -0,0 +1,223 @@
+#!/usr/bin/python3
+# stream_aggregates.py
+# Streaming aggregation over user_data.
+#
+# Simple aggregates (count, sum, avg, min, max, optionally grouped) are pushed
+# down to SQL so only the result crosses the driver boundary. When values must
+# be transformed client-side, aggregate_stream computes everything in a single
+# pass and constant memory with online algorithms:
+#   - Welford's algorithm for mean and variance
+#   - the P-square algorithm (Jain & Chlamtac) for quantile estimates
+#   - HyperLogLog for approximate distinct counts
+
+import hashlib
+import math
+
+SQL_AGGREGATES = ('count', 'sum', 'avg', 'min', 'max')
+
+
+def _identifier(name):
+    if not name.isidentifier():
+        raise ValueError(f"Invalid identifier: {name!r}")
+    return name
+
+
+def sql_aggregate(conn, func, column='age', table='user_data', group_by=None):
+    """
+    Computes func(column) in the database.
+
+    Args:
+        conn: An open DB-API connection.
+        func (str): One of count, sum, avg, min, max.
+        column (str): Column to aggregate; '*' is allowed for count.
+        table (str): Table to read.
+        group_by (str): Optional column to group by.
+
+    Returns:
+        The aggregate value, or a dict of {group: value} when group_by is set.
+    """
+    func = func.lower()
+    if func not in SQL_AGGREGATES:
+        raise ValueError(f"Unsupported aggregate: {func!r}")
+    column = '*' if column == '*' and func == 'count' else _identifier(column)
+    table = _identifier(table)
+    cursor = conn.cursor()
+    try:
+        if group_by is None:
+            cursor.execute(f"SELECT {func}({column}) FROM {table}")
+            return cursor.fetchone()[0]
+        group_by = _identifier(group_by)
+        cursor.execute(f"SELECT {group_by}, {func}({column}) FROM {table} "
+                       f"GROUP BY {group_by}")
+        return dict(cursor.fetchall())
+    finally:
+        cursor.close()
+
+
+class Welford:
+    """Online count, mean, variance, min and max."""
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, x):
+        x = float(x)
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (x - self.mean)
+        if self.min is None or x < self.min:
+            self.min = x
+        if self.max is None or x > self.max:
+            self.max = x
+
+    @property
+    def variance(self):
+        """Sample variance (n - 1 denominator); 0.0 for fewer than 2 values."""
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stddev(self):
+        return math.sqrt(self.variance)
+
+
+class P2Quantile:
+    """
+    Estimates the p-quantile of a stream with five markers (P-square
+    algorithm), in O(1) memory per quantile.
+    """
+    def __init__(self, p):
+        if not 0 < p < 1:
+            raise ValueError("p must be between 0 and 1")
+        self.p = p
+        self._initial = []
+        self._heights = None
+
+    def add(self, x):
+        x = float(x)
+        if self._heights is None:
+            self._initial.append(x)
+            if len(self._initial) == 5:
+                p = self.p
+                self._heights = sorted(self._initial)
+                self._positions = [1, 2, 3, 4, 5]
+                self._desired = [1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5]
+                self._increments = [0, p / 2, p, (1 + p) / 2, 1]
+            return
+
+        q, n = self._heights, self._positions
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = next(i for i in range(1, 5) if x < q[i]) - 1
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self._desired[i] += self._increments[i]
+
+        for i in range(1, 4):
+            d = self._desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                candidate = q[i] + d / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+                    + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1]))
+                if not q[i - 1] < candidate < q[i + 1]:
+                    candidate = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                q[i] = candidate
+                n[i] += d
+
+    @property
+    def value(self):
+        if self._heights is not None:
+            return self._heights[2]
+        if not self._initial:
+            return None
+        ordered = sorted(self._initial)
+        return ordered[min(len(ordered) - 1, int(self.p * len(ordered)))]
+
+
+class HyperLogLog:
+    """Approximate distinct counter using 2**precision one-byte registers."""
+    def __init__(self, precision=12):
+        if not 4 <= precision <= 16:
+            raise ValueError("precision must be between 4 and 16")
+        self.precision = precision
+        self._m = 1 << precision
+        self._registers = bytearray(self._m)
+
+    def add(self, value):
+        digest = hashlib.blake2b(str(value).encode('utf-8'), digest_size=8).digest()
+        h = int.from_bytes(digest, 'big')
+        bits = 64 - self.precision
+        index = h >> bits
+        rank = bits - (h & ((1 << bits) - 1)).bit_length() + 1
+        if rank > self._registers[index]:
+            self._registers[index] = rank
+
+    @property
+    def count(self):
+        m = self._m
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self._registers)
+        zeros = self._registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)  # small-range correction
+        return round(estimate)
+
+
+def aggregate_stream(values, transform=None, quantiles=(0.5, 0.9, 0.99),
+                     distinct=False):
+    """
+    Aggregates an iterable of numbers in one pass and constant memory.
+    Like SQL aggregates, None (NULL) values are skipped; the rest are
+    converted with float(), so DECIMAL columns can be streamed directly.
+
+    Args:
+        values: Any iterable, e.g. stream_user_ages().
+        transform (callable): Optional per-value transform; values it maps
+            to None are skipped as well.
+        quantiles (tuple): Quantiles to estimate with P-square.
+        distinct (bool): Also estimate the number of distinct values.
+
+    Returns:
+        dict: count, sum, avg, min, max, variance, stddev, a 'quantiles'
+        dict keyed by p and, if requested, 'distinct'.
+    """
+    stats = Welford()
+    total = 0.0
+    estimators = [P2Quantile(p) for p in quantiles]
+    hll = HyperLogLog() if distinct else None
+    for value in values:
+        if transform is not None:
+            value = transform(value)
+        if value is None:
+            continue
+        value = float(value)
+        stats.add(value)
+        total += value
+        for estimator in estimators:
+            estimator.add(value)
+        if hll is not None:
+            hll.add(value)
+
+    result = {
+        'count': stats.count,
+        'sum': total,
+        'avg': stats.mean if stats.count else None,
+        'min': stats.min,
+        'max': stats.max,
+        'variance': stats.variance,
+        'stddev': stats.stddev,
+        'quantiles': {e.p: e.value for e in estimators},
+    }
+    if hll is not None:
+        result['distinct'] = hll.count
+    return result
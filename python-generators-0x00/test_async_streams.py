@@ -0,0 +1,71 @@
+import asyncio
+import os
+import sqlite3
+import tempfile
+import unittest
+import uuid
+
+from async_streams import async_lazy_pagination
+
+
+class AsyncLazyPaginationTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, 'user_data.db')
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('''
+            CREATE TABLE user_data (
+                user_id TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                email TEXT NOT NULL,
+                age REAL NOT NULL
+            )
+        ''')
+        self.ids = sorted(str(uuid.uuid4()) for _ in range(23))
+        conn.executemany(
+            "INSERT INTO user_data VALUES (?, ?, ?, ?)",
+            ((user_id, f"User {i}", f"user{i}@example.com", 20 + i)
+             for i, user_id in enumerate(self.ids)))
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def collect(self, page_size):
+        async def run():
+            return [page async for page in
+                    async_lazy_pagination(page_size, db_path=self.db_path)]
+        return asyncio.run(run())
+
+    def test_pages_cover_every_row_once_in_user_id_order(self):
+        pages = self.collect(5)
+        self.assertEqual([len(page) for page in pages], [5, 5, 5, 5, 3])
+        self.assertEqual([user['user_id'] for page in pages for user in page], self.ids)
+
+    def test_exact_multiple_of_page_size(self):
+        pages = self.collect(23)
+        self.assertEqual(len(pages), 1)
+        self.assertEqual(len(pages[0]), 23)
+
+    def test_no_offset_in_page_queries(self):
+        traced = []
+        original = sqlite3.connect
+
+        def connect(*args, **kwargs):
+            conn = original(*args, **kwargs)
+            conn.set_trace_callback(traced.append)
+            return conn
+
+        sqlite3.connect = connect
+        try:
+            self.collect(5)
+        finally:
+            sqlite3.connect = original
+        selects = [sql for sql in traced if sql.startswith('SELECT')]
+        self.assertEqual(len(selects), 5)
+        self.assertFalse(any('OFFSET' in sql for sql in selects))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import importlib
+import sqlite3
+import unittest
+from array import array
+from decimal import Decimal
+
+batch_processing = importlib.import_module('1-batch_processing')
+ColumnBatch = batch_processing.ColumnBatch
+
+
+def user_data(ages, age_type='INTEGER'):
+    conn = sqlite3.connect(':memory:')
+    conn.execute(f'''
+        CREATE TABLE user_data (
+            user_id TEXT PRIMARY KEY, name TEXT, email TEXT, age {age_type}
+        )
+    ''')
+    conn.executemany("INSERT INTO user_data VALUES (?, ?, ?, ?)",
+                     [(str(i), f"User {i}", f"user{i}@example.com", age)
+                      for i, age in enumerate(ages)])
+    return conn
+
+
+class ColumnBatchTest(unittest.TestCase):
+    def test_integer_ages_use_int_array(self):
+        batch = ColumnBatch.from_rows([('1', 'a', 'a@x', 30), ('2', 'b', 'b@x', 20)])
+        self.assertEqual(batch.age.typecode, 'i')
+        self.assertEqual([row['user_id'] for row in batch.where('age', '>', 25).rows()], ['1'])
+
+    def test_null_and_decimal_ages(self):
+        rows = [('1', 'a', 'a@x', None), ('2', 'b', 'b@x', Decimal('30.50')),
+                ('3', 'c', 'c@x', 20.0)]
+        batch = ColumnBatch.from_rows(rows)
+        self.assertIsInstance(batch.age, array)
+        self.assertEqual(batch.age.typecode, 'd')
+        self.assertEqual([row['user_id'] for row in batch.where('age', '>', 25).rows()], ['2'])
+        # NULL matches nothing, as in SQL
+        self.assertEqual([row['user_id'] for row in batch.where('age', '!=', 30).rows()],
+                         ['2', '3'])
+        self.assertIsNone(next(batch.rows())['age'])
+
+    def test_streamed_table_with_nulls_and_reals(self):
+        conn = user_data([None, 30.5, 22, 41, None], age_type='REAL')
+        batches = batch_processing.stream_users_in_batches(2, columnar=True, connection=conn)
+        matched = [row['user_id'] for batch in
+                   batch_processing.filter_batches(batches, 'age', '>', 25)
+                   for row in batch.rows()]
+        self.assertEqual(matched, ['1', '3'])
+        conn.close()
+
+    def test_pushdown_matches_python_filter(self):
+        conn = user_data([18, 26, 40, 25, 70])
+        pushed = [row['user_id'] for batch in batch_processing.stream_users_in_batches(
+            2, where=[('age', '>', 25)], connection=conn) for row in batch]
+        self.assertEqual(pushed, ['1', '2', '4'])
+        conn.close()
+
+    def test_batch_processing_filters_in_sql(self):
+        traced = []
+        original = sqlite3.connect
+
+        def connect(*args, **kwargs):
+            conn = original(*args, **kwargs)
+            conn.set_trace_callback(traced.append)
+            return conn
+
+        batch_processing.sqlite3.connect = connect
+        try:
+            users = list(batch_processing.batch_processing(5))
+            batches = list(batch_processing.batch_processing_columnar(5))
+        finally:
+            batch_processing.sqlite3.connect = original
+        self.assertTrue(users)
+        self.assertTrue(all(user['age'] > 25 for user in users))
+        self.assertEqual(sum(len(batch) for batch in batches), len(users))
+        selects = [sql for sql in traced if sql.lstrip().upper().startswith('SELECT')]
+        self.assertEqual(len(selects), 2)
+        self.assertTrue(all('WHERE age > 25' in sql for sql in selects), selects)
+
+
+if __name__ == '__main__':
+    unittest.main()
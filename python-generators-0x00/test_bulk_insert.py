@@ -0,0 +1,98 @@
+import io
+import os
+import sqlite3
+import tempfile
+import unittest
+import uuid
+from contextlib import redirect_stdout
+
+import seed
+
+
+class BulkInsertDataTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.tmp.name, 'user_data.csv')
+        self.ids = [str(uuid.uuid4()) for _ in range(25)]
+        self.conn = sqlite3.connect(':memory:')
+        self.conn.execute('''
+            CREATE TABLE user_data (
+                user_id TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                email TEXT NOT NULL,
+                age REAL NOT NULL
+            )
+        ''')
+        # Unlike a constraint, RAISE(ABORT) is not skipped by INSERT OR IGNORE
+        self.conn.execute('''
+            CREATE TRIGGER reject_age BEFORE INSERT ON user_data
+            WHEN NEW.age >= 200 BEGIN SELECT RAISE(ABORT, 'age out of range'); END
+        ''')
+        self.conn.commit()
+
+    def tearDown(self):
+        self.conn.close()
+        self.tmp.cleanup()
+
+    def write_csv(self, ages=None, extra=()):
+        with open(self.csv_path, 'w') as file:
+            file.write('user_id,name,email,age\n')
+            for i, user_id in enumerate(self.ids):
+                age = ages.get(i, 30) if ages else 30
+                file.write(f'{user_id},User {i},user{i}@example.com,{age}\n')
+            for line in extra:
+                file.write(line + '\n')
+
+    def load(self, **kwargs):
+        with redirect_stdout(io.StringIO()):
+            return seed.bulk_insert_data(self.conn, self.csv_path, batch_size=10, **kwargs)
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM user_data").fetchone()[0]
+
+    def test_each_dedupe_mode_skips_existing_and_repeated_ids(self):
+        duplicate = f'{self.ids[0]},User 0,user0@example.com,30'
+        for dedupe in ('ignore', 'preload'):
+            with self.subTest(dedupe=dedupe):
+                self.conn.execute("DELETE FROM user_data")
+                self.conn.commit()
+                self.write_csv(extra=[duplicate])
+                first = self.load(dedupe=dedupe)
+                self.assertEqual((first['rows_read'], first['rows_inserted']), (26, 25))
+                again = self.load(dedupe=dedupe)
+                self.assertEqual(again['rows_inserted'], 0)
+                self.assertEqual(self.count(), 25)
+
+    def test_failed_chunk_is_rolled_back_and_resumable(self):
+        for dedupe in ('ignore', 'preload'):
+            with self.subTest(dedupe=dedupe):
+                self.conn.execute("DELETE FROM user_data")
+                self.conn.commit()
+                # Row 14, in the second chunk, is rejected by the trigger
+                self.write_csv(ages={14: 500})
+                failed = self.load(dedupe=dedupe)
+                self.assertEqual(failed['next_offset'], 10)
+                self.assertFalse(self.conn.in_transaction)
+                self.conn.commit()
+                self.assertEqual(self.count(), 10)
+
+                self.write_csv()
+                resumed = self.load(dedupe=dedupe, resume_offset=failed['next_offset'])
+                self.assertEqual((resumed['rows_read'], resumed['rows_inserted']), (15, 15))
+                self.assertEqual(resumed['next_offset'], 25)
+                self.assertEqual(self.count(), 25)
+
+    def test_resume_offset_skips_rows(self):
+        self.write_csv()
+        stats = self.load(resume_offset=20)
+        self.assertEqual((stats['rows_read'], stats['next_offset']), (5, 25))
+        ids = {row[0] for row in self.conn.execute("SELECT user_id FROM user_data")}
+        self.assertEqual(ids, set(self.ids[20:]))
+
+    def test_unknown_dedupe_mode(self):
+        with self.assertRaises(ValueError):
+            seed.bulk_insert_data(self.conn, self.csv_path, dedupe="replace")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import importlib
+import os
+import sqlite3
+import tempfile
+import unittest
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+
+lazy_paginate = importlib.import_module('2-lazy_paginate')
+
+
+class FileSeed:
+    """Stands in for seed, connecting to a prepared SQLite file."""
+    def __init__(self, path):
+        self.path = path
+
+    def connect_to_prodev(self):
+        return sqlite3.connect(self.path)
+
+
+class KeysetPaginationTest(unittest.TestCase):
+    def setUp(self):
+        handle, self.db_path = tempfile.mkstemp(suffix='.db')
+        os.close(handle)
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('''
+            CREATE TABLE user_data (
+                user_id TEXT PRIMARY KEY, name TEXT, email TEXT, age INTEGER
+            )
+        ''')
+        # Few distinct ages (and some NULLs) so pages split runs of equal keys
+        conn.executemany(
+            "INSERT INTO user_data VALUES (?, ?, ?, ?)",
+            [(str(uuid.uuid4()), f"User {i % 7}", f"user{i}@example.com",
+              None if i % 10 == 0 else 20 + i % 3) for i in range(100)])
+        conn.commit()
+        conn.close()
+        self.original_seed = lazy_paginate.seed
+        lazy_paginate.seed = FileSeed(self.db_path)
+
+    def tearDown(self):
+        lazy_paginate.seed = self.original_seed
+        os.remove(self.db_path)
+
+    def test_every_key_returns_every_row_once(self):
+        for key in lazy_paginate.KEYSET_COLUMNS:
+            with self.subTest(key=key):
+                ids = [row['user_id'] for page, _ in
+                       lazy_paginate.keyset_pagination(10, key=key) for row in page]
+                self.assertEqual(len(ids), 100)
+                self.assertEqual(len(set(ids)), 100)
+
+    def test_resume_from_cursor(self):
+        pages = lazy_paginate.keyset_pagination(15, key='age')
+        first_page, token = next(pages)
+        rest = [row for page, _ in
+                lazy_paginate.keyset_pagination(15, key='age', cursor=token)
+                for row in page]
+        ids = {row['user_id'] for row in first_page + rest}
+        self.assertEqual(len(ids), 100)
+
+    def test_cursor_for_another_key_is_rejected(self):
+        token = lazy_paginate.encode_cursor('age', 20, 'x')
+        with self.assertRaises(ValueError):
+            next(lazy_paginate.keyset_pagination(10, key='name', cursor=token))
+
+    def test_engine_matches_keyset_pagination(self):
+        for key in ('user_id', 'age'):
+            with self.subTest(key=key):
+                with lazy_paginate.PaginationEngine(7, key=key) as engine:
+                    engine_ids = [row['user_id'] for page in engine for row in page]
+                ids = [row['user_id'] for page, _ in
+                       lazy_paginate.keyset_pagination(7, key=key) for row in page]
+                self.assertEqual(engine_ids, ids)
+
+
+class CursorTokenTest(unittest.TestCase):
+    def test_non_json_key_types_round_trip(self):
+        values = (Decimal('25.50'), datetime(2024, 5, 1, 12, 30), date(2024, 5, 1),
+                  uuid.UUID(int=7), b'\x00\xff', 'text', 42, 1.5, None)
+        for value in values:
+            with self.subTest(value=value):
+                token = lazy_paginate.encode_cursor('age', value, 'some-id')
+                decoded, last_id = lazy_paginate.decode_cursor(token, 'age')
+                self.assertEqual(decoded, value)
+                self.assertIs(type(decoded), type(value))
+                self.assertEqual(last_id, 'some-id')
+
+    def test_malformed_tokens_raise_value_error(self):
+        for token in (None, 123, 'not base64!', 'W10=', 'e30='):
+            with self.subTest(token=token):
+                with self.assertRaises(ValueError):
+                    lazy_paginate.decode_cursor(token, 'age')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import functools
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+import uuid
+
+from parallel_seed import _create_sqlite_table, parallel_insert_data
+
+
+class ParallelInsertDataTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.tmp.name, 'user_data.csv')
+        self.db_path = os.path.join(self.tmp.name, 'users.db')
+        self.ids = [str(uuid.uuid4()) for _ in range(500)]
+        with open(self.csv_path, 'w') as file:
+            file.write('user_id,name,email,age\n')
+            for i, user_id in enumerate(self.ids):
+                file.write(f'{user_id},User {i},user{i}@example.com,{20 + i % 50}\n')
+            # A duplicate and an invalid row
+            file.write(f'{self.ids[0]},User 0,user0@example.com,20\n')
+            file.write('not-a-uuid,Nobody,nobody@example.com,30\n')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def load(self, **kwargs):
+        connect = functools.partial(sqlite3.connect, self.db_path, timeout=10)
+        return parallel_insert_data(self.csv_path, connect, workers=2,
+                                    batch_size=50, **kwargs)
+
+    def run_with_timeout(self, func, timeout=30):
+        outcome = {}
+
+        def target():
+            try:
+                outcome['result'] = func()
+            except Exception as e:
+                outcome['error'] = e
+
+        thread = threading.Thread(target=target, daemon=True)
+        thread.start()
+        thread.join(timeout)
+        self.assertFalse(thread.is_alive(), "parallel_insert_data hung")
+        return outcome
+
+    def test_loads_rows_and_counts_inserted(self):
+        _create_sqlite_table(self.db_path)
+        outcome = self.run_with_timeout(self.load)
+        result = outcome['result']
+        self.assertEqual(result['rows'], 501)
+        self.assertEqual(result['inserted'], 500)
+        self.assertEqual(result['rejected'], 1)
+        conn = sqlite3.connect(self.db_path)
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM user_data").fetchone()[0], 500)
+        conn.close()
+
+    def test_writer_failure_is_raised_instead_of_hanging(self):
+        # No user_data table: every writer fails on its first batch
+        sqlite3.connect(self.db_path).close()
+        outcome = self.run_with_timeout(self.load)
+        self.assertIsInstance(outcome.get('error'), sqlite3.OperationalError)
+
+    def test_connect_failure_is_raised(self):
+        def connect():
+            raise sqlite3.OperationalError("unable to open database file")
+
+        outcome = self.run_with_timeout(
+            lambda: parallel_insert_data(self.csv_path, connect, workers=2))
+        self.assertIsInstance(outcome.get('error'), sqlite3.OperationalError)
+
+
+if __name__ == '__main__':
+    unittest.main()
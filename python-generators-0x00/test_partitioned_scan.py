@@ -0,0 +1,65 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from partitioned_scan import NULL_KEYS, partitioned_scan, plan_partitions, scan_range
+
+
+class PartitionedScanTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, 'user_data.db')
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("CREATE TABLE user_data (user_id TEXT, age REAL)")
+        conn.executemany(
+            "INSERT INTO user_data VALUES (?, ?)",
+            ((f"user-{i:04d}", None if i % 10 == 0 else 18 + i % 60)
+             for i in range(1000)))
+        conn.execute("CREATE INDEX idx_age ON user_data (age)")
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_nullable_key_plans_a_null_partition(self):
+        ranges = plan_partitions(self.db_path, key='age', partition_rows=100)
+        self.assertEqual(ranges[0], NULL_KEYS)
+        rows = [row for bounds in ranges
+                for row in scan_range(self.db_path, 'user_data', 'age', bounds)]
+        self.assertEqual(len(rows), 1000)
+        self.assertEqual(len({row['user_id'] for row in rows}), 1000)
+
+    def test_rowid_partitions_are_sized_by_row_count(self):
+        ranges = plan_partitions(self.db_path, partition_rows=300)
+        self.assertEqual(len(ranges), 4)
+        sizes = [len(scan_range(self.db_path, 'user_data', None, bounds))
+                 for bounds in ranges]
+        self.assertEqual(sizes, [300, 300, 300, 100])
+
+    def test_fixed_partition_count(self):
+        self.assertEqual(len(plan_partitions(self.db_path, 5)), 5)
+        self.assertLessEqual(len(plan_partitions(self.db_path, 5, key='age')), 6)
+
+    def test_ordered_scan_on_nullable_key(self):
+        rows = list(partitioned_scan(self.db_path, workers=2, key='age',
+                                     partition_rows=150))
+        self.assertEqual(len(rows), 1000)
+        ages = [row['age'] for row in rows]
+        self.assertEqual(ages[:100], [None] * 100)
+        self.assertEqual(ages[100:], sorted(ages[100:]))
+
+    def test_unordered_scan_returns_every_row(self):
+        rows = list(partitioned_scan(self.db_path, workers=2, ordered=False,
+                                     partition_rows=150))
+        self.assertEqual(len({row['user_id'] for row in rows}), 1000)
+
+    def test_early_exit_cancels_queued_ranges(self):
+        scan = partitioned_scan(self.db_path, workers=1, partition_rows=10)
+        self.assertEqual(next(scan)['user_id'], 'user-0000')
+        scan.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import random
+import sqlite3
+import statistics
+import unittest
+from decimal import Decimal
+
+from stream_aggregates import (HyperLogLog, P2Quantile, Welford,
+                               aggregate_stream, sql_aggregate)
+
+
+class WelfordTest(unittest.TestCase):
+    def test_matches_statistics_module(self):
+        values = [random.uniform(18, 90) for _ in range(1000)]
+        stats = Welford()
+        for value in values:
+            stats.add(value)
+        self.assertEqual(stats.count, 1000)
+        self.assertAlmostEqual(stats.mean, statistics.mean(values))
+        self.assertAlmostEqual(stats.variance, statistics.variance(values))
+        self.assertEqual((stats.min, stats.max), (min(values), max(values)))
+
+    def test_accepts_decimal(self):
+        stats = Welford()
+        for value in (Decimal('30.50'), Decimal('40.50')):
+            stats.add(value)
+        self.assertEqual(stats.mean, 35.5)
+        self.assertEqual(stats.variance, 50.0)
+
+    def test_single_value_has_zero_variance(self):
+        stats = Welford()
+        stats.add(7)
+        self.assertEqual((stats.variance, stats.stddev), (0.0, 0.0))
+
+
+class P2QuantileTest(unittest.TestCase):
+    def test_estimates_uniform_quantiles(self):
+        rng = random.Random(1)
+        estimators = [P2Quantile(p) for p in (0.5, 0.9, 0.99)]
+        for _ in range(20000):
+            value = rng.uniform(0, 100)
+            for estimator in estimators:
+                estimator.add(value)
+        for estimator in estimators:
+            self.assertAlmostEqual(estimator.value, estimator.p * 100, delta=2)
+
+    def test_fewer_than_five_values(self):
+        estimator = P2Quantile(0.5)
+        self.assertIsNone(estimator.value)
+        for value in (3, 1, 2):
+            estimator.add(value)
+        self.assertEqual(estimator.value, 2)
+
+    def test_rejects_invalid_p(self):
+        with self.assertRaises(ValueError):
+            P2Quantile(1)
+
+
+class HyperLogLogTest(unittest.TestCase):
+    def test_estimate_is_close(self):
+        hll = HyperLogLog()
+        for i in range(50000):
+            hll.add(i)
+            hll.add(i)  # duplicates do not count
+        self.assertAlmostEqual(hll.count, 50000, delta=50000 * 0.05)
+
+    def test_small_counts_are_exact_enough(self):
+        hll = HyperLogLog()
+        for value in (1, 2, 3, 2, 1):
+            hll.add(value)
+        self.assertEqual(hll.count, 3)
+
+
+class AggregateStreamTest(unittest.TestCase):
+    def test_skips_none_like_sql(self):
+        result = aggregate_stream([30, None, 40], distinct=True)
+        self.assertEqual(result['count'], 2)
+        self.assertEqual(result['sum'], 70)
+        self.assertEqual(result['avg'], 35)
+        self.assertEqual(result['distinct'], 2)
+
+    def test_decimal_values(self):
+        result = aggregate_stream([Decimal('20.00'), Decimal('30.00'), None],
+                                  quantiles=(0.5,))
+        self.assertEqual((result['min'], result['max']), (20.0, 30.0))
+        self.assertEqual(result['quantiles'][0.5], 30.0)
+
+    def test_transform_none_is_skipped(self):
+        result = aggregate_stream([10, 20, 30], transform=lambda v: v if v > 10 else None)
+        self.assertEqual(result['count'], 2)
+
+    def test_empty_stream(self):
+        result = aggregate_stream([])
+        self.assertEqual(result['count'], 0)
+        self.assertIsNone(result['avg'])
+
+
+class SqlAggregateTest(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(':memory:')
+        self.conn.execute("CREATE TABLE user_data (name TEXT, age REAL)")
+        self.conn.executemany("INSERT INTO user_data VALUES (?, ?)",
+                              [('a', 20), ('b', 30), ('a', None), ('c', 40)])
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_aggregates_run_in_the_database(self):
+        self.assertEqual(sql_aggregate(self.conn, 'avg'), 30)
+        self.assertEqual(sql_aggregate(self.conn, 'COUNT', '*'), 4)
+        self.assertEqual(sql_aggregate(self.conn, 'count'), 3)
+        self.assertEqual(sql_aggregate(self.conn, 'max', group_by='name'),
+                         {'a': 20, 'b': 30, 'c': 40})
+
+    def test_matches_streamed_aggregate(self):
+        ages = [row[0] for row in self.conn.execute("SELECT age FROM user_data")]
+        streamed = aggregate_stream(ages)
+        self.assertEqual(streamed['avg'], sql_aggregate(self.conn, 'avg'))
+        self.assertEqual(streamed['count'], sql_aggregate(self.conn, 'count'))
+
+    def test_rejects_unknown_aggregate_and_identifiers(self):
+        with self.assertRaises(ValueError):
+            sql_aggregate(self.conn, 'median')
+        with self.assertRaises(ValueError):
+            sql_aggregate(self.conn, 'avg', 'age; DROP TABLE user_data')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import os
+import tempfile
+import unittest
+
+import seed
+from bench_stream_rows import SQLiteStandIn, build_database
+
+
+class StreamDbRowsTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'user_data.db')
+        build_database(self.path, 250)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_streams_every_row(self):
+        for server_side in (False, True):
+            with self.subTest(server_side=server_side):
+                connection = SQLiteStandIn(self.path)
+                rows = list(seed.stream_db_rows(connection, server_side=server_side,
+                                                fetch_size=100))
+                self.assertEqual(len(rows), 250)
+                self.assertEqual(set(rows[0]), {'user_id', 'name', 'email', 'age'})
+                connection.close()
+
+    def test_early_stop_leaves_connection_usable(self):
+        connection = SQLiteStandIn(self.path)
+        stream = seed.stream_db_rows(connection, server_side=True, fetch_size=100)
+        next(stream)
+        stream.close()  # would raise "Unread result found" without draining
+        cursor = connection.cursor(buffered=False)
+        cursor.execute("SELECT COUNT(*) FROM user_data")
+        self.assertEqual(cursor.fetchmany(2), [(250,)])
+        cursor.close()
+        connection.close()
+
+
+if __name__ == '__main__':
+    unittest.main()